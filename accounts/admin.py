@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser
+from .models import CustomUser, PermissionAudit
 
 
 @admin.register(CustomUser)
@@ -22,3 +22,15 @@ class CustomUserAdmin(UserAdmin):
             'fields': ('role', 'phone')
         }),
     )
+
+
+@admin.register(PermissionAudit)
+class PermissionAuditAdmin(admin.ModelAdmin):
+    """Read-only log of bulk permission changes"""
+    
+    list_display = ['profile', 'source', 'actor', 'changed_count', 'matched_count', 'created_at']
+    list_filter = ['profile', 'source', 'created_at']
+    readonly_fields = ['actor', 'profile', 'source', 'matched_count', 'changed_count', 'changes', 'created_at']
+    
+    def has_add_permission(self, request):
+        return False
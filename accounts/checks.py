@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Cache backends whose entries are not seen by other processes
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def cache_is_process_local(alias='default'):
+    """Whether the cache ``alias`` is private to each process"""
+    return settings.CACHES.get(alias, {}).get('BACKEND') in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+@register(Tags.caches, deploy=True)
+def check_session_cache(app_configs, **kwargs):
+    """Cached sessions must live in a cache all web processes share"""
+    if settings.SESSION_ENGINE != 'accounts.sessions':
+        return []
+    alias = getattr(settings, 'SESSION_CACHE_ALIAS', 'default')
+    if not cache_is_process_local(alias):
+        return []
+    return [Warning(
+        f"SESSION_ENGINE 'accounts.sessions' caches sessions in the process-local {alias!r} cache.",
+        hint=(
+            'Logging out in one process leaves the session usable in the others for up to '
+            'SESSION_REFRESH_THRESHOLD seconds. Point it at a shared backend such as '
+            'FileBasedCache, DatabaseCache, Redis or Memcached.'
+        ),
+        id='accounts.W001',
+    )]
@@ -0,0 +1,17 @@
+from django.utils.functional import SimpleLazyObject
+
+
+def permissions(request):
+    """
+    Expose the user's effective permission flags as ``user_permissions``.
+
+    The frozen set is computed once per request, on first use, and is the
+    same set the ``permission_tags`` read.
+    """
+    def permission_set():
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return frozenset()
+        return user.permission_set
+
+    return {'user_permissions': SimpleLazyObject(permission_set)}
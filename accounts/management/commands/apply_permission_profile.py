@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import CustomUser, PERMISSION_PROFILES
+from accounts.profiles import apply_permission_profile
+
+
+class Command(BaseCommand):
+    help = 'Apply a named permission profile to many project users at once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('profile', choices=sorted(PERMISSION_PROFILES), help='Profile to apply')
+        parser.add_argument(
+            'usernames', nargs='*', type=str,
+            help='Project users to update (default: use --all)'
+        )
+        parser.add_argument('--all', action='store_true', help='Apply to every project user')
+        parser.add_argument('--dry-run', action='store_true', help='Show the changes without saving them')
+
+    def handle(self, *args, **options):
+        if not options['usernames'] and not options['all']:
+            raise CommandError('Give usernames or --all')
+
+        users = CustomUser.objects.filter(role='project_user')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+            missing = set(options['usernames']) - set(users.values_list('username', flat=True))
+            for username in sorted(missing):
+                self.stdout.write(self.style.WARNING(f'  ✗ Project user not found: {username}'))
+
+        audit, diffs = apply_permission_profile(
+            options['profile'], users, source='command', dry_run=options['dry_run']
+        )
+
+        usernames = dict(CustomUser.objects.filter(pk__in=diffs).values_list('pk', 'username'))
+        for pk, changes in sorted(diffs.items()):
+            summary = ', '.join(f'{name} {old}->{new}' for name, (old, new) in changes.items())
+            self.stdout.write(f'  {usernames.get(pk, pk)}: {summary}')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Dry run: {len(diffs)} users would change.'))
+        elif audit is None:
+            self.stdout.write(self.style.SUCCESS('No users needed changes.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Applied "{options["profile"]}" to {len(diffs)} users (audit #{audit.pk}).'
+            ))
@@ -0,0 +1,70 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+User = get_user_model()
+
+ENGINES = [
+    ('database', 'django.contrib.sessions.backends.db'),
+    ('cached lazy', 'accounts.sessions'),
+]
+
+PATHS = ['/core/notifications/count/', '/dashboard/api/calendar-events/']
+
+
+class Command(BaseCommand):
+    help = 'Count django_session writes per request for the database and lazily refreshed session engines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=240, help='Requests per engine')
+        parser.add_argument(
+            '--interval', type=int, default=30,
+            help='Simulated seconds between requests, like the notification poll'
+        )
+
+    def measure(self, engine, requests, interval):
+        with override_settings(SESSION_ENGINE=engine), transaction.atomic():
+            user = User.objects.create_user('bench_session_user', password=None, role='project_user')
+            client = Client()
+            client.force_login(user)
+            cache.clear()
+
+            started = timezone.now()
+            writes = queries = 0
+            for index in range(requests):
+                # Move the clock so sliding expiry has somewhere to slide
+                now = started + timedelta(seconds=index * interval)
+                with mock.patch('django.utils.timezone.now', return_value=now), \
+                        CaptureQueriesContext(connection) as captured:
+                    response = client.get(PATHS[index % len(PATHS)])
+                if response.status_code != 200:
+                    raise CommandError(f'{response.request["PATH_INFO"]} returned {response.status_code}')
+                queries += len(captured.captured_queries)
+                writes += sum(
+                    1 for query in captured.captured_queries
+                    if 'django_session' in query['sql'] and query['sql'].startswith(('UPDATE', 'INSERT'))
+                )
+
+            transaction.set_rollback(True)
+        return writes / requests, queries / requests
+
+    @override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'])
+    def handle(self, *args, **options):
+        requests, interval = options['requests'], options['interval']
+        self.stdout.write(
+            f'{requests} requests, {interval}s apart '
+            f'({requests * interval / 3600:.1f} h of polling):'
+        )
+        for label, engine in ENGINES:
+            writes, queries = self.measure(engine, requests, interval)
+            self.stdout.write(
+                f'  {label:<12} {writes:.3f} session writes/request   {queries:.2f} queries/request'
+            )
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_autocomplete_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PermissionAudit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile', models.CharField(max_length=50)),
+                ('source', models.CharField(help_text='Where the batch came from, e.g. api or command', max_length=20)),
+                ('matched_count', models.PositiveIntegerField(default=0)),
+                ('changed_count', models.PositiveIntegerField(default=0)),
+                ('changes', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='permission_audits', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_permissionaudit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='notification_digest',
+            field=models.BooleanField(default=False, help_text='Fold informational notifications into one daily digest'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:11
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_customuser_notification_digest'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='auth_user_email_lower_idx'),
+        ),
+    ]
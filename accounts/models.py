@@ -1,5 +1,69 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.functions import Lower
+from django.utils.functional import cached_property
+
+# Project user permission flags, in bit order for permission masks
+PERMISSION_FIELDS = (
+    'can_view_projects',
+    'can_view_events',
+    'can_view_decisions',
+    'can_manage_deliverables',
+    'can_track_progress',
+    'can_use_time_tracker',
+    'can_view_reports',
+    'can_view_calendar',
+    'can_manage_invitations',
+)
+PERMISSION_BITS = {name: 1 << index for index, name in enumerate(PERMISSION_FIELDS)}
+ALL_PERMISSIONS = (1 << len(PERMISSION_FIELDS)) - 1
+
+# Named flag combinations applied in bulk by ``accounts.profiles``
+PERMISSION_PROFILES = {
+    'restricted': {
+        'can_view_projects': False,
+        'can_view_events': True,
+        'can_view_decisions': False,
+        'can_manage_deliverables': True,
+        'can_track_progress': False,
+        'can_use_time_tracker': False,
+        'can_view_reports': False,
+        'can_view_calendar': True,
+        'can_manage_invitations': False,
+    },
+    'standard': {
+        'can_view_projects': True,
+        'can_view_events': True,
+        'can_view_decisions': False,
+        'can_manage_deliverables': True,
+        'can_track_progress': True,
+        'can_use_time_tracker': False,
+        'can_view_reports': False,
+        'can_view_calendar': True,
+        'can_manage_invitations': True,
+    },
+    'full': {name: True for name in PERMISSION_FIELDS},
+}
+
+
+def permission_mask_expression():
+    """
+    Database expression packing a user's effective flags into one integer.
+
+    Annotating a user queryset with it as ``permission_mask`` fills the
+    instances' cached mask, so list templates check permissions without
+    touching the individual columns.
+    """
+    flags = Value(0)
+    for name, bit in PERMISSION_BITS.items():
+        flags = flags + Case(When(**{name: True}, then=Value(bit)), default=Value(0))
+    return Case(
+        When(role__in=['admin', 'management'], then=Value(ALL_PERMISSIONS)),
+        When(role='project_user', then=flags),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
 
 
 class CustomUser(AbstractUser):
@@ -31,6 +95,10 @@ class CustomUser(AbstractUser):
     can_view_calendar = models.BooleanField(default=True, help_text="Can access calendar view")
     can_manage_invitations = models.BooleanField(default=True, help_text="Can manage event invitations")
     
+    notification_digest = models.BooleanField(
+        default=False, help_text="Fold informational notifications into one daily digest"
+    )
+    
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
     
@@ -46,31 +114,84 @@ class CustomUser(AbstractUser):
     def is_project_user(self):
         return self.role == 'project_user'
     
+    @cached_property
+    def permission_mask(self):
+        """Effective permission flags as a bitmask of ``PERMISSION_BITS``"""
+        if self.is_admin or self.is_management:
+            return ALL_PERMISSIONS
+        if not self.is_project_user:
+            return 0
+        return sum(bit for name, bit in PERMISSION_BITS.items() if getattr(self, name))
+    
+    @cached_property
+    def permission_set(self):
+        """Frozen set of the names of the user's effective permission flags"""
+        mask = self.permission_mask
+        return frozenset(name for name, bit in PERMISSION_BITS.items() if mask & bit)
+    
+    def clear_permission_cache(self):
+        self.__dict__.pop('permission_mask', None)
+        self.__dict__.pop('permission_set', None)
+    
     def has_permission(self, permission_name):
         """Check if user has specific permission"""
         if self.is_admin or self.is_management:
             return True  # Admin and management have all permissions
         
-        if self.is_project_user:
-            return getattr(self, permission_name, False)
-        
-        return False
+        return permission_name in self.permission_set
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.clear_permission_cache()
+    
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.clear_permission_cache()
     
     def grant_permission(self, permission_name):
         """Grant a specific permission to project user"""
-        if hasattr(self, permission_name):
+        if permission_name in PERMISSION_BITS:
             setattr(self, permission_name, True)
-            self.save()
+            self.save(update_fields=[permission_name, 'updated_at'])
             return True
         return False
     
     def revoke_permission(self, permission_name):
         """Revoke a specific permission from project user"""
-        if hasattr(self, permission_name):
+        if permission_name in PERMISSION_BITS:
             setattr(self, permission_name, False)
-            self.save()
+            self.save(update_fields=[permission_name, 'updated_at'])
             return True
         return False
     
     class Meta:
         db_table = 'auth_user'
+        indexes = [
+            # Prefix search in the autocomplete pickers and the permissions page
+            models.Index(Lower('username'), name='auth_user_username_lower_idx'),
+            models.Index(Lower('first_name'), name='auth_user_first_name_lower_idx'),
+            models.Index(Lower('last_name'), name='auth_user_last_name_lower_idx'),
+            models.Index(Lower('email'), name='auth_user_email_lower_idx'),
+        ]
+
+
+class PermissionAudit(models.Model):
+    """One bulk permission change, with the flags it changed per user"""
+    
+    actor = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='permission_audits'
+    )
+    profile = models.CharField(max_length=50)
+    source = models.CharField(max_length=20, help_text="Where the batch came from, e.g. api or command")
+    matched_count = models.PositiveIntegerField(default=0)
+    changed_count = models.PositiveIntegerField(default=0)
+    # {user_id: {flag: [old, new]}}
+    changes = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.profile} applied to {self.changed_count} users ({self.created_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import CustomUser, PermissionAudit, PERMISSION_FIELDS, PERMISSION_PROFILES
+
+
+class UnknownProfile(ValueError):
+    pass
+
+
+def profile_flags(profile):
+    """The flag values of a named profile"""
+    try:
+        return PERMISSION_PROFILES[profile]
+    except KeyError:
+        raise UnknownProfile(profile) from None
+
+
+def apply_permission_profile(profile, users, actor=None, source='', dry_run=False):
+    """
+    Set the flags of ``profile`` on every project user in ``users``.
+
+    A profile is one flag combination, so the rows that differ from it are
+    rewritten by a single UPDATE instead of a ``save()`` per user. Returns
+    ``(audit, diffs)``, where ``diffs`` maps user ids to
+    ``{flag: (old, new)}`` for the users that changed. The batch is recorded
+    as one ``PermissionAudit`` entry (``audit`` is None on a dry run).
+    """
+    flags = profile_flags(profile)
+    users = users.filter(role='project_user').order_by()
+
+    with transaction.atomic():
+        # Lock the batch so the diffs describe exactly what the UPDATE changes
+        matched = users.select_for_update().values_list('pk', *PERMISSION_FIELDS)
+        diffs = {}
+        matched_count = 0
+        for pk, *values in matched:
+            matched_count += 1
+            changed = {
+                name: (old, flags[name])
+                for name, old in zip(PERMISSION_FIELDS, values)
+                if name in flags and old != flags[name]
+            }
+            if changed:
+                diffs[pk] = changed
+
+        if dry_run or not diffs:
+            return None, diffs
+
+        # Rows that differ from the profile in any flag
+        differs = Q()
+        for name, value in flags.items():
+            differs |= ~Q(**{name: value})
+        users.filter(differs).update(**flags, updated_at=timezone.now())
+
+        audit = PermissionAudit.objects.create(
+            actor=actor,
+            profile=profile,
+            source=source,
+            matched_count=matched_count,
+            changed_count=len(diffs),
+            changes={
+                str(pk): {name: list(change) for name, change in changed.items()}
+                for pk, changed in diffs.items()
+            },
+        )
+    return audit, diffs
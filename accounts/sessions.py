@@ -0,0 +1,129 @@
+"""
+Cached, database-backed sessions that refresh their expiry lazily.
+
+With ``SESSION_SAVE_EVERY_REQUEST`` every response saves the session so its
+expiry slides forward, which costs an UPDATE on ``django_session`` even for
+polling requests that change nothing. This store serves sessions from the
+cache and skips that write unless the data changed or the expiry would move
+by more than ``SESSION_REFRESH_THRESHOLD`` seconds. A session can therefore
+expire up to that many seconds before a session saved on every request.
+
+Cache entries live for at most the same threshold. Logging out deletes the
+row and this process's cache entry only, so with a process-local cache
+other processes may keep serving the session until their copy expires;
+the ``accounts.W001`` check warns about that setup.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+logger = logging.getLogger('django.contrib.sessions')
+
+KEY_PREFIX = 'accounts.sessions'
+
+DEFAULT_REFRESH_THRESHOLD = 3600
+
+
+def refresh_threshold():
+    return timedelta(seconds=getattr(settings, 'SESSION_REFRESH_THRESHOLD', DEFAULT_REFRESH_THRESHOLD))
+
+
+def cache_timeout(expiry_age):
+    """Seconds to cache a session for: its remaining age, capped at the refresh threshold"""
+    return min(expiry_age, int(refresh_threshold().total_seconds()))
+
+
+class SessionStore(CachedDBStore):
+    """
+    Cache entries hold ``(data, expire_date)`` so a request can tell how
+    stale the stored expiry is without reading the database row.
+    """
+
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # Expiry of the stored row, None until loaded or when there is none
+        self._stored_expiry = None
+
+    def _from_cache(self, cached):
+        if cached is None:
+            return None
+        data, self._stored_expiry = cached
+        return data
+
+    def _from_db(self, s):
+        if s is None:
+            return {}, None
+        self._stored_expiry = s.expire_date
+        data = self.decode(s.session_data)
+        return data, (data, s.expire_date)
+
+    def load(self):
+        try:
+            data = self._from_cache(self._cache.get(self.cache_key))
+        except Exception:
+            # Invalid cache keys reset the session, as in cached_db
+            data = None
+        if data is None:
+            data, cached = self._from_db(self._get_session_from_db())
+            if cached is not None:
+                self._cache.set(self.cache_key, cached, cache_timeout(self.get_expiry_age(expiry=cached[1])))
+        return data
+
+    async def aload(self):
+        try:
+            data = self._from_cache(await self._cache.aget(await self.acache_key()))
+        except Exception:
+            data = None
+        if data is None:
+            data, cached = self._from_db(await self._aget_session_from_db())
+            if cached is not None:
+                await self._cache.aset(
+                    await self.acache_key(), cached, cache_timeout(await self.aget_expiry_age(expiry=cached[1]))
+                )
+        return data
+
+    def _needs_save(self, expire_date):
+        if self.modified or self._stored_expiry is None:
+            return True
+        return expire_date - self._stored_expiry >= refresh_threshold()
+
+    def needs_save(self, must_create=False):
+        """Whether a save would change the stored session beyond a small expiry slide"""
+        if must_create or self.session_key is None:
+            return True
+        # Reading the expiry loads the session, and with it the stored expiry
+        return self._needs_save(self.get_expiry_date())
+
+    async def aneeds_save(self, must_create=False):
+        if must_create or self.session_key is None:
+            return True
+        return self._needs_save(await self.aget_expiry_date())
+
+    def save(self, must_create=False):
+        if not self.needs_save(must_create):
+            return
+        # Skip cached_db's cache write for our own, which records the expiry
+        super(CachedDBStore, self).save(must_create)
+        expire_date = self.get_expiry_date()
+        self._stored_expiry = expire_date
+        try:
+            self._cache.set(self.cache_key, (self._session, expire_date), cache_timeout(self.get_expiry_age()))
+        except Exception:
+            logger.exception('Error saving to cache (%s)', self._cache)
+
+    async def asave(self, must_create=False):
+        if not await self.aneeds_save(must_create):
+            return
+        await super(CachedDBStore, self).asave(must_create)
+        expire_date = await self.aget_expiry_date()
+        self._stored_expiry = expire_date
+        try:
+            await self._cache.aset(
+                await self.acache_key(), (self._session, expire_date), cache_timeout(await self.aget_expiry_age())
+            )
+        except Exception:
+            logger.exception('Error saving to cache (%s)', self._cache)
@@ -12,15 +12,16 @@ def has_permission(user, permission_name):
     if user.is_admin or user.is_management:
         return True
     
-    # Project users check specific permissions
-    if user.is_project_user:
-        return getattr(user, permission_name, False)
-    
-    return False
+    # Project users check the flags memoized on the user
+    return permission_name in user.permission_set
 
-@register.simple_tag
-def user_can(user, permission_name):
+@register.simple_tag(takes_context=True)
+def user_can(context, user, permission_name):
     """Simple tag version for checking permissions"""
+    request = context.get('request')
+    if request is not None and user == getattr(request, 'user', None):
+        # The request user's set from the permissions context processor
+        return permission_name in context['user_permissions']
     return has_permission(user, permission_name)
 
 @register.inclusion_tag('partials/permission_badge.html')
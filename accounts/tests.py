@@ -1,3 +1,193 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .checks import check_session_cache
+
+from .models import ALL_PERMISSIONS, PERMISSION_FIELDS, CustomUser, PermissionAudit, permission_mask_expression
+from .profiles import apply_permission_profile
+from .sessions import SessionStore
+
+
+class PermissionMaskTests(TestCase):
+    """The packed permission mask agrees with the individual flags"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.member = CustomUser.objects.create_user(
+            'member', password='pass', role='project_user', can_view_reports=True, can_view_events=False
+        )
+
+    def annotated(self, user):
+        return CustomUser.objects.annotate(permission_mask=permission_mask_expression()).get(pk=user.pk)
+
+    def test_database_mask_matches_flags(self):
+        member = CustomUser.objects.get(pk=self.member.pk)
+        annotated = self.annotated(self.member)
+        self.assertEqual(annotated.permission_mask, member.permission_mask)
+        self.assertEqual(
+            annotated.permission_set, frozenset(name for name in PERMISSION_FIELDS if getattr(member, name))
+        )
+        self.assertEqual(self.annotated(self.manager).permission_mask, ALL_PERMISSIONS)
+
+    def test_grant_clears_cached_mask(self):
+        member = CustomUser.objects.get(pk=self.member.pk)
+        self.assertFalse(member.has_permission('can_view_events'))
+        member.grant_permission('can_view_events')
+        self.assertTrue(member.has_permission('can_view_events'))
+
+    def test_pages(self):
+        self.client.force_login(self.member)
+        response = self.client.get('/dashboard/project-user/', follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Personal Tools')
+        self.assertNotContains(response, 'My Events')
+        self.assertIn('can_view_reports', response.context['user_permissions'])
+
+        self.client.force_login(self.manager)
+        self.assertContains(self.client.get('/core/permissions/'), 'Reports')
+
+
+class PermissionProfileTests(TestCase):
+    """Profiles are applied in one UPDATE and recorded in one audit row"""
+
+    url = '/core/permissions/bulk/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.members = [
+            CustomUser.objects.create_user(
+                f'member{index}', password='pass', role='project_user', can_view_reports=index % 2 == 0
+            )
+            for index in range(20)
+        ]
+
+    def post_json(self, data):
+        self.client.force_login(self.manager)
+        return self.client.post(self.url, json.dumps(data), content_type='application/json')
+
+    def test_service(self):
+        with CaptureQueriesContext(connection) as queries:
+            audit, diffs = apply_permission_profile('full', CustomUser.objects.all(), actor=self.manager, source='test')
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE')]), 1)
+        self.assertEqual(len(diffs), 20)
+        self.assertEqual(audit.changed_count, 20)
+        self.assertEqual(
+            CustomUser.objects.filter(role='project_user', can_view_reports=True, can_use_time_tracker=True).count(),
+            20
+        )
+
+        # Nothing left to change records nothing
+        audit, diffs = apply_permission_profile('full', CustomUser.objects.all())
+        self.assertIsNone(audit)
+        self.assertEqual(diffs, {})
+        self.assertEqual(PermissionAudit.objects.count(), 1)
+
+    def test_api(self):
+        ids = [member.pk for member in self.members[:3]]
+        data = self.post_json({'profile': 'restricted', 'user_ids': ids}).json()
+        self.assertTrue(data['success'], data)
+        self.assertEqual(data['changed'], 3)
+        self.assertEqual(data['changes'][0]['changes']['can_view_projects'], {'old': True, 'new': False})
+
+        self.assertTrue(self.client.post(self.url, {'profile': 'standard', 'search': 'member1'}).json()['success'])
+        self.assertEqual(self.client.post(self.url, {'profile': 'unknown', 'all': '1'}).status_code, 400)
+        self.assertEqual(self.client.post(self.url, {'profile': 'standard'}).status_code, 400)
+
+    def test_api_rejects_malformed_json(self):
+        for body in ('[1, 2]', '"full"', 'null', '{'):
+            self.client.force_login(self.manager)
+            response = self.client.post(self.url, body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+            self.assertEqual(response.json()['message'], 'Invalid JSON')
+        response = self.post_json({'profile': 'full', 'user_ids': '12'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('apply_permission_profile', 'full', 'member1', 'member2', 'ghost', '--dry-run', stdout=out)
+        self.assertIn('would change', out.getvalue())
+        self.assertFalse(PermissionAudit.objects.exists())
+        call_command('apply_permission_profile', 'full', '--all', stdout=out)
+        self.assertEqual(PermissionAudit.objects.get().source, 'command')
+
+
+@override_settings(SESSION_ENGINE='accounts.sessions', SESSION_REFRESH_THRESHOLD=600)
+class SessionStoreTests(TestCase):
+    """Sessions are written back only when their data or expiry really changes"""
+
+    url = '/core/notifications/count/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('member', password='pass', role='project_user')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+
+    def stored_expiry(self):
+        return Session.objects.get(pk=self.key).expire_date
+
+    def test_expiry_refreshed_lazily(self):
+        expiry = self.stored_expiry()
+        self.client.get(self.url)
+        self.assertEqual(self.stored_expiry(), expiry)
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(seconds=700)):
+            self.client.get(self.url)
+        self.assertGreater(self.stored_expiry(), expiry)
+
+    def test_data_changes_are_written(self):
+        session = SessionStore(self.key)
+        session['seen'] = 1
+        session.save()
+        self.assertEqual(Session.objects.get(pk=self.key).get_decoded()['seen'], 1)
+        cache.clear()
+        session = SessionStore(self.key)
+        self.assertEqual(session['seen'], 1)
+        self.assertFalse(session.needs_save())
+
+        async def read_and_save():
+            session = SessionStore(self.key)
+            value = await session.aget('seen')
+            await session.asave()
+            return value
+        self.assertEqual(async_to_sync(read_and_save)(), 1)
+
+    def test_cache_entries_expire_with_the_threshold(self):
+        session = SessionStore(self.key)
+        with mock.patch.object(session._cache, 'set', wraps=session._cache.set) as cache_set:
+            cache.clear()
+            session.load()
+            session['seen'] = 1
+            session.save()
+        self.assertEqual([call.args[2] for call in cache_set.call_args_list], [600, 600])
+
+    def test_logout_invalidates_session(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.client.logout()
+        self.assertFalse(Session.objects.filter(pk=self.key).exists())
+        self.assertEqual(SessionStore(self.key).load(), {})
+        # Replaying the old cookie no longer authenticates
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = self.key
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_process_local_cache_check(self):
+        self.assertEqual([warning.id for warning in check_session_cache(None)], ['accounts.W001'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_session_cache(None), [])
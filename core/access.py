@@ -0,0 +1,244 @@
+import operator
+from functools import reduce
+
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q, Value
+from django.shortcuts import get_object_or_404
+
+from .models import Project, Event, Decision, Deliverable, EventAccess, Invitation
+
+# Relations that make an event one of "my events"; invitees can also see it
+MEMBER_RELATIONS = ('organizer', 'participant')
+
+
+def accessible_event_ids(user, relations=None):
+    """Subquery of the ids of events ``user`` is related to, optionally only through ``relations``"""
+    access = EventAccess.objects.filter(user=user)
+    if relations is not None:
+        access = access.filter(relation__in=relations)
+    return access.values('event_id')
+
+
+def accessible_events(user, relations=None):
+    """
+    Events ``user`` organizes, participates in or is invited to.
+
+    A semi-join on the access table replaces the organizer/participant/
+    invitation OR across three joins, so no DISTINCT is needed.
+    """
+    return Event.objects.filter(pk__in=accessible_event_ids(user, relations))
+
+
+def add_event_access(event_id, user_ids, relation):
+    EventAccess.objects.bulk_create(
+        [EventAccess(event_id=event_id, user_id=user_id, relation=relation) for user_id in user_ids],
+        ignore_conflicts=True
+    )
+
+
+def remove_event_access(event_id, user_ids, relation):
+    EventAccess.objects.filter(event_id=event_id, user_id__in=user_ids, relation=relation).delete()
+
+
+def sync_organizer_access(event):
+    """Point the event's organizer row at its current organizer"""
+    EventAccess.objects.filter(event=event, relation='organizer').exclude(user_id=event.organizer_id).delete()
+    add_event_access(event.pk, [event.organizer_id], 'organizer')
+
+
+def rebuild_event_access(event):
+    """Replace all access rows of an event from its current state"""
+    EventAccess.objects.filter(event=event).delete()
+    add_event_access(event.pk, [event.organizer_id], 'organizer')
+    add_event_access(event.pk, event.participants.values_list('id', flat=True), 'participant')
+    add_event_access(
+        event.pk, Invitation.objects.filter(event=event).values_list('invitee_id', flat=True), 'invitee'
+    )
+
+
+def rebuild_all_event_access():
+    """Rebuild the access table for every event"""
+    EventAccess.objects.all().delete()
+    rows = [
+        EventAccess(event_id=event_id, user_id=user_id, relation='organizer')
+        for event_id, user_id in Event.objects.values_list('id', 'organizer_id').iterator()
+    ]
+    rows.extend(
+        EventAccess(event_id=event_id, user_id=user_id, relation='participant')
+        for event_id, user_id in Event.participants.through.objects.values_list('event_id', 'customuser_id').iterator()
+    )
+    rows.extend(
+        EventAccess(event_id=event_id, user_id=user_id, relation='invitee')
+        for event_id, user_id in Invitation.objects.values_list('event_id', 'invitee_id').iterator()
+    )
+    EventAccess.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+# ============= OBJECT PERMISSIONS =============
+
+VIEW, EDIT, MANAGE = 'view', 'edit', 'manage'
+ACTIONS = (VIEW, EDIT, MANAGE)
+
+# Deliverable-only actions: quick progress updates and the API's updates
+PROGRESS, UPDATE = 'progress', 'update'
+
+
+def _any(*conditions):
+    conditions = [condition for condition in conditions if condition is not None]
+    if not conditions:
+        return Value(False)
+    return reduce(operator.or_, conditions)
+
+
+def _event_member(user, event_ref, relations):
+    return Exists(EventAccess.objects.filter(user=user, event=OuterRef(event_ref), relation__in=relations))
+
+
+def project_rules(user):
+    owner = Q(created_by=user) if user.is_management else None
+    participant = Exists(EventAccess.objects.filter(
+        user=user, relation='participant', event__project=OuterRef('pk')
+    ))
+    return {
+        VIEW: _any(owner) if user.is_management else participant,
+        EDIT: Q(created_by=user),
+        MANAGE: _any(owner),
+    }
+
+
+def event_rules(user):
+    owner = Q(project__created_by=user) if user.is_management else None
+    return {
+        VIEW: _any(owner, _event_member(user, 'pk', MEMBER_RELATIONS)),
+        EDIT: _any(owner, Q(organizer=user)),
+        MANAGE: _any(owner),
+    }
+
+
+def decision_rules(user):
+    owner = Q(event__project__created_by=user) if user.is_management else None
+    return {
+        VIEW: _any(owner, Q(created_by=user), _event_member(user, 'event_id', ['participant'])),
+        EDIT: _any(owner, Q(created_by=user)),
+        MANAGE: _any(owner, Q(created_by=user)),
+    }
+
+
+def deliverable_rules(user):
+    # Management users also own standalone deliverables
+    owner = (
+        Q(decision__isnull=True) | Q(decision__event__project__created_by=user)
+        if user.is_management else None
+    )
+    return {
+        VIEW: _any(owner, Q(assigned_to=user)),
+        EDIT: _any(owner, Q(assigned_to=user)),
+        MANAGE: _any(owner),
+        PROGRESS: Q(assigned_to=user),
+        # CanUpdateDeliverable also lets the decision's creator update it
+        UPDATE: _any(owner, Q(assigned_to=user), Q(decision__created_by=user)),
+    }
+
+
+PERMISSION_RULES = {
+    Project: project_rules,
+    Event: event_rules,
+    Decision: decision_rules,
+    Deliverable: deliverable_rules,
+}
+
+
+class ObjectPermissions:
+    """
+    View/edit/manage permissions of one user on projects, events, decisions
+    and deliverables.
+
+    Each model's rules compile to boolean annotations, so any number of rows
+    resolve in a single query. Answers are memoized, and a request shares
+    one instance through ``object_permissions()``.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._cache = {}
+
+    def rules(self, model):
+        return {
+            action: ExpressionWrapper(condition, output_field=BooleanField())
+            for action, condition in PERMISSION_RULES[model](self.user).items()
+        }
+
+    def actions(self, model):
+        """The actions ``model`` has rules for: ``ACTIONS`` and any of its own"""
+        return tuple(PERMISSION_RULES[model](self.user))
+
+    def annotate(self, queryset):
+        """``queryset`` with a ``can_<action>`` boolean per action"""
+        return queryset.annotate(**{
+            f'can_{action}': expression for action, expression in self.rules(queryset.model).items()
+        })
+
+    def _remember(self, model, pk, actions, allowed):
+        actions = frozenset(action for action, granted in zip(actions, allowed) if granted)
+        self._cache[(model, pk)] = actions
+        return actions
+
+    def bulk(self, model, pks):
+        """pk -> frozenset of allowed actions, querying only the rows not seen before"""
+        pks = set(pks)
+        if not self.user.is_authenticated:
+            return {pk: frozenset() for pk in pks}
+        if self.user.is_admin:
+            return {pk: frozenset(self.actions(model)) for pk in pks}
+
+        missing = [pk for pk in pks if (model, pk) not in self._cache]
+        if missing:
+            actions = self.actions(model)
+            rows = self.annotate(model.objects.filter(pk__in=missing)).values_list(
+                'pk', *(f'can_{action}' for action in actions)
+            )
+            for pk, *allowed in rows:
+                self._remember(model, pk, actions, allowed)
+            for pk in missing:
+                self._cache.setdefault((model, pk), frozenset())
+        return {pk: self._cache[(model, pk)] for pk in pks}
+
+    def allowed_ids(self, objects, action):
+        """The pks among ``objects`` (model instances of one type) allowing ``action``"""
+        objects = list(objects)
+        if not objects:
+            return set()
+        permissions = self.bulk(type(objects[0]), [obj.pk for obj in objects])
+        return {pk for pk, actions in permissions.items() if action in actions}
+
+    def get_object_or_404(self, model, pk, queryset=None):
+        """Fetch a row together with its permissions in one query"""
+        queryset = model.objects.all() if queryset is None else queryset
+        if not self.user.is_authenticated or self.user.is_admin:
+            return get_object_or_404(queryset, pk=pk)
+        obj = get_object_or_404(self.annotate(queryset), pk=pk)
+        actions = self.actions(model)
+        self._remember(model, obj.pk, actions, [getattr(obj, f'can_{action}') for action in actions])
+        return obj
+
+    def has(self, obj, action):
+        return action in self.bulk(type(obj), [obj.pk])[obj.pk]
+
+    def can_view(self, obj):
+        return self.has(obj, VIEW)
+
+    def can_edit(self, obj):
+        return self.has(obj, EDIT)
+
+    def can_manage(self, obj):
+        return self.has(obj, MANAGE)
+
+
+def object_permissions(request):
+    """The request's ``ObjectPermissions``, created on first use"""
+    # DRF wraps the HttpRequest; memoize on the underlying one
+    request = getattr(request, '_request', request)
+    permissions = getattr(request, '_object_permissions', None)
+    if permissions is None or permissions.user != request.user:
+        permissions = ObjectPermissions(request.user)
+        request._object_permissions = permissions
+    return permissions
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Project, Event, Decision, Deliverable, Invitation, EventLink
+from .models import Project, Event, Decision, Deliverable, Invitation, EventLink, Job, SweepCheckpoint
 
 
 @admin.register(Project)
@@ -57,3 +57,17 @@ class EventLinkAdmin(admin.ModelAdmin):
     list_filter = ['link_type', 'created_at']
     search_fields = ['source_event__title', 'target_event__title']
     readonly_fields = ['created_at']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'priority', 'attempts', 'run_after', 'finished_at']
+    list_filter = ['status', 'name', 'created_at']
+    search_fields = ['dedup_key']
+    readonly_fields = ['created_at', 'started_at', 'locked_until', 'finished_at', 'attempts', 'last_error']
+
+
+@admin.register(SweepCheckpoint)
+class SweepCheckpointAdmin(admin.ModelAdmin):
+    list_display = ['name', 'swept_until', 'updated_at']
+    readonly_fields = ['updated_at']
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+        from . import digests, fanout, reminders  # noqa: F401  (register their jobs)
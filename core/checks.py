@@ -0,0 +1,21 @@
+from django.core.checks import Tags, Warning, register
+
+from accounts.checks import cache_is_process_local
+
+from .jobs import run_eagerly
+
+
+@register(Tags.caches, deploy=True)
+def check_job_cache(app_configs, **kwargs):
+    """Jobs run by a separate worker must update counts in a cache the web processes share"""
+    if run_eagerly() or not cache_is_process_local():
+        return []
+    return [Warning(
+        'Jobs run in runworker but the default cache is process-local.',
+        hint=(
+            'Notifications created by runworker only reach the unread counts and streams of web '
+            'processes once their cached counts expire. Point CACHES at a shared backend such as '
+            'FileBasedCache, DatabaseCache, Redis or Memcached.'
+        ),
+        id='core.W001',
+    )]
@@ -0,0 +1,74 @@
+import heapq
+from collections import defaultdict
+
+from django.db.models import Q
+
+from .models import BusyInterval
+
+
+def find_overlapping_pairs(intervals):
+    """
+    Return every pair of overlapping intervals using a sort-and-sweep.
+
+    ``intervals`` is an iterable of ``(key, start, end)`` tuples. Intervals
+    that only touch (one ends exactly when the other starts) do not overlap.
+    Runs in O(n log n + k) for n intervals and k overlapping pairs.
+    """
+    ordered = sorted(intervals, key=lambda interval: (interval[1], interval[2]))
+
+    pairs = []
+    active = []  # min-heap of (end, sequence, key) for intervals still open
+    for sequence, (key, start, end) in enumerate(ordered):
+        # Drop intervals that finished before this one starts
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+
+        for _, _, other_key in active:
+            pairs.append((other_key, key))
+
+        heapq.heappush(active, (end, sequence, key))
+
+    return pairs
+
+
+def find_conflicts(events):
+    """
+    Map each event id in ``events`` to the ids of the events it conflicts with.
+
+    Two events conflict when they overlap in time and share a participant,
+    an organizer or a venue. Only the busy intervals of the people and
+    rooms involved in the batch are loaded (one query), grouped per
+    resource and swept in memory.
+    """
+    events = [event for event in events if event.pk]
+    if not events:
+        return {}
+
+    keys = {event.pk for event in events}
+    window_start = min(event.start_time for event in events)
+    window_end = max(event.end_time for event in events)
+
+    batch_intervals = BusyInterval.objects.filter(event_id__in=keys)
+    candidates = BusyInterval.objects.filter(
+        Q(user_id__in=batch_intervals.filter(user__isnull=False).values('user_id')) |
+        Q(venue__in=batch_intervals.filter(user__isnull=True).values('venue')),
+        start_time__lt=window_end,
+        end_time__gt=window_start
+    ).order_by().values_list('event_id', 'user_id', 'venue', 'start_time', 'end_time')
+
+    # Sweep each user's and each venue's timeline separately
+    timelines = defaultdict(list)
+    for event_id, user_id, venue, start, end in candidates:
+        resource = ('user', user_id) if user_id else ('venue', venue)
+        timelines[resource].append((event_id, start, end))
+
+    conflict_map = {key: set() for key in keys}
+    for intervals in timelines.values():
+        for first, second in find_overlapping_pairs(intervals):
+            if first == second:
+                continue
+            if first in conflict_map:
+                conflict_map[first].add(second)
+            if second in conflict_map:
+                conflict_map[second].add(first)
+    return conflict_map
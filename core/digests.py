@@ -0,0 +1,72 @@
+"""
+Daily notification digests.
+
+Users who opt in with ``notification_digest`` have their informational
+notifications (invitation responses, ``core.fanout.DIGEST_TYPES``) held
+back when they are created: the rows are stored but neither counted as
+unread nor pushed. Once per ``NOTIFICATION_DIGEST_INTERVAL`` a periodic job
+summarises each user's held rows in a single digest notification and
+releases them, in one transaction, as read rows the user can still find in
+their notification list. Invitations and deliverable notifications ask for
+action and are never held.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .fanout import batched, create_notifications
+from .jobs import task
+from .models import Notification
+
+DIGEST_INTERVAL = getattr(settings, 'NOTIFICATION_DIGEST_INTERVAL', 24 * 60 * 60)
+
+
+def digest_notification(user_id, totals):
+    """One summary notification for a user's ``(type, occurrences, events)`` totals"""
+    labels = dict(Notification.TYPE_CHOICES)
+    lines = []
+    for notification_type, occurrences, events in totals:
+        where = f'{events} event{"s" if events != 1 else ""}'
+        lines.append(f'{labels[notification_type]}: {occurrences} across {where}')
+    return Notification(
+        user_id=user_id,
+        title=f'Notification digest: {sum(total[1] for total in totals)} updates',
+        message='; '.join(lines),
+        notification_type='digest'
+    )
+
+
+@task('core.send_notification_digests', every=DIGEST_INTERVAL)
+def send_notification_digests(now=None):
+    """Summarise the notifications held for each user in one digest and release them as read"""
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        # Locked so a coalesced occurrence cannot land in a row after it was summarised
+        held = Notification.objects.select_for_update().filter(
+            held=True, created_at__lte=now
+        ).order_by('user_id', 'notification_type').values_list(
+            'pk', 'user_id', 'notification_type', 'count', 'event_id'
+        )
+        released = []
+        occurrences = defaultdict(int)
+        events = defaultdict(set)
+        for pk, user_id, notification_type, count, event_id in held:
+            released.append(pk)
+            occurrences[user_id, notification_type] += count
+            if event_id is not None:
+                events[user_id, notification_type].add(event_id)
+
+        totals = defaultdict(list)
+        for (user_id, notification_type), total in occurrences.items():
+            totals[user_id].append((notification_type, total, len(events[user_id, notification_type])))
+
+        for batch in batched(released):
+            # Never counted as unread, so the cached counts stay as they are
+            Notification.objects.filter(pk__in=batch).update(held=False, is_read=True)
+        digests = create_notifications(
+            digest_notification(user_id, user_totals) for user_id, user_totals in totals.items()
+        )
+    return digests
@@ -0,0 +1,250 @@
+"""
+Invitation and notification fan-out.
+
+Rows are bulk inserted in batches rather than saved one by one. Bulk
+inserts skip the model signals, so these functions apply the same side
+effects themselves: invitee access rows, cached unread counts and pushes to
+open notification streams. The tasks run on the job queue (``core.jobs``),
+off the request that triggered them.
+
+Repetitive notifications are coalesced: a new invitation response is
+merged into the recipient's unread notification of the same kind
+for the same event when that one is under ``NOTIFICATION_COALESCE_WINDOW``
+seconds old. The merged row counts the occurrences, shows the latest
+message and moves to the top of the list, so an event with hundreds of
+responses costs its organizer one row rather than hundreds.
+
+Users who opt in with ``notification_digest`` get their informational
+notifications held back: the rows are stored but neither counted nor
+pushed until the digest job (``core.digests``) summarises them.
+"""
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.utils import timezone
+
+from .access import add_event_access
+from .jobs import task
+from .models import Event, Invitation, Notification
+from .notifications import adjust_unread_count, publish_notification, publish_unread_count
+
+User = get_user_model()
+
+BATCH_SIZE = 500
+
+
+def batched(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# Types merged per (user, event, title); the rest are one row per occurrence
+COALESCED_TYPES = ['invitation_response']
+
+# Types held for the digest of users who opted in
+DIGEST_TYPES = ['invitation_response']
+
+
+def hold_for_digests(notifications):
+    """Mark the notifications that opted-in users receive in their digest as held"""
+    user_ids = {
+        notification.user_id for notification in notifications
+        if notification.notification_type in DIGEST_TYPES
+    }
+    if not user_ids:
+        return
+    digest_user_ids = set(
+        User.objects.filter(pk__in=user_ids, notification_digest=True).values_list('pk', flat=True)
+    )
+    for notification in notifications:
+        if notification.notification_type in DIGEST_TYPES and notification.user_id in digest_user_ids:
+            notification.held = True
+
+
+def coalesce_key(notification):
+    if notification.is_read or notification.event_id is None:
+        return None
+    if notification.notification_type not in COALESCED_TYPES:
+        return None
+    return (
+        notification.user_id, notification.event_id, notification.notification_type, notification.title,
+        notification.held
+    )
+
+
+def coalesce_notifications(notifications):
+    """
+    Split unsaved notifications into those to insert and existing unread rows
+    they were merged into (already updated). Repeats within ``notifications``
+    collapse into one before looking for a recent row.
+    """
+    fresh = []
+    pending = {}
+    for notification in notifications:
+        key = coalesce_key(notification)
+        if key is None:
+            fresh.append(notification)
+            continue
+        if key in pending:
+            # The latest occurrence supplies the text
+            notification.count += pending[key].count
+        pending[key] = notification
+    if not pending:
+        return fresh, []
+
+    now = timezone.now()
+    window = timedelta(seconds=getattr(settings, 'NOTIFICATION_COALESCE_WINDOW', 60 * 60))
+    recent = {}
+    candidates = Notification.objects.filter(
+        user_id__in={key[0] for key in pending},
+        is_read=False,
+        created_at__gte=now - window,
+        event_id__in={key[1] for key in pending},
+        notification_type__in=COALESCED_TYPES,
+    ).order_by('created_at')
+    for row in candidates:
+        recent[coalesce_key(row)] = row
+
+    merged = []
+    for key, notification in pending.items():
+        row = recent.get(key)
+        # Read in the meantime: the update matches nothing and a new row is inserted
+        if row is None or not Notification.objects.filter(pk=row.pk, is_read=False).update(
+            count=F('count') + notification.count,
+            message=notification.message,
+            invitation_id=notification.invitation_id,
+            created_at=now,
+            updated_at=now,
+        ):
+            fresh.append(notification)
+            continue
+        row.count += notification.count
+        row.message = notification.message
+        row.invitation_id = notification.invitation_id
+        row.created_at = row.updated_at = now
+        merged.append(row)
+    return fresh, merged
+
+
+def create_notifications(notifications):
+    """
+    Bulk insert unsaved ``Notification`` objects, holding digested ones and
+    coalescing repeats, and update counts and streams as ``save()`` would.
+    Returns the inserted and merged rows.
+    """
+    created = []
+    merged = []
+    for batch in batched(notifications):
+        hold_for_digests(batch)
+        fresh, batch_merged = coalesce_notifications(batch)
+        created.extend(Notification.objects.bulk_create(fresh))
+        merged.extend(batch_merged)
+    for notification in created:
+        if notification.held:
+            continue
+        if not notification.is_read:
+            adjust_unread_count(notification.user_id, 1)
+        if notification.pk is None:
+            # Databases that cannot return bulk-inserted ids only get the new count
+            publish_unread_count(notification.user_id)
+        else:
+            publish_notification(notification)
+    for notification in merged:
+        # Still unread, so the count is unchanged; the stream refreshes the row
+        if not notification.held:
+            publish_notification(notification)
+    return created + merged
+
+
+def display_name(user):
+    return user.get_full_name() or user.username
+
+
+@task('core.invite_participants')
+def invite_participants(event_id, invited_by_id):
+    """Invite and notify every participant of an event who has no invitation yet"""
+    event = Event.objects.filter(pk=event_id).first()
+    if event is None:
+        # Deleted before the job ran
+        return
+    inviter = User.objects.get(pk=invited_by_id)
+
+    invited = set(Invitation.objects.filter(event=event).values_list('invitee_id', flat=True))
+    user_ids = [pk for pk in event.participants.values_list('id', flat=True) if pk not in invited]
+    when = event.start_time.strftime("%B %d, %Y at %I:%M %p")
+
+    for batch in batched(user_ids):
+        Invitation.objects.bulk_create(
+            [
+                Invitation(
+                    event=event,
+                    invitee_id=user_id,
+                    invited_by=inviter,
+                    message=f'You have been invited to participate in "{event.title}"'
+                )
+                for user_id in batch
+            ],
+            ignore_conflicts=True
+        )
+        add_event_access(event.pk, batch, 'invitee')
+
+        invitations = Invitation.objects.filter(event=event, invitee_id__in=batch).values_list('id', 'invitee_id')
+        create_notifications(
+            Notification(
+                user_id=invitee_id,
+                title=f'New Event Invitation: {event.title}',
+                message=f'{display_name(inviter)} has invited you to participate in "{event.title}" on {when}',
+                notification_type='event_invitation',
+                event=event,
+                invitation_id=invitation_id
+            )
+            for invitation_id, invitee_id in invitations
+        )
+
+
+@task('core.notify_invitation_response')
+def notify_invitation_response(invitation_id, response):
+    """Tell the organizer, and on acceptance the project creator, how an invitee responded"""
+    invitation = Invitation.objects.select_related(
+        'event__organizer', 'event__project__created_by', 'invitee'
+    ).filter(pk=invitation_id).first()
+    if invitation is None:
+        return
+    event, invitee = invitation.event, invitation.invitee
+    organizer = event.organizer
+    project_creator = event.project.created_by if event.project else None
+
+    notifications = []
+    if response == 'accepted':
+        if organizer and organizer != invitee:
+            notifications.append(Notification(
+                user=organizer,
+                title='Invitation Accepted',
+                message=f'{display_name(invitee)} accepted the invitation to "{event.title}"',
+                notification_type='invitation_response',
+                event=event,
+                invitation=invitation
+            ))
+        if project_creator and project_creator != invitee and project_creator != organizer:
+            notifications.append(Notification(
+                user=project_creator,
+                title='Event Invitation Accepted',
+                message=f'{display_name(invitee)} accepted the invitation to "{event.title}" in project "{event.project.name}"',
+                notification_type='invitation_response',
+                event=event,
+                invitation=invitation
+            ))
+    elif organizer and organizer != invitee:
+        notifications.append(Notification(
+            user=organizer,
+            title='Invitation Declined',
+            message=f'{display_name(invitee)} declined the invitation to "{event.title}"',
+            notification_type='invitation_response',
+            event=event,
+            invitation=invitation
+        ))
+    create_notifications(notifications)
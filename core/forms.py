@@ -1,9 +1,152 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.functions import Lower
+
 from .models import Project, Event, Decision, Deliverable, Invitation
+from .widgets import AutocompleteSelect, AutocompleteSelectMultiple
 
 User = get_user_model()
 
+# Related objects each model's __str__ reads, loaded together with form choices
+CHOICE_LABEL_RELATED = {
+    Event: ['project'],
+    Decision: ['event'],
+    Deliverable: ['assigned_to'],
+}
+
+
+def with_choice_labels(queryset):
+    """Select the related rows a model's __str__ needs so rendering choices costs one query"""
+    related = CHOICE_LABEL_RELATED.get(queryset.model)
+    return queryset.select_related(*related) if related else queryset
+
+
+class ChoiceLabelsMixin:
+    """Apply ``with_choice_labels`` to every queryset assigned to a model choice field"""
+    
+    def _set_queryset(self, queryset):
+        super()._set_queryset(None if queryset is None else with_choice_labels(queryset))
+    
+    queryset = property(forms.ModelChoiceField._get_queryset, _set_queryset)
+
+
+class LabelledModelChoiceField(ChoiceLabelsMixin, forms.ModelChoiceField):
+    pass
+
+
+class LabelledModelMultipleChoiceField(ChoiceLabelsMixin, forms.ModelMultipleChoiceField):
+    pass
+
+
+# ============= CHOICE SCOPES =============
+#
+# What each picker offers a user. The forms and the autocomplete endpoint
+# share these so both apply the same role rules.
+
+def event_project_choices(user):
+    if user.is_admin:
+        return Project.objects.all()
+    if user.is_management:
+        return Project.objects.filter(created_by=user)
+    # Project users can add events to projects they participate in
+    return Project.objects.filter(events__participants=user).distinct()
+
+
+def participant_choices(user):
+    return User.objects.all()
+
+
+def schedulable_user_choices(user, project):
+    """
+    Users whose free/busy time ``user`` may look up for an event in
+    ``project``: anyone for admins and the project's owner, otherwise the
+    project's members (its owner and the people on its events).
+    """
+    if user.is_admin or project.created_by_id == user.pk:
+        return participant_choices(user)
+    return User.objects.filter(
+        Q(pk=project.created_by_id) | Q(event_access__event__project=project)
+    ).distinct()
+
+
+def linked_event_choices(user):
+    if user.is_admin:
+        return Event.objects.all()
+    if user.is_management:
+        return Event.objects.filter(project__created_by=user)
+    return Event.objects.filter(participants=user)
+
+
+def decision_event_choices(user):
+    if user.is_admin:
+        return Event.objects.all()
+    if user.is_management:
+        return Event.objects.filter(project__created_by=user)
+    return Event.objects.filter(participants=user).distinct()
+
+
+def deliverable_decision_choices(user):
+    if user.is_admin:
+        return Decision.objects.all()
+    if user.is_management:
+        return Decision.objects.filter(event__project__created_by=user)
+    # Project users can only see decisions from events they participate in
+    return Decision.objects.filter(event__participants=user)
+
+
+def assignee_choices(user):
+    if user.is_admin or user.is_management:
+        return User.objects.all()
+    return User.objects.filter(role='project_user')
+
+
+def invitation_event_choices(user):
+    if user.is_admin:
+        return Event.objects.all()
+    if user.is_management:
+        return Event.objects.filter(project__created_by=user)
+    return Event.objects.filter(organizer=user)
+
+
+def invitee_choices(user):
+    return User.objects.exclude(id=user.id)
+
+
+USER_SEARCH_FIELDS = ['username', 'first_name', 'last_name']
+# The permissions page also finds users by email address
+PERMISSION_SEARCH_FIELDS = [*USER_SEARCH_FIELDS, 'email']
+TITLE_SEARCH_FIELDS = ['title']
+
+# Autocomplete scope -> (choices for a user, fields matched by prefix)
+AUTOCOMPLETE_SCOPES = {
+    'participants': (participant_choices, USER_SEARCH_FIELDS),
+    'linked-events': (linked_event_choices, TITLE_SEARCH_FIELDS),
+    'decision-events': (decision_event_choices, TITLE_SEARCH_FIELDS),
+    'deliverable-decisions': (deliverable_decision_choices, TITLE_SEARCH_FIELDS),
+    'assignees': (assignee_choices, USER_SEARCH_FIELDS),
+    'invitation-events': (invitation_event_choices, TITLE_SEARCH_FIELDS),
+    'invitees': (invitee_choices, USER_SEARCH_FIELDS),
+}
+
+
+def prefix_search(queryset, fields, term):
+    """
+    Case-insensitive prefix match on ``fields``, ordered by the first one.
+
+    The match is a range on ``LOWER(field)`` rather than a LIKE, so it can
+    use the functional indexes declared on the models.
+    """
+    annotations = {f'{field}_lower': Lower(field) for field in fields}
+    queryset = queryset.annotate(**annotations)
+    term = term.lower()
+    if term:
+        match = Q()
+        for alias in annotations:
+            match |= Q(**{f'{alias}__gte': term, f'{alias}__lt': term + '\U0010ffff'})
+        queryset = queryset.filter(match)
+    return queryset.order_by(f'{fields[0]}_lower', 'pk')
+
 
 class ProjectForm(forms.ModelForm):
     """Form for creating and editing projects"""
@@ -30,6 +173,9 @@ class EventForm(forms.ModelForm):
     class Meta:
         model = Event
         fields = ['project', 'title', 'description', 'agenda', 'start_time', 'end_time', 'venue', 'participants', 'linked_events']
+        field_classes = {
+            'linked_events': LabelledModelMultipleChoiceField,
+        }
         widgets = {
             'project': forms.Select(attrs={
                 'class': 'mt-1 block w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-indigo-500 focus:border-indigo-500'
@@ -60,11 +206,11 @@ class EventForm(forms.ModelForm):
                 'class': 'mt-1 block w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-indigo-500 focus:border-indigo-500',
                 'placeholder': 'Enter venue location'
             }),
-            'participants': forms.CheckboxSelectMultiple(attrs={
-                'class': 'mt-1'
+            'participants': AutocompleteSelectMultiple('participants', attrs={
+                'class': 'mt-1 block w-full'
             }),
-            'linked_events': forms.CheckboxSelectMultiple(attrs={
-                'class': 'mt-1'
+            'linked_events': AutocompleteSelectMultiple('linked-events', attrs={
+                'class': 'mt-1 block w-full'
             })
         }
     
@@ -81,25 +227,12 @@ class EventForm(forms.ModelForm):
         self.fields['linked_events'].help_text = "Select previous events that this event is related to or follows up on"
         
         if user:
-            if user.is_admin:
-                # Admin can see all projects and events
-                self.fields['project'].queryset = Project.objects.all()
-                self.fields['participants'].queryset = User.objects.all()
-                linked_events_queryset = Event.objects.all().order_by('-start_time')
-            elif user.is_management:
-                # Management can only see their projects and events
-                self.fields['project'].queryset = Project.objects.filter(created_by=user)
+            self.fields['project'].queryset = event_project_choices(user)
+            if user.is_management:
                 self.fields['project'].required = True
                 self.fields['project'].help_text = "Select the project this event belongs to"
-                self.fields['participants'].queryset = User.objects.all()
-                linked_events_queryset = Event.objects.filter(project__created_by=user).order_by('-start_time')
-            else:
-                # Project users can see projects and events they participate in
-                self.fields['project'].queryset = Project.objects.filter(
-                    events__participants=user
-                ).distinct()
-                self.fields['participants'].queryset = User.objects.all()
-                linked_events_queryset = Event.objects.filter(participants=user).order_by('-start_time')
+            self.fields['participants'].queryset = participant_choices(user)
+            linked_events_queryset = linked_event_choices(user).order_by('-start_time')
             
             # Exclude current event if editing (avoid self-reference)
             if self.instance and self.instance.pk:
@@ -114,8 +247,11 @@ class DecisionForm(forms.ModelForm):
     class Meta:
         model = Decision
         fields = ['event', 'title', 'description']
+        field_classes = {
+            'event': LabelledModelChoiceField,
+        }
         widgets = {
-            'event': forms.Select(attrs={
+            'event': AutocompleteSelect('decision-events', attrs={
                 'class': 'mt-1 block w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-indigo-500 focus:border-indigo-500'
             }),
             'title': forms.TextInput(attrs={
@@ -134,24 +270,17 @@ class DecisionForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         
         if user:
-            if user.is_admin:
-                self.fields['event'].queryset = Event.objects.all()
-            elif user.is_management:
-                self.fields['event'].queryset = Event.objects.filter(project__created_by=user)
-            else:
-                self.fields['event'].queryset = Event.objects.filter(
-                    participants=user
-                ).distinct()
+            self.fields['event'].queryset = decision_event_choices(user)
 
 
 class DeliverableForm(forms.ModelForm):
     """Form for creating and editing deliverables"""
     
-    decision = forms.ModelChoiceField(
+    decision = LabelledModelChoiceField(
         queryset=Decision.objects.all(),
         required=False,
         empty_label="No related decision",
-        widget=forms.Select(attrs={
+        widget=AutocompleteSelect('deliverable-decisions', attrs={
             'class': 'mt-1 block w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-indigo-500 focus:border-indigo-500'
         })
     )
@@ -169,7 +298,7 @@ class DeliverableForm(forms.ModelForm):
                 'rows': 3,
                 'placeholder': 'Describe the deliverable requirements'
             }),
-            'assigned_to': forms.Select(attrs={
+            'assigned_to': AutocompleteSelect('assignees', attrs={
                 'class': 'mt-1 block w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-indigo-500 focus:border-indigo-500'
             }),
             'due_date': forms.DateTimeInput(attrs={
@@ -187,22 +316,8 @@ class DeliverableForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         
         if user:
-            if user.is_admin:
-                base_decision_queryset = Decision.objects.all()
-                self.fields['assigned_to'].queryset = User.objects.all()
-            elif user.is_management:
-                base_decision_queryset = Decision.objects.filter(
-                    event__project__created_by=user
-                )
-                self.fields['assigned_to'].queryset = User.objects.all()
-            else:
-                # Project users can only see decisions from events they participate in
-                base_decision_queryset = Decision.objects.filter(
-                    event__participants=user
-                )
-                self.fields['assigned_to'].queryset = User.objects.filter(
-                    is_project_user=True
-                )
+            base_decision_queryset = deliverable_decision_choices(user)
+            self.fields['assigned_to'].queryset = assignee_choices(user)
             
             # If event_id is provided, show decisions from that event but keep it optional
             if event_id:
@@ -249,11 +364,14 @@ class InvitationForm(forms.ModelForm):
     class Meta:
         model = Invitation
         fields = ['event', 'invitee', 'message']
+        field_classes = {
+            'event': LabelledModelChoiceField,
+        }
         widgets = {
-            'event': forms.Select(attrs={
+            'event': AutocompleteSelect('invitation-events', attrs={
                 'class': 'mt-1 block w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-indigo-500 focus:border-indigo-500'
             }),
-            'invitee': forms.Select(attrs={
+            'invitee': AutocompleteSelect('invitees', attrs={
                 'class': 'mt-1 block w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-indigo-500 focus:border-indigo-500'
             }),
             'message': forms.Textarea(attrs={
@@ -268,18 +386,8 @@ class InvitationForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         
         if user:
-            if user.is_admin:
-                self.fields['event'].queryset = Event.objects.all()
-            elif user.is_management:
-                self.fields['event'].queryset = Event.objects.filter(
-                    project__created_by=user
-                )
-            else:
-                self.fields['event'].queryset = Event.objects.filter(
-                    organizer=user
-                )
-            
-            self.fields['invitee'].queryset = User.objects.exclude(id=user.id)
+            self.fields['event'].queryset = invitation_event_choices(user)
+            self.fields['invitee'].queryset = invitee_choices(user)
 
 
 class InvitationResponseForm(forms.ModelForm):
@@ -0,0 +1,69 @@
+from .models import Event, Invitation, BusyInterval
+
+
+def normalize_venue(venue):
+    """Normalize a venue name so spelling variants map to the same room"""
+    return ' '.join((venue or '').split()).casefold()
+
+
+def get_busy_user_ids(event):
+    """Users whose time is taken by an event: organizer, participants and accepted invitees"""
+    user_ids = set(event.participants.values_list('id', flat=True))
+    user_ids.update(
+        Invitation.objects.filter(event=event, status='accepted').values_list('invitee_id', flat=True)
+    )
+    user_ids.add(event.organizer_id)
+    return user_ids
+
+
+def rebuild_event_intervals(event):
+    """Replace all busy intervals of an event from its current state"""
+    BusyInterval.objects.filter(event=event).delete()
+
+    intervals = [
+        BusyInterval(event=event, user_id=user_id, start_time=event.start_time, end_time=event.end_time)
+        for user_id in get_busy_user_ids(event)
+    ]
+    venue = normalize_venue(event.venue)
+    if venue:
+        intervals.append(
+            BusyInterval(event=event, venue=venue, start_time=event.start_time, end_time=event.end_time)
+        )
+    BusyInterval.objects.bulk_create(intervals)
+
+
+def add_user_intervals(event, user_ids):
+    """Mark users as busy for the duration of an event"""
+    BusyInterval.objects.bulk_create(
+        [
+            BusyInterval(event=event, user_id=user_id, start_time=event.start_time, end_time=event.end_time)
+            for user_id in user_ids
+        ],
+        ignore_conflicts=True
+    )
+
+
+def remove_user_intervals(event, user_ids):
+    """Free users from an event unless they are still organizing, participating or accepted"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+
+    user_ids.discard(event.organizer_id)
+    user_ids.difference_update(
+        event.participants.filter(id__in=user_ids).values_list('id', flat=True)
+    )
+    user_ids.difference_update(
+        Invitation.objects.filter(
+            event=event, status='accepted', invitee_id__in=user_ids
+        ).values_list('invitee_id', flat=True)
+    )
+    if user_ids:
+        BusyInterval.objects.filter(event=event, user_id__in=user_ids).delete()
+
+
+def rebuild_all_intervals():
+    """Rebuild the busy-interval index for every event"""
+    BusyInterval.objects.all().delete()
+    for event in Event.objects.all().iterator():
+        rebuild_event_intervals(event)
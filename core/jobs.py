@@ -0,0 +1,281 @@
+"""
+Database-backed background jobs.
+
+Work that should not hold up a request is registered with ``@task`` and
+queued with ``enqueue()``. The job row is written in the caller's
+transaction, so it only becomes visible to ``runworker`` once the request
+commits, and it disappears if the request rolls back. No broker is needed:
+workers claim rows with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+database supports it, and with a conditional UPDATE per row elsewhere.
+
+A task registered with ``every=`` seconds is periodic: ``runworker`` queues
+it on start, and each run queues the next one ``every`` seconds after it
+finishes.
+
+With ``JOBS_RUN_EAGERLY`` each job instead runs in the queueing process
+once its transaction commits, as the test suite does.
+
+Tasks should be idempotent. A failed job is retried with exponential
+backoff until it has made ``max_attempts`` attempts, and a job whose worker
+died is requeued once its lease runs out: claiming a job leases it for
+``JOBS_TIMEOUT`` seconds, and the process running it renews the lease from
+a background thread until the job finishes, so a long job is never run
+twice while its worker is alive.
+"""
+import logging
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+PERIODIC_TASKS = {}
+
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -10
+
+
+class UnknownTask(LookupError):
+    pass
+
+
+def task(name, every=None):
+    """
+    Register a function as the task ``name``; its keyword arguments form the
+    payload. With ``every`` (seconds) it also runs on that schedule.
+    """
+    def register(func):
+        TASKS[name] = func
+        if every:
+            PERIODIC_TASKS[name] = every
+        return func
+    return register
+
+
+def run_eagerly():
+    """Whether queued jobs run in the queueing process rather than in ``runworker``"""
+    return getattr(settings, 'JOBS_RUN_EAGERLY', False)
+
+
+def enqueue(name, priority=PRIORITY_NORMAL, dedup_key=None, max_attempts=3, delay=None, **payload):
+    """
+    Queue ``name`` to run with ``payload`` (JSON-serialisable keyword arguments).
+
+    While a job with the same ``dedup_key`` is still queued, that job is
+    returned instead of queueing another, so bursts of the same work collapse
+    into one run. ``delay`` (seconds) postpones the first attempt.
+    """
+    if name not in TASKS:
+        raise UnknownTask(name)
+    fields = {
+        'name': name,
+        'payload': payload,
+        'priority': priority,
+        'dedup_key': dedup_key,
+        'max_attempts': max_attempts,
+        'run_after': timezone.now() + timedelta(seconds=delay or 0),
+    }
+
+    if dedup_key is None:
+        job = Job.objects.create(**fields)
+    else:
+        job = Job.objects.filter(dedup_key=dedup_key, status='queued').first()
+        if job is not None:
+            return job
+        try:
+            with transaction.atomic():
+                job = Job.objects.create(**fields)
+        except IntegrityError:
+            # Queued concurrently by another request
+            return Job.objects.get(dedup_key=dedup_key, status='queued')
+
+    if run_eagerly() and not delay:
+        # Tests without a worker: run once the caller commits
+        transaction.on_commit(lambda: run_claimed(job.pk))
+    return job
+
+
+def schedule_periodic_task(name, delay=None):
+    """Queue the next run of a periodic task unless one is already queued"""
+    return enqueue(name, priority=PRIORITY_LOW, dedup_key=f'periodic:{name}', delay=delay)
+
+
+def schedule_periodic_tasks():
+    """Make sure every periodic task has a queued run; new ones are due immediately"""
+    return [schedule_periodic_task(name) for name in PERIODIC_TASKS]
+
+
+# ============= CLAIMING =============
+
+def lease_duration():
+    return timedelta(seconds=getattr(settings, 'JOBS_TIMEOUT', 600))
+
+
+def due_jobs():
+    return Job.objects.filter(status='queued', run_after__lte=timezone.now()).order_by('-priority', 'run_after', 'id')
+
+
+def claim_job(job_id):
+    """Mark a queued job running and return it, or None if another worker took it"""
+    # Only one concurrent UPDATE can match the queued row
+    now = timezone.now()
+    claimed = Job.objects.filter(pk=job_id, status='queued').update(
+        status='running', started_at=now, locked_until=now + lease_duration(), attempts=F('attempts') + 1
+    )
+    return Job.objects.get(pk=job_id) if claimed else None
+
+
+def claim_jobs(limit=1):
+    """Claim up to ``limit`` due jobs, highest priority first"""
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            # Rows locked by other workers are skipped rather than waited on
+            job_ids = list(due_jobs().select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit])
+            now = timezone.now()
+            Job.objects.filter(pk__in=job_ids).update(
+                status='running', started_at=now, locked_until=now + lease_duration(), attempts=F('attempts') + 1
+            )
+        jobs = Job.objects.in_bulk(job_ids)
+        return [jobs[pk] for pk in job_ids]
+
+    # SQLite has no row locks but a single writer, so a conditional UPDATE
+    # per candidate is enough to keep two workers off the same job
+    jobs = []
+    while len(jobs) < limit:
+        job_ids = list(due_jobs().values_list('pk', flat=True)[:limit - len(jobs)])
+        if not job_ids:
+            break
+        jobs.extend(job for job in map(claim_job, job_ids) if job is not None)
+    return jobs
+
+
+def requeue_jobs(job_ids, error):
+    """Record a failed attempt for claimed jobs whose worker process died, queueing their retries"""
+    count = 0
+    for job in Job.objects.filter(pk__in=job_ids, status='running'):
+        count += finish_job(job, error)
+    return count
+
+
+def requeue_stale_jobs():
+    """Return running jobs whose lease ran out (their worker died) to the queue"""
+    stale = Job.objects.filter(status='running', locked_until__lt=timezone.now())
+    count = 0
+    for job in stale:
+        count += finish_job(job, 'Lease expired; the worker running the job stopped renewing it')
+    return count
+
+
+@contextmanager
+def renewing_lease(job):
+    """Keep extending ``job``'s lease from a background thread while the block runs"""
+    stop = threading.Event()
+
+    def renew():
+        try:
+            while not stop.wait(lease_duration().total_seconds() / 3):
+                try:
+                    Job.objects.filter(pk=job.pk, status='running').update(
+                        locked_until=timezone.now() + lease_duration()
+                    )
+                except DatabaseError:
+                    # The next renewal comes well before the lease runs out
+                    logger.exception('Could not renew the lease of job %s', job)
+        finally:
+            # The thread's own connection
+            connections.close_all()
+
+    thread = threading.Thread(target=renew, name=f'job-{job.pk}-lease', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+# ============= RUNNING =============
+
+def retry_delay(attempts):
+    """Exponential backoff: the base delay, doubled after each further failure"""
+    return timedelta(seconds=getattr(settings, 'JOBS_RETRY_DELAY', 30) * 2 ** (attempts - 1))
+
+
+def finish_job(job, error=None):
+    """Record a job's outcome, queueing a retry while it has attempts left; returns 1 if updated"""
+    job.finished_at = timezone.now()
+    job.last_error = error or ''
+    if error is None:
+        job.status = 'done'
+    elif job.attempts < job.max_attempts:
+        job.status = 'queued'
+        job.run_after = job.finished_at + retry_delay(job.attempts)
+    else:
+        job.status = 'failed'
+
+    fields = ['status', 'last_error', 'finished_at', 'run_after']
+    try:
+        with transaction.atomic():
+            # Only the worker that claimed the job may finish it
+            return Job.objects.filter(pk=job.pk, status='running').update(
+                **{field: getattr(job, field) for field in fields}
+            )
+    except IntegrityError:
+        # A newer job with the same dedup key is queued and will redo the work
+        job.status = 'failed'
+        return Job.objects.filter(pk=job.pk, status='running').update(
+            status='failed', last_error=job.last_error, finished_at=job.finished_at
+        )
+
+
+def run_job(job):
+    """Run a claimed job and record whether it finished, will retry or failed"""
+    func = TASKS.get(job.name)
+    try:
+        if func is None:
+            raise UnknownTask(job.name)
+        with renewing_lease(job), transaction.atomic():
+            func(**job.payload)
+    except Exception:
+        logger.exception('Job %s failed (attempt %s of %s)', job, job.attempts, job.max_attempts)
+        finish_job(job, traceback.format_exc())
+    else:
+        finish_job(job)
+
+    if job.name in PERIODIC_TASKS and job.status != 'queued':
+        # Finished for good (a retry keeps the schedule going by itself)
+        schedule_periodic_task(job.name, delay=PERIODIC_TASKS[job.name])
+    return job
+
+
+def run_claimed(job_id):
+    job = claim_job(job_id)
+    if job is not None:
+        run_job(job)
+
+
+def execute_job(job_id):
+    """Run a job claimed by another process (the ``runworker`` pool)"""
+    run_job(Job.objects.get(pk=job_id))
+
+
+def run_pending(limit=None):
+    """Run due jobs in this process until none are left or ``limit`` ran; returns the number run"""
+    count = 0
+    while limit is None or count < limit:
+        jobs = claim_jobs(1)
+        if not jobs:
+            break
+        run_job(jobs[0])
+        count += 1
+    return count
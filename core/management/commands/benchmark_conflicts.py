@@ -0,0 +1,70 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand
+
+from core.conflicts import find_overlapping_pairs
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the sweep-based conflict engine on synthetic events'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            nargs='+',
+            type=int,
+            default=[10_000, 100_000, 1_000_000],
+            help='Number of synthetic events for each run',
+        )
+        parser.add_argument(
+            '--events-per-day',
+            type=int,
+            default=50,
+            help='Scheduling density; held constant so overlaps grow linearly',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for reproducible runs',
+        )
+
+    def generate_events(self, size, events_per_day, rng):
+        """Generate (id, start, end) tuples spread evenly over time"""
+        origin = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+        span_minutes = max(size * 24 * 60 // events_per_day, 1)
+        events = []
+        for event_id in range(size):
+            start = origin + timedelta(minutes=rng.randrange(span_minutes))
+            duration = timedelta(minutes=rng.choice([30, 45, 60, 90, 120]))
+            events.append((event_id, start, start + duration))
+        return events
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        self.stdout.write(
+            f'{"events":>10} {"pairs":>12} {"seconds":>10} {"us/event":>10}'
+        )
+        baseline = None
+        for size in options['sizes']:
+            events = self.generate_events(size, options['events_per_day'], rng)
+
+            started = time.perf_counter()
+            pairs = find_overlapping_pairs(events)
+            elapsed = time.perf_counter() - started
+
+            per_event = elapsed / size * 1_000_000
+            baseline = baseline or per_event
+            self.stdout.write(
+                f'{size:>10} {len(pairs):>12} {elapsed:>10.3f} {per_event:>10.2f}'
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                'Near-linear scaling shows as a roughly constant us/event column '
+                f'(first run: {baseline:.2f} us/event).'
+            )
+        )
@@ -0,0 +1,94 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Project, Event, BusyInterval
+from core.scheduling import find_common_free_slots
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the free/busy slot finder against synthetic participant calendars'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--participants', type=int, default=50, help='Number of participants')
+        parser.add_argument('--days', type=int, default=365, help='Days of history per participant')
+        parser.add_argument('--meetings-per-day', type=int, default=4, help='Meetings per participant per day')
+        parser.add_argument('--runs', type=int, default=50, help='Number of timed slot searches')
+        parser.add_argument('--target-ms', type=float, default=50.0, help='Latency budget per search')
+
+    def create_calendars(self, options, rng):
+        """Bulk insert users, events and their busy intervals"""
+        users = User.objects.bulk_create([
+            User(username=f'bench_slots_{index}', role='project_user')
+            for index in range(options['participants'])
+        ])
+        organizer = users[0]
+        project = Project.objects.create(
+            name='Free slot benchmark', description='Synthetic data', created_by=organizer
+        )
+
+        origin = timezone.now().replace(hour=9, minute=0, second=0, microsecond=0)
+        history_start = origin - timedelta(days=options['days'])
+
+        for user in users:
+            slots = []
+            for day in range(options['days'] + 30):
+                day_start = history_start + timedelta(days=day)
+                for _ in range(options['meetings_per_day']):
+                    start = day_start + timedelta(minutes=15 * rng.randrange(32))
+                    slots.append((start, start + timedelta(minutes=rng.choice([30, 60, 90]))))
+
+            events = Event.objects.bulk_create([
+                Event(
+                    project=project, title='Busy', description='', agenda='',
+                    start_time=start, end_time=end, venue='', organizer=user
+                )
+                for start, end in slots
+            ], batch_size=500)
+            BusyInterval.objects.bulk_create([
+                BusyInterval(event=event, user=user, start_time=event.start_time, end_time=event.end_time)
+                for event in events
+            ], batch_size=500)
+
+        return users, origin
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+
+        with transaction.atomic():
+            self.stdout.write('Creating synthetic calendars...')
+            users, origin = self.create_calendars(options, rng)
+            user_ids = [user.id for user in users]
+            self.stdout.write(f'Busy intervals: {BusyInterval.objects.filter(user_id__in=user_ids).count()}')
+
+            timings = []
+            slots = []
+            for run in range(options['runs']):
+                window_start = origin - timedelta(days=rng.randrange(options['days']))
+                started = time.perf_counter()
+                slots = find_common_free_slots(
+                    user_ids, '', window_start, window_start + timedelta(days=14),
+                    timedelta(minutes=60), limit=5
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+
+            transaction.set_rollback(True)
+
+        timings.sort()
+        median = statistics.median(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(f'Slots found in last run: {len(slots)}')
+        self.stdout.write(f'median: {median:.1f} ms   p95: {p95:.1f} ms   max: {timings[-1]:.1f} ms')
+
+        if p95 <= options['target_ms']:
+            self.stdout.write(self.style.SUCCESS(f'p95 within the {options["target_ms"]:.0f} ms budget'))
+        else:
+            self.stdout.write(self.style.ERROR(f'p95 exceeds the {options["target_ms"]:.0f} ms budget'))
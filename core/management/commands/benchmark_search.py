@@ -0,0 +1,95 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Project, Event
+from core.search import get_backend, index_documents, search_documents
+
+User = get_user_model()
+
+VOCABULARY = (
+    'budget review roadmap launch hiring vendor contract audit migration security training '
+    'quarterly planning retrospective design research pricing support onboarding compliance '
+    'infrastructure marketing analytics partnership procurement release incident'
+).split()
+
+# A word only the first few events contain, so the match count stays fixed while the table grows
+NEEDLE = 'kestrel'
+NEEDLE_EVENTS = 20
+
+
+class Command(BaseCommand):
+    help = 'Compare full-text search latency with icontains scans as the event table grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+            help='Event counts to measure at (cumulative)'
+        )
+        parser.add_argument('--runs', type=int, default=30, help='Timed searches per size and method')
+
+    def sentence(self, rng, words):
+        return ' '.join(rng.choice(VOCABULARY) for _ in range(words))
+
+    def grow_events(self, project, organizer, count, rng, needles=0):
+        """Bulk insert events and index them (bulk_create skips the signals)"""
+        start = timezone.now()
+        events = Event.objects.bulk_create([
+            Event(
+                project=project,
+                title=self.sentence(rng, 3),
+                description=self.sentence(rng, 30) + (f' {NEEDLE}' if index < needles else ''),
+                agenda='', start_time=start, end_time=start + timedelta(hours=1),
+                venue='', organizer=organizer
+            )
+            for index in range(count)
+        ], batch_size=500)
+        index_documents(Event, [event.pk for event in events])
+
+    def time_runs(self, runs, search):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            search()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        if get_backend() is None:
+            raise CommandError('No full-text backend for this database')
+        rng = random.Random(7)
+
+        with transaction.atomic():
+            manager = User.objects.create_user('bench_search_manager', password=None, role='management')
+            project = Project.objects.create(
+                name='Search benchmark', description='Synthetic data', created_by=manager
+            )
+
+            total = 0
+            for size in sorted(options['sizes']):
+                self.grow_events(project, manager, size - total, rng, needles=0 if total else NEEDLE_EVENTS)
+                total = size
+
+                def full_text():
+                    search_documents(manager, NEEDLE, kinds=['event'], limit=20)
+
+                def like_scan():
+                    list(Event.objects.filter(project__created_by=manager).filter(
+                        Q(title__icontains=NEEDLE) |
+                        Q(description__icontains=NEEDLE) |
+                        Q(project__name__icontains=NEEDLE)
+                    ).order_by('-start_time').values_list('pk', flat=True)[:20])
+
+                self.stdout.write(
+                    f'{total:>7} events: full-text {self.time_runs(options["runs"], full_text):.1f} ms   '
+                    f'icontains {self.time_runs(options["runs"], like_scan):.1f} ms (median)'
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,161 @@
+import re
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from core.models import Project, Event, Decision, Deliverable
+
+User = get_user_model()
+
+# (URL name, role to request it as, model whose first row fills the pk argument)
+VIEW_REQUESTS = [
+    ('dashboard:admin_dashboard', 'admin', None),
+    ('dashboard:management_dashboard', 'management', None),
+    ('dashboard:project_user_dashboard', 'project_user', None),
+    ('dashboard:reports', 'admin', None),
+    ('dashboard:reports', 'management', None),
+    ('dashboard:reports', 'project_user', None),
+    ('dashboard:calendar_events_api', 'management', None),
+    ('dashboard:calendar_events_api', 'project_user', None),
+    ('dashboard:user_projects_api', 'project_user', None),
+    ('core:project_list', 'management', None),
+    ('core:project_detail', 'management', Project),
+    ('core:my_projects', 'project_user', None),
+    ('core:event_list', 'management', None),
+    ('core:event_detail', 'management', Event),
+    ('core:my_events', 'project_user', None),
+    ('core:decision_list', 'management', None),
+    ('core:decision_detail', 'management', Decision),
+    ('core:my_decisions', 'project_user', None),
+    ('core:deliverable_list', 'management', None),
+    ('core:deliverable_detail', 'management', Deliverable),
+    ('core:my_deliverables', 'project_user', None),
+    ('core:assigned_deliverables', 'management', None),
+    ('core:invitation_list', 'management', None),
+    ('core:my_invitations', 'project_user', None),
+    ('core:team_overview', 'management', None),
+    ('core:workload_distribution', 'management', None),
+    ('core:task_progress', 'project_user', None),
+    ('core:notification_list', 'project_user', None),
+    ('core:notification_count', 'project_user', None),
+    ('core:notification_dropdown', 'project_user', None),
+]
+
+# Plan lines that read a whole table, per database vendor
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'^SCAN (?P<table>\w+)(?! USING (COVERING )?INDEX)'),
+    'postgresql': re.compile(r'Seq Scan on (?P<table>\w+)'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Replay view queries against the current database and report full table scans in their plans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ignore-table',
+            action='append',
+            default=[],
+            dest='ignored_tables',
+            help='Do not report scans of this table (can be repeated)',
+        )
+        parser.add_argument('--verbose-plans', action='store_true', help='Print the plan of every query')
+        parser.add_argument(
+            '--fail-on-scan',
+            action='store_true',
+            help='Exit with an error when any full table scan is found',
+        )
+
+    def get_users(self):
+        users = {}
+        for role in ('admin', 'management', 'project_user'):
+            users[role] = User.objects.filter(role=role, is_active=True).order_by('pk').first()
+        return users
+
+    def explain(self, sql):
+        """Return the plan lines for one captured statement"""
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                return [row[-1] for row in cursor.fetchall()]
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN {sql}')
+            return [row[0] for row in cursor.fetchall()]
+
+    def capture_view_queries(self, users):
+        """Request every view as its role and collect the SELECTs each one runs"""
+        captured = []
+        for url_name, role, model in VIEW_REQUESTS:
+            user = users[role]
+            if user is None:
+                self.stdout.write(self.style.WARNING(f'Skipping {url_name}: no active {role} user'))
+                continue
+            args = []
+            if model is not None:
+                pk = model.objects.order_by('pk').values_list('pk', flat=True).first()
+                if pk is None:
+                    self.stdout.write(self.style.WARNING(f'Skipping {url_name}: no {model.__name__} rows'))
+                    continue
+                args = [pk]
+
+            client = Client()
+            client.force_login(user)
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(reverse(url_name, args=args))
+            selects = [
+                query['sql'] for query in queries.captured_queries
+                if query['sql'].lstrip().upper().startswith(('SELECT', 'WITH'))
+                and 'django_session' not in query['sql']
+            ]
+            captured.append((f'{url_name} ({role})', response.status_code, selects))
+        return captured
+
+    @override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'])
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'Query plans are not supported for the {connection.vendor} backend')
+
+        users = self.get_users()
+        ignored = set(options['ignored_tables'])
+        model_tables = set(connection.introspection.table_names())
+
+        scans = []
+        explained = {}
+        with transaction.atomic():
+            captured = self.capture_view_queries(users)
+            for view, status, selects in captured:
+                view_scans = set()
+                for sql in selects:
+                    if sql not in explained:
+                        explained[sql] = self.explain(sql)
+                    for line in explained[sql]:
+                        match = pattern.search(line.strip())
+                        if match and match.group('table') in model_tables - ignored:
+                            view_scans.add(match.group('table'))
+                    if options['verbose_plans']:
+                        self.stdout.write(f'  {sql}')
+                        for line in explained[sql]:
+                            self.stdout.write(f'      {line}')
+
+                summary = f'{view}: HTTP {status}, {len(selects)} queries'
+                if view_scans:
+                    scans.append((view, view_scans))
+                    self.stdout.write(self.style.WARNING(f'{summary}, full scans of {", ".join(sorted(view_scans))}'))
+                else:
+                    self.stdout.write(f'{summary}, no full scans')
+            # Logging in writes sessions; leave the database untouched
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'Explained {len(explained)} distinct queries from {len(captured)} views')
+        if not scans:
+            self.stdout.write(self.style.SUCCESS('No full table scans found'))
+        elif options['fail_on_scan']:
+            raise CommandError(f'{len(scans)} views run full table scans')
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(scans)} views run full table scans'))
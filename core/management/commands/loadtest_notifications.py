@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from core.models import Notification
+from core.pubsub import broker
+from core.streams import NOTIFICATION_STREAM_PATH, NotificationStream
+
+User = get_user_model()
+
+SECONDS_PER_HOUR = 3600
+
+
+class Command(BaseCommand):
+    help = 'Compare requests and queries per idle user per hour for count polling and the SSE stream'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Number of idle users (one tab each)')
+        parser.add_argument('--poll-interval', type=int, default=30, help='Seconds between count polls')
+        parser.add_argument('--seconds', type=float, default=10.0, help='Wall-clock duration of the stream run')
+        parser.add_argument(
+            '--speedup', type=float, default=360.0,
+            help='Stream timers run this much faster, so the run covers seconds * speedup of idle time'
+        )
+
+    def create_users(self, count):
+        """Create idle users with logged-in sessions, returning (user, session_key, client) tuples"""
+        sessions = []
+        for index in range(count):
+            user = User.objects.create_user(f'loadtest_notify_{index}', password=None, role='project_user')
+            client = Client()
+            client.force_login(user)
+            sessions.append((user, client.cookies[settings.SESSION_COOKIE_NAME].value, client))
+        return sessions
+
+    def measure_polling(self, sessions, interval):
+        """Time one poll of every user and count its queries"""
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _, _, client in sessions:
+                client.get('/core/notifications/count/')
+            elapsed = time.perf_counter() - started
+        requests_per_hour = SECONDS_PER_HOUR / interval
+        queries_per_request = len(queries.captured_queries) / len(sessions)
+        return {
+            'requests': requests_per_hour,
+            'queries': requests_per_hour * queries_per_request,
+            'queries_per_request': queries_per_request,
+            'ms_per_request': elapsed * 1000 / len(sessions),
+        }
+
+    async def run_streams(self, sessions, options):
+        stream = NotificationStream(keepalive=25 / options['speedup'], refresh=30 / options['speedup'])
+        stop = asyncio.Event()
+        received = [[] for _ in sessions]
+
+        def make_receive():
+            async def receive():
+                await stop.wait()
+                return {'type': 'http.disconnect'}
+            return receive
+
+        def make_send(index):
+            async def send(message):
+                if message['type'] == 'http.response.body':
+                    received[index].append((time.perf_counter(), message.get('body', b'')))
+            return send
+
+        tasks = []
+        for index, (_, session_key, _) in enumerate(sessions):
+            scope = {
+                'type': 'http',
+                'path': NOTIFICATION_STREAM_PATH,
+                'headers': [(b'cookie', f'{settings.SESSION_COOKIE_NAME}={session_key}'.encode())],
+            }
+            tasks.append(asyncio.ensure_future(stream(scope, make_receive(), make_send(index))))
+
+        await asyncio.sleep(options['seconds'] / 2)
+
+        # Push one notification mid-run and time its delivery
+        target_user = sessions[0][0]
+        before = len(received[0])
+        published = time.perf_counter()
+        await sync_to_async(Notification.objects.create)(
+            user=target_user, title='Load test', message='Pushed notification'
+        )
+        delivery_ms = None
+        while delivery_ms is None and time.perf_counter() - published < 5:
+            for sent_at, body in received[0][before:]:
+                if b'event: notification' in body:
+                    delivery_ms = (sent_at - published) * 1000
+            await asyncio.sleep(0.001)
+
+        await asyncio.sleep(options['seconds'] / 2)
+        subscribers = broker.subscriber_count()
+        stop.set()
+        await asyncio.gather(*tasks)
+        return received, delivery_ms, subscribers
+
+    @override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'])
+    def handle(self, *args, **options):
+        self.stdout.write(f'Creating {options["users"]} idle users...')
+        sessions = self.create_users(options['users'])
+        try:
+            polling = self.measure_polling(sessions, options['poll_interval'])
+
+            self.stdout.write('Streaming...')
+            with CaptureQueriesContext(connection) as queries:
+                received, delivery_ms, subscribers = async_to_sync(self.run_streams)(sessions, options)
+        finally:
+            User.objects.filter(pk__in=[user.pk for user, _, _ in sessions]).delete()
+
+        simulated_hours = options['seconds'] * options['speedup'] / SECONDS_PER_HOUR
+        users = len(sessions)
+        # The pushed notification's INSERT and COUNT are activity, not idle cost
+        idle_queries = len(queries.captured_queries) - 2
+        keepalives = sum(body.startswith(b':') for chunks in received for _, body in chunks)
+
+        self.stdout.write(f'Idle users: {users}   simulated idle time: {simulated_hours:.1f} h per user')
+        self.stdout.write(
+            f'Polling every {options["poll_interval"]} s: '
+            f'{polling["requests"]:.0f} requests/user/hour, '
+            f'{polling["queries_per_request"]:.1f} queries/request '
+            f'({polling["queries"]:.0f} queries/user/hour), '
+            f'{polling["ms_per_request"]:.1f} ms/request'
+        )
+        self.stdout.write(
+            f'SSE stream: {1 / simulated_hours:.1f} requests/user/hour, '
+            f'{idle_queries / users / simulated_hours:.1f} queries/user/hour, '
+            f'{keepalives / users / simulated_hours:.0f} keepalive comments/user/hour, '
+            f'{subscribers} open connections'
+        )
+        if delivery_ms is None:
+            self.stdout.write(self.style.ERROR('Pushed notification was not delivered'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Pushed notification delivered in {delivery_ms:.1f} ms'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.intervals import rebuild_all_intervals
+from core.models import BusyInterval
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-user and per-venue busy-interval index used for conflict detection'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding busy intervals...')
+
+        with transaction.atomic():
+            rebuild_all_intervals()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {BusyInterval.objects.count()} busy intervals.')
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.access import rebuild_all_event_access
+from core.models import EventAccess
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-user event access table used to filter visible events'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding event access...')
+
+        with transaction.atomic():
+            rebuild_all_event_access()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {EventAccess.objects.count()} event access rows.')
+        )
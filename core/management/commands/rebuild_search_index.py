@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.search import SEARCH_TABLE, get_backend, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of projects, events, decisions and deliverables'
+
+    def handle(self, *args, **options):
+        if get_backend() is None:
+            self.stdout.write(self.style.WARNING(
+                f'No full-text backend for {connection.vendor}; searches fall back to LIKE scans.'
+            ))
+            return
+
+        self.stdout.write('Rebuilding search index...')
+
+        with transaction.atomic():
+            rebuild_search_index()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {SEARCH_TABLE}')
+            count = cursor.fetchone()[0]
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} documents.'))
@@ -0,0 +1,140 @@
+import logging
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.jobs import (
+    claim_jobs, execute_job, requeue_jobs, requeue_stale_jobs, run_pending, schedule_periodic_tasks
+)
+from core.worker import setup_worker_process
+
+logger = logging.getLogger(__name__)
+
+# Seconds between sweeps for jobs whose worker died (and periodic tasks
+# left unscheduled)
+STALE_CHECK_INTERVAL = 60
+
+# Settings pool processes take from this one rather than the settings module
+SHARED_SETTINGS = ('DATABASES', 'CACHES')
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (invitation and notification fan-out)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=2,
+            help='Worker processes running jobs; 0 runs them in this process'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the queue once and exit, without scheduling periodic tasks'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Seconds to wait before polling an empty queue again'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options['processes'] > 0:
+                self.run_pool(options)
+            else:
+                self.run_inline(options)
+        except KeyboardInterrupt:
+            self.stdout.write('Worker stopped.')
+
+    def run_inline(self, options):
+        if options['once']:
+            self.stdout.write(self.style.SUCCESS(f'Ran {run_pending()} jobs.'))
+            return
+
+        self.stdout.write('Worker started, waiting for jobs (Ctrl+C to stop)...')
+        last_stale_check = 0
+        while True:
+            close_old_connections()
+            if time.monotonic() - last_stale_check > STALE_CHECK_INTERVAL:
+                requeue_stale_jobs()
+                schedule_periodic_tasks()
+                last_stale_check = time.monotonic()
+            count = run_pending(limit=100)
+            if count:
+                self.stdout.write(f'Ran {count} jobs.')
+            else:
+                time.sleep(options['sleep'])
+
+    def run_pool(self, options):
+        """Claim jobs here and run them in a pool of spawned processes, one job per free process"""
+        processes = options['processes']
+        self.stdout.write(f'Worker started with {processes} processes (Ctrl+C to stop)...')
+
+        self.ran = 0
+        self.last_stale_check = 0
+        while True:
+            in_flight = set()
+            try:
+                self.drain_pool(self.create_pool(processes), in_flight, options)
+                break
+            except BrokenProcessPool:
+                # A process died abruptly and took the pool down with every
+                # job it was running; record their attempt and start afresh
+                logger.exception('Worker pool broke, restarting it')
+                requeued = requeue_jobs(in_flight, 'Worker process died')
+                self.stdout.write(self.style.WARNING(
+                    f'Worker pool broke; requeued {requeued} jobs and restarted it.'
+                ))
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {self.ran} jobs.'))
+
+    def create_pool(self, processes):
+        overrides = {name: getattr(settings, name) for name in SHARED_SETTINGS}
+        return ProcessPoolExecutor(
+            processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=setup_worker_process,
+            initargs=(overrides,),
+        )
+
+    def drain_pool(self, pool, in_flight, options):
+        """
+        Keep ``pool`` busy until the queue is drained (with ``--once``).
+        ``in_flight`` holds the ids of the claimed jobs not finished yet,
+        for the caller to requeue when the pool breaks.
+        """
+        processes = options['processes']
+        futures = {}
+        with pool:
+            while True:
+                close_old_connections()
+                if time.monotonic() - self.last_stale_check > STALE_CHECK_INTERVAL:
+                    requeue_stale_jobs()
+                    if not options['once']:
+                        schedule_periodic_tasks()
+                    self.last_stale_check = time.monotonic()
+
+                for job in claim_jobs(processes - len(futures)):
+                    in_flight.add(job.pk)
+                    futures[pool.submit(execute_job, job.pk)] = job.pk
+
+                if not futures:
+                    if options['once']:
+                        return
+                    time.sleep(options['sleep'])
+                    continue
+
+                done, _ = wait(futures, timeout=options['sleep'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = futures.pop(future)
+                    try:
+                        future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception:
+                        logger.exception('Job %s could not be run in its worker process', job_id)
+                    in_flight.discard(job_id)
+                    self.ran += 1
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.reminders import send_deliverable_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        'Notify assignees of deliverables that became due soon or overdue since the last sweep '
+        '(runworker also runs this periodically)'
+    )
+
+    def handle(self, *args, **options):
+        notifications = send_deliverable_reminders()
+        self.stdout.write(self.style.SUCCESS(f'Sent {len(notifications)} deliverable reminders.'))
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_busy_intervals(apps, schema_editor):
+    Event = apps.get_model('core', 'Event')
+    Invitation = apps.get_model('core', 'Invitation')
+    BusyInterval = apps.get_model('core', 'BusyInterval')
+
+    intervals = []
+    for event in Event.objects.all().iterator():
+        user_ids = set(event.participants.values_list('id', flat=True))
+        user_ids.update(
+            Invitation.objects.filter(event=event, status='accepted').values_list('invitee_id', flat=True)
+        )
+        user_ids.add(event.organizer_id)
+        for user_id in user_ids:
+            intervals.append(BusyInterval(
+                event=event, user_id=user_id, start_time=event.start_time, end_time=event.end_time
+            ))
+        venue = ' '.join((event.venue or '').split()).casefold()
+        if venue:
+            intervals.append(BusyInterval(
+                event=event, venue=venue, start_time=event.start_time, end_time=event.end_time
+            ))
+    BusyInterval.objects.bulk_create(intervals, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_alter_notification_notification_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusyInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('venue', models.CharField(blank=True, default='', max_length=255)),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='busy_intervals', to='core.event')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='busy_intervals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'end_time', 'start_time'], name='core_busyin_user_id_3451d4_idx'), models.Index(fields=['venue', 'end_time', 'start_time'], name='core_busyin_venue_99ee5a_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('user__isnull', False)), fields=('event', 'user'), name='unique_busy_interval_user'), models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('event',), name='unique_busy_interval_venue')],
+            },
+        ),
+        migrations.RunPython(populate_busy_intervals, migrations.RunPython.noop),
+    ]
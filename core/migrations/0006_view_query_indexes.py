@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_busyinterval'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='decision',
+            index=models.Index(fields=['event', 'created_at'], name='core_decisi_event_i_bd3858_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deliverable',
+            index=models.Index(fields=['assigned_to', 'status', 'due_date'], name='core_delive_assigne_296d1c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_time', 'end_time'], name='core_event_start_t_0aa7f6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['project', 'start_time'], name='core_event_project_480c43_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invitation',
+            index=models.Index(fields=['invitee', 'status'], name='core_invita_invitee_9d2cc9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', 'created_at'], name='core_notifi_user_id_bd535f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'created_at'], name='core_notifi_user_id_7862c3_idx'),
+        ),
+    ]
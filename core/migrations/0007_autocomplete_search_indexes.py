@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:57
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_view_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='decision',
+            index=models.Index(django.db.models.functions.text.Lower('title'), name='core_decision_title_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(django.db.models.functions.text.Lower('title'), name='core_event_title_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+from django.db import migrations
+
+SEARCH_TABLE = 'core_search_index'
+
+CREATE_SQL = {
+    'sqlite': (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        f"kind UNINDEXED, object_id UNINDEXED, title, body, "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    ),
+    'mysql': (
+        f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+        f'kind varchar(20) NOT NULL, object_id bigint NOT NULL, '
+        f'title longtext NOT NULL, body longtext NOT NULL, '
+        f'PRIMARY KEY (kind, object_id), '
+        f'FULLTEXT KEY {SEARCH_TABLE}_text (title, body)'
+        f') ENGINE=InnoDB'
+    ),
+}
+
+DOCUMENTS = [
+    ('project', 'Project', ['name'], ['description']),
+    ('event', 'Event', ['title'], ['description', 'venue', 'project__name']),
+    ('decision', 'Decision', ['title'], ['description']),
+    ('deliverable', 'Deliverable', ['title'], ['description', 'notes']),
+]
+
+
+def create_search_index(apps, schema_editor):
+    create_sql = CREATE_SQL.get(schema_editor.connection.vendor)
+    if create_sql is None:
+        # Other databases search with LIKE scans and keep no index
+        return
+    schema_editor.execute(create_sql)
+
+    sql = f'INSERT INTO {SEARCH_TABLE} (kind, object_id, title, body) VALUES (%s, %s, %s, %s)'
+    with schema_editor.connection.cursor() as cursor:
+        for kind, model_name, title_fields, body_fields in DOCUMENTS:
+            model = apps.get_model('core', model_name)
+            rows = []
+            for values in model.objects.values_list('pk', *title_fields, *body_fields).iterator():
+                texts = [text or '' for text in values[1:]]
+                rows.append((
+                    kind,
+                    values[0],
+                    ' '.join(texts[:len(title_fields)]),
+                    ' '.join(text for text in texts[len(title_fields):] if text),
+                ))
+            if rows:
+                cursor.executemany(sql, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE_SQL:
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_autocomplete_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
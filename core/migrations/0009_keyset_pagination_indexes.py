@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='decision',
+            index=models.Index(fields=['created_at', 'id'], name='core_decisi_created_1a0268_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deliverable',
+            index=models.Index(fields=['created_at', 'id'], name='core_delive_created_53b552_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_time', 'id'], name='core_event_start_t_89e3b5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['created_at', 'id'], name='core_projec_created_0e372b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['created_by', 'created_at', 'id'], name='core_projec_created_9cec42_idx'),
+        ),
+    ]
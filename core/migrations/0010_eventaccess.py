@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_event_access(apps, schema_editor):
+    Event = apps.get_model('core', 'Event')
+    Invitation = apps.get_model('core', 'Invitation')
+    EventAccess = apps.get_model('core', 'EventAccess')
+    rows = [
+        EventAccess(event_id=event_id, user_id=user_id, relation='organizer')
+        for event_id, user_id in Event.objects.values_list('id', 'organizer_id').iterator()
+    ]
+    rows.extend(
+        EventAccess(event_id=event_id, user_id=user_id, relation='participant')
+        for event_id, user_id in Event.participants.through.objects.values_list('event_id', 'customuser_id').iterator()
+    )
+    rows.extend(
+        EventAccess(event_id=event_id, user_id=user_id, relation='invitee')
+        for event_id, user_id in Invitation.objects.values_list('event_id', 'invitee_id').iterator()
+    )
+    EventAccess.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('relation', models.CharField(choices=[('organizer', 'Organizer'), ('participant', 'Participant'), ('invitee', 'Invitee')], max_length=20)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access', to='core.event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_access', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'relation', 'event'), name='unique_event_access')],
+            },
+        ),
+        migrations.RunPython(populate_event_access, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_job'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='core_job_status_e35e2c_idx',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='dedup_key',
+            field=models.CharField(blank=True, help_text='Queueing a job while another with this key is queued returns the queued one', max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='max_attempts',
+            field=models.PositiveIntegerField(default=3),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='priority',
+            field=models.SmallIntegerField(default=0, help_text='Higher priorities run first'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='run_after',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Not claimed before this time'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', '-priority', 'run_after', 'id'], name='core_job_claim_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'queued')), fields=('dedup_key',), name='unique_queued_job_dedup_key'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_deliverable_reminders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='count',
+            field=models.PositiveIntegerField(default=1, help_text='Occurrences merged into this notification, see core.fanout'),
+        ),
+    ]
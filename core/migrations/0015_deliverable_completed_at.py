@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:08
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_completed_at(apps, schema_editor):
+    # The last write is the best record of when existing deliverables were completed
+    Deliverable = apps.get_model('core', 'Deliverable')
+    Deliverable.objects.filter(status='completed').update(completed_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_notification_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deliverable',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_completed_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_reminder_kind(apps, schema_editor):
+    # Reminders sent so far only recorded their kind in the title
+    Notification = apps.get_model('core', 'Notification')
+    reminders = Notification.objects.filter(notification_type='deliverable_due')
+    reminders.filter(title__startswith='Deliverable overdue').update(reminder_kind='overdue')
+    reminders.filter(title__startswith='Deliverable due soon').update(reminder_kind='due_soon')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_deliverable_completed_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='reminder_kind',
+            field=models.CharField(blank=True, choices=[('due_soon', 'Due soon'), ('overdue', 'Overdue')], help_text='Which deliverable reminder this is, see core.reminders', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='deliverable',
+            index=models.Index(fields=['updated_at'], name='core_delive_updated_fcbf74_idx'),
+        ),
+        migrations.RunPython(backfill_reminder_kind, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_notification_reminder_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='held',
+            field=models.BooleanField(default=False, help_text="Kept back for the user's next digest, see core.digests"),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('event_invitation', 'Event Invitation'), ('invitation_response', 'Invitation Response'), ('event_update', 'Event Update'), ('decision_created', 'Decision Created'), ('deliverable_assigned', 'Deliverable Assigned'), ('deliverable_due', 'Deliverable Due Soon'), ('system', 'System Notification'), ('digest', 'Notification Digest')], default='system', max_length=20),
+        ),
+    ]
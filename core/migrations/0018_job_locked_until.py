@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:37
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def lease_running_jobs(apps, schema_editor):
+    # Jobs already running keep the time their old timeout gave them
+    Job = apps.get_model('core', 'Job')
+    Job.objects.filter(status='running').update(
+        locked_until=F('started_at') + timedelta(seconds=getattr(settings, 'JOBS_TIMEOUT', 600))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_notification_held'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, help_text='Lease of a running job, renewed while its worker is alive', null=True),
+        ),
+        migrations.RunPython(lease_running_jobs, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -22,6 +24,11 @@ class Project(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the list views seeks on (ordering field, id)
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['created_by', 'created_at', 'id']),
+        ]
 
 
 class Event(models.Model):
@@ -58,22 +65,26 @@ class Event(models.Model):
     
     def has_conflicts(self):
         """Check if this event conflicts with other events"""
-        conflicting_events = Event.objects.filter(
-            start_time__lt=self.end_time,
-            end_time__gt=self.start_time
-        ).exclude(id=self.id)
-        
-        return conflicting_events.exists()
+        return bool(self.get_conflicting_event_ids())
+    
+    def get_conflicting_event_ids(self):
+        """Get ids of conflicting events via the sweep-based conflict engine"""
+        from .conflicts import find_conflicts
+        return find_conflicts([self]).get(self.pk, set())
     
     def get_conflicting_events(self):
         """Get list of conflicting events"""
-        return Event.objects.filter(
-            start_time__lt=self.end_time,
-            end_time__gt=self.start_time
-        ).exclude(id=self.id)
+        return Event.objects.filter(pk__in=self.get_conflicting_event_ids())
     
     class Meta:
         ordering = ['-start_time']
+        indexes = [
+            models.Index(fields=['start_time', 'end_time']),
+            models.Index(fields=['project', 'start_time']),
+            models.Index(fields=['start_time', 'id']),
+            # Prefix search in the autocomplete pickers
+            models.Index(Lower('title'), name='core_event_title_lower_idx'),
+        ]
 
 
 class Decision(models.Model):
@@ -90,6 +101,11 @@ class Decision(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['event', 'created_at']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(Lower('title'), name='core_decision_title_lower_idx'),
+        ]
 
 
 class Deliverable(models.Model):
@@ -127,12 +143,24 @@ class Deliverable(models.Model):
         default='pending'
     )
     due_date = models.DateTimeField(blank=True, null=True)
+    completed_at = models.DateTimeField(blank=True, null=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.title} - {self.assigned_to.username}"
     
+    def save(self, *args, **kwargs):
+        """Stamp when the deliverable was completed; later edits keep the stamp"""
+        if self.status != 'completed':
+            self.completed_at = None
+        elif self.completed_at is None:
+            self.completed_at = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'completed_at'}
+        super().save(*args, **kwargs)
+    
     @property
     def is_overdue(self):
         """Check if deliverable is overdue"""
@@ -143,6 +171,13 @@ class Deliverable(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['assigned_to', 'status', 'due_date']),
+            models.Index(fields=['created_at', 'id']),
+            # Range seeks of the reminder sweep (core.reminders)
+            models.Index(fields=['status', 'due_date']),
+            models.Index(fields=['updated_at']),
+        ]
 
 
 class Invitation(models.Model):
@@ -176,6 +211,9 @@ class Invitation(models.Model):
     class Meta:
         unique_together = ['event', 'invitee']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['invitee', 'status']),
+        ]
 
 
 class EventLink(models.Model):
@@ -209,6 +247,69 @@ class EventLink(models.Model):
         unique_together = ['source_event', 'target_event']
 
 
+class BusyInterval(models.Model):
+    """Time a user or venue is booked by an event, kept in sync by signals"""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='busy_intervals')
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='busy_intervals',
+        null=True,
+        blank=True
+    )
+    # Normalized venue name; blank for user intervals
+    venue = models.CharField(max_length=255, blank=True, default='')
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    
+    def __str__(self):
+        return f"{self.user_id or self.venue}: {self.start_time} - {self.end_time}"
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'end_time', 'start_time']),
+            models.Index(fields=['venue', 'end_time', 'start_time']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['event', 'user'],
+                condition=models.Q(user__isnull=False),
+                name='unique_busy_interval_user'
+            ),
+            models.UniqueConstraint(
+                fields=['event'],
+                condition=models.Q(user__isnull=True),
+                name='unique_busy_interval_venue'
+            ),
+        ]
+
+
+class EventAccess(models.Model):
+    """Why a user can see an event: one row per relation, kept in sync by signals"""
+    
+    RELATION_CHOICES = [
+        ('organizer', 'Organizer'),
+        ('participant', 'Participant'),
+        ('invitee', 'Invitee'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='event_access')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='access')
+    relation = models.CharField(max_length=20, choices=RELATION_CHOICES)
+    
+    def __str__(self):
+        return f"{self.user_id} -> {self.event_id} ({self.relation})"
+    
+    class Meta:
+        constraints = [
+            # Also the index behind "events this user can see"
+            models.UniqueConstraint(
+                fields=['user', 'relation', 'event'],
+                name='unique_event_access'
+            ),
+        ]
+
+
 class Notification(models.Model):
     """Notification model for user notifications"""
     
@@ -220,6 +321,12 @@ class Notification(models.Model):
         ('deliverable_assigned', 'Deliverable Assigned'),
         ('deliverable_due', 'Deliverable Due Soon'),
         ('system', 'System Notification'),
+        ('digest', 'Notification Digest'),
+    ]
+    
+    REMINDER_CHOICES = [
+        ('due_soon', 'Due soon'),
+        ('overdue', 'Overdue'),
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
@@ -227,6 +334,16 @@ class Notification(models.Model):
     message = models.TextField()
     notification_type = models.CharField(max_length=20, choices=TYPE_CHOICES, default='system')
     is_read = models.BooleanField(default=False)
+    count = models.PositiveIntegerField(
+        default=1, help_text="Occurrences merged into this notification, see core.fanout"
+    )
+    reminder_kind = models.CharField(
+        max_length=10, choices=REMINDER_CHOICES, blank=True,
+        help_text="Which deliverable reminder this is, see core.reminders"
+    )
+    held = models.BooleanField(
+        default=False, help_text="Kept back for the user's next digest, see core.digests"
+    )
     
     # Related objects for context
     event = models.ForeignKey(Event, on_delete=models.CASCADE, null=True, blank=True)
@@ -250,7 +367,71 @@ class Notification(models.Model):
             return f"/core/deliverables/{self.deliverable.pk}/"
         elif self.invitation:
             return f"/core/invitations/"
+        elif self.notification_type == 'digest':
+            return "/core/notifications/"
         return "#"
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read', 'created_at']),
+            models.Index(fields=['user', 'created_at']),
+        ]
+
+
+class Job(models.Model):
+    """A unit of background work for the ``runworker`` command"""
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=100, help_text="Registered task name, see core.jobs")
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    priority = models.SmallIntegerField(default=0, help_text="Higher priorities run first")
+    dedup_key = models.CharField(
+        max_length=200, null=True, blank=True,
+        help_text="Queueing a job while another with this key is queued returns the queued one"
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    last_error = models.TextField(blank=True)
+    
+    run_after = models.DateTimeField(default=timezone.now, help_text="Not claimed before this time")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    locked_until = models.DateTimeField(
+        null=True, blank=True, help_text="Lease of a running job, renewed while its worker is alive"
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            # The worker's scan for the next due job
+            models.Index(fields=['status', '-priority', 'run_after', 'id'], name='core_job_claim_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedup_key'], condition=models.Q(status='queued'),
+                name='unique_queued_job_dedup_key'
+            ),
+        ]
+
+
+class SweepCheckpoint(models.Model):
+    """How far a periodic sweep has got, so each run resumes where the last one stopped"""
+    
+    name = models.CharField(max_length=100, unique=True)
+    swept_until = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} (swept until {self.swept_until})"
@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Notification
+from .pubsub import broker
+
+
+def notification_payload(notification):
+    """JSON-serialisable representation used by the dropdown and the stream"""
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'type': notification.notification_type,
+        'is_read': notification.is_read,
+        'count': notification.count,
+        'created_at': notification.created_at.strftime('%B %d, %Y at %I:%M %p'),
+        'url': notification.get_url()
+    }
+
+
+def unread_count_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user_id):
+    """Unread notification count from the cache, recounted from the database on a miss"""
+    key = unread_count_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False, held=False).count()
+        cache.add(key, count, settings.NOTIFICATION_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def adjust_unread_count(user_id, delta):
+    """Apply ``delta`` to a cached unread count once the transaction commits"""
+    def adjust():
+        key = unread_count_key(user_id)
+        try:
+            if cache.incr(key, delta) < 0:
+                cache.delete(key)
+        except ValueError:
+            # Not cached; the next read recounts
+            pass
+    transaction.on_commit(adjust)
+
+
+def reset_unread_count(user_id):
+    """Drop a cached unread count once the transaction commits so it is recounted"""
+    transaction.on_commit(lambda: cache.delete(unread_count_key(user_id)))
+
+
+def publish_unread_count(user_id):
+    """Push the user's unread count to their open streams once the transaction commits"""
+    def publish():
+        if broker.has_subscribers(user_id):
+            broker.publish(user_id, {'event': 'count', 'unread_count': unread_count(user_id)})
+    transaction.on_commit(publish)
+
+
+def publish_notification(notification):
+    """Push a new notification and the updated unread count once the transaction commits"""
+    def publish():
+        if broker.has_subscribers(notification.user_id):
+            broker.publish(notification.user_id, {
+                'event': 'notification',
+                'notification': notification_payload(notification),
+                'unread_count': unread_count(notification.user_id),
+            })
+    transaction.on_commit(publish)
@@ -0,0 +1,118 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage:
+    """
+    One page of a ``KeysetPaginator``. Iterates like a ``Page`` but links to
+    its neighbours by cursor instead of page number.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination keyed on ``(ordering field, pk)``.
+
+    Each page is a range seek from the last row of the previous one, so it
+    costs the same at any depth and needs no ``COUNT(*)``. Rows inserted
+    while someone pages do not shift later pages the way an OFFSET does.
+    The ordering field must be non-null.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.descending = ordering.startswith('-')
+        self.field_name = ordering.lstrip('-')
+        self.field = queryset.model._meta.get_field(self.field_name)
+        self.per_page = per_page
+
+    def encode_cursor(self, obj, direction):
+        key = [direction, self.field.value_to_string(obj), obj.pk]
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if direction not in ('next', 'previous'):
+                raise ValueError(direction)
+            return direction, self.field.to_python(value), int(pk)
+        except (ValueError, TypeError, binascii.Error, ValidationError) as e:
+            raise InvalidCursor(cursor) from e
+
+    def seek(self, queryset, value, pk, forward):
+        """Rows strictly after ``(value, pk)`` in the ordering, or strictly before it"""
+        after = forward != self.descending
+        field_lookup = f'{self.field_name}__{"gte" if after else "lte"}'
+        strict_lookup = f'{self.field_name}__{"gt" if after else "lt"}'
+        pk_lookup = f'pk__{"gt" if after else "lt"}'
+        # The outer range on the field alone lets the database seek its index
+        return queryset.filter(**{field_lookup: value}).filter(
+            Q(**{strict_lookup: value}) | Q(**{self.field_name: value, pk_lookup: pk})
+        )
+
+    def ordered(self, queryset, forward):
+        descending = self.descending == forward
+        prefix = '-' if descending else ''
+        return queryset.order_by(f'{prefix}{self.field_name}', f'{prefix}pk')
+
+    def get_page(self, cursor=None):
+        """The page after (or before) ``cursor``; the first page when it is missing or invalid"""
+        direction, value, pk = 'next', None, None
+        if cursor:
+            try:
+                direction, value, pk = self.decode_cursor(cursor)
+            except InvalidCursor:
+                pass
+
+        forward = direction == 'next'
+        queryset = self.queryset
+        if pk is not None:
+            queryset = self.seek(queryset, value, pk, forward)
+        # Seek the page's keys without the select_related joins, which can
+        # stop the database from reading the ordering index, then load them
+        keys = list(self.ordered(queryset, forward).values_list('pk', flat=True)[:self.per_page + 1])
+        has_more = len(keys) > self.per_page
+        keys = keys[:self.per_page]
+        objects = self.queryset.order_by().in_bulk(keys)
+        rows = [objects[pk] for pk in keys if pk in objects]
+
+        if forward:
+            has_next, has_previous = has_more, pk is not None
+        else:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+
+        next_cursor = self.encode_cursor(rows[-1], 'next') if rows and has_next else None
+        previous_cursor = self.encode_cursor(rows[0], 'previous') if rows and has_previous else None
+        return KeysetPage(rows, next_cursor, previous_cursor)
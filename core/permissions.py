@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from .access import UPDATE, object_permissions
+
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
@@ -70,7 +72,7 @@ class CanManageProject(permissions.BasePermission):
         
         # Management users can only manage their own projects
         if request.user.is_management:
-            return obj.created_by == request.user
+            return object_permissions(request).can_manage(obj)
         
         # Project users can only view
         if request.method in permissions.SAFE_METHODS:
@@ -85,23 +87,11 @@ class CanManageEvent(permissions.BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        # Admin can do anything
-        if request.user.is_admin:
-            return True
-        
-        # Event organizer can manage
-        if obj.organizer == request.user:
-            return True
-        
-        # Project creator can manage events in their project
-        if request.user.is_management and obj.project.created_by == request.user:
-            return True
-        
         # Project users can only view
         if request.method in permissions.SAFE_METHODS:
             return True
         
-        return False
+        return object_permissions(request).can_edit(obj)
 
 
 class CanUpdateDeliverable(permissions.BasePermission):
@@ -110,25 +100,9 @@ class CanUpdateDeliverable(permissions.BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        # Admin can do anything
-        if request.user.is_admin:
-            return True
-        
-        # Assigned user can update progress and notes
-        if obj.assigned_to == request.user:
-            return True
-        
-        # Decision creator can manage deliverable
-        if obj.decision.created_by == request.user:
-            return True
-        
-        # Project creator can manage deliverables in their project
-        if (request.user.is_management and 
-            obj.decision.event.project.created_by == request.user):
-            return True
-        
         # Others can only view
         if request.method in permissions.SAFE_METHODS:
             return True
         
-        return False
\ No newline at end of file
+        # Assigned users, decision creators and project owners
+        return object_permissions(request).has(obj, UPDATE)
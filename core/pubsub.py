@@ -0,0 +1,62 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+
+class LocalBroker:
+    """
+    In-process fan-out of per-user messages to asyncio queues.
+
+    Subscribers are stream connections running on an event loop; publishers
+    are usually synchronous code (views, signals) running in a worker
+    thread, so messages are handed over with ``call_soon_threadsafe``.
+    Only connections served by the same process see a message.
+    """
+
+    def __init__(self, max_queued=100):
+        self.max_queued = max_queued
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """Register a queue for ``user_id`` on the running event loop"""
+        subscription = (asyncio.get_running_loop(), asyncio.Queue(maxsize=self.max_queued))
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[user_id]
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscribers
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def publish(self, user_id, message):
+        """Queue ``message`` for every connection of ``user_id``; safe from any thread"""
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscriptions:
+            try:
+                loop.call_soon_threadsafe(self._enqueue, queue, message)
+            except RuntimeError:
+                # The connection's loop has already been closed
+                pass
+
+    @staticmethod
+    def _enqueue(queue, message):
+        if queue.full():
+            # A stalled client only needs the latest state; drop the oldest message
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+
+broker = LocalBroker()
@@ -0,0 +1,117 @@
+"""
+Deliverable due-soon and overdue reminders.
+
+A periodic job sweeps the time window between its previous run and now. An
+open deliverable whose due date falls ``DELIVERABLE_DUE_SOON`` seconds past
+that window has just become due soon, and one due inside the window has
+just become overdue. Deliverables created, reopened or rescheduled during
+the window are checked as well, since their due date may already be inside
+the lead time or past. All three are range seeks, on the (status, due_date)
+and updated_at indexes, so a run costs the number of deliverables crossing
+a threshold or changed rather than a scan of the table. The window's end is
+saved with the notifications in one transaction: a run that fails is redone
+over the same window by its retry, and the next run starts where it stopped.
+
+Each assignee gets at most one due-soon and one overdue reminder per
+deliverable, recorded in ``Notification.reminder_kind``; reminders already
+sent are skipped, so a sweep repeated over the same window inserts nothing.
+"""
+from datetime import timedelta
+from itertools import chain
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .fanout import create_notifications
+from .jobs import task
+from .models import Deliverable, Notification, SweepCheckpoint
+
+SWEEP_NAME = 'deliverable-reminders'
+
+OPEN_STATUSES = ['pending', 'in-progress']
+
+DUE_SOON = 'due_soon'
+OVERDUE = 'overdue'
+
+TITLES = {DUE_SOON: 'Deliverable due soon', OVERDUE: 'Deliverable overdue'}
+
+
+def due_soon_delta():
+    return timedelta(seconds=getattr(settings, 'DELIVERABLE_DUE_SOON', 24 * 60 * 60))
+
+
+def open_deliverables_due(after, until):
+    """Open deliverables due in ``(after, until]``"""
+    return Deliverable.objects.filter(
+        status__in=OPEN_STATUSES, due_date__gt=after, due_date__lte=until
+    ).order_by()
+
+
+def open_deliverables_changed(after, until, due_by):
+    """Open deliverables written in ``(after, until]`` and due by ``due_by``"""
+    return Deliverable.objects.filter(
+        status__in=OPEN_STATUSES, updated_at__gt=after, updated_at__lte=until, due_date__lte=due_by
+    ).order_by()
+
+
+def reminder(deliverable, kind):
+    due = timezone.localtime(deliverable.due_date).strftime("%B %d, %Y at %I:%M %p")
+    if kind == OVERDUE:
+        message = f'"{deliverable.title}" was due on {due} and is not completed yet'
+    else:
+        message = f'"{deliverable.title}" is due on {due}'
+    return Notification(
+        user_id=deliverable.assigned_to_id,
+        title=f'{TITLES[kind]}: {deliverable.title}',
+        message=message,
+        notification_type='deliverable_due',
+        reminder_kind=kind,
+        deliverable=deliverable
+    )
+
+
+@task('core.send_deliverable_reminders', every=getattr(settings, 'DELIVERABLE_REMINDER_INTERVAL', 15 * 60))
+def send_deliverable_reminders(now=None):
+    """Notify assignees of deliverables that became due soon or overdue since the last sweep"""
+    now = now or timezone.now()
+    lead = due_soon_delta()
+
+    with transaction.atomic():
+        # The first sweep looks back one lead time rather than over all history
+        checkpoint, _ = SweepCheckpoint.objects.select_for_update().get_or_create(
+            name=SWEEP_NAME, defaults={'swept_until': now - lead}
+        )
+        since = checkpoint.swept_until
+        if since >= now:
+            return []
+
+        due = {
+            deliverable.pk: deliverable
+            for deliverable in chain(
+                open_deliverables_due(since, now),
+                open_deliverables_due(max(since + lead, now), now + lead),
+                open_deliverables_changed(since, now, now + lead),
+            )
+        }
+        # A deliverable already overdue only gets the overdue reminder
+        crossed = [
+            (deliverable, OVERDUE if deliverable.due_date <= now else DUE_SOON)
+            for deliverable in due.values()
+        ]
+
+        sent = set()
+        if crossed:
+            sent = set(Notification.objects.filter(
+                deliverable_id__in=due, reminder_kind__in=TITLES
+            ).order_by().values_list('user_id', 'deliverable_id', 'reminder_kind'))
+
+        notifications = create_notifications(
+            reminder(deliverable, kind)
+            for deliverable, kind in crossed
+            if (deliverable.assigned_to_id, deliverable.pk, kind) not in sent
+        )
+
+        checkpoint.swept_until = now
+        checkpoint.save(update_fields=['swept_until', 'updated_at'])
+    return notifications
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.db.models import Q
+
+from .intervals import normalize_venue
+from .models import BusyInterval
+
+
+def get_busy_intervals(user_ids, venue, window_start, window_end):
+    """Load the busy intervals of the given users and venue that touch the window in one query"""
+    resource_filter = Q(user_id__in=list(user_ids))
+    venue = normalize_venue(venue)
+    if venue:
+        resource_filter |= Q(user__isnull=True, venue=venue)
+
+    return list(
+        BusyInterval.objects.filter(
+            resource_filter,
+            start_time__lt=window_end,
+            end_time__gt=window_start
+        ).order_by().values_list('start_time', 'end_time')
+    )
+
+
+def merge_intervals(intervals):
+    """Merge overlapping or touching (start, end) intervals into a sorted disjoint list"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def _align(moment, granularity):
+    """Round a datetime up to the next multiple of ``granularity`` past the hour"""
+    remainder = timedelta(
+        minutes=moment.minute, seconds=moment.second, microseconds=moment.microsecond
+    ) % granularity
+    return moment + (granularity - remainder) if remainder else moment
+
+
+def find_free_slots(busy, window_start, window_end, duration, limit=5, granularity=timedelta(minutes=15)):
+    """
+    Return the earliest ``limit`` free ``(start, end)`` slots of ``duration``.
+
+    ``busy`` is any iterable of (start, end) intervals; they are merged once
+    and the gaps between them are walked in order. Slot starts are aligned
+    to ``granularity`` and consecutive slots inside one gap do not overlap.
+    """
+    slots = []
+    cursor = window_start
+    for busy_start, busy_end in merge_intervals(busy) + [(window_end, window_end)]:
+        gap_end = min(busy_start, window_end)
+        slot_start = _align(cursor, granularity)
+        while slot_start + duration <= gap_end:
+            slots.append((slot_start, slot_start + duration))
+            if len(slots) >= limit:
+                return slots
+            slot_start = _align(slot_start + duration, granularity)
+        cursor = max(cursor, busy_end)
+        if cursor >= window_end:
+            break
+    return slots
+
+
+def find_common_free_slots(user_ids, venue, window_start, window_end, duration, limit=5,
+                           granularity=timedelta(minutes=15)):
+    """
+    Earliest free slots shared by all users and the venue within the window.
+
+    The search horizon starts at one day and doubles until enough slots are
+    found, so the common case only loads a day or two of busy intervals.
+    """
+    horizon = window_start + max(timedelta(days=1), duration)
+    while True:
+        horizon = min(horizon, window_end)
+        busy = get_busy_intervals(user_ids, venue, window_start, horizon)
+        slots = find_free_slots(busy, window_start, horizon, duration, limit, granularity)
+        if len(slots) >= limit or horizon >= window_end:
+            return slots
+        horizon = window_start + (horizon - window_start) * 2
@@ -0,0 +1,295 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.urls import reverse
+from django.utils.text import Truncator
+
+from .access import MEMBER_RELATIONS, accessible_events
+from .models import Project, Event, Decision, Deliverable
+
+SEARCH_TABLE = 'core_search_index'
+
+# Document kind -> (model, title fields, body fields, detail URL name).
+# Body fields may follow relations; the related rows' signals reindex the
+# documents that copy their text.
+SEARCH_DOCUMENTS = {
+    'project': (Project, ['name'], ['description'], 'core:project_detail'),
+    'event': (Event, ['title'], ['description', 'venue', 'project__name'], 'core:event_detail'),
+    'decision': (Decision, ['title'], ['description'], 'core:decision_detail'),
+    'deliverable': (Deliverable, ['title'], ['description', 'notes'], 'core:deliverable_detail'),
+}
+
+SEARCH_KINDS = {model: kind for kind, (model, *_) in SEARCH_DOCUMENTS.items()}
+
+MAX_SEARCH_TERMS = 10
+
+
+def search_terms(query):
+    """Split user input into lowercase word terms, dropping search syntax"""
+    return re.findall(r'\w+', (query or '').lower())[:MAX_SEARCH_TERMS]
+
+
+class SQLiteSearchBackend:
+    """FTS5 virtual table ranked by bm25, with titles weighted over bodies"""
+
+    create_sql = (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        f"kind UNINDEXED, object_id UNINDEXED, title, body, "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    drop_sql = f'DROP TABLE IF EXISTS {SEARCH_TABLE}'
+
+    def match_query(self, terms):
+        # Every term must match; the last may be a partially typed word
+        return ' '.join([*(f'"{term}"' for term in terms[:-1]), f'"{terms[-1]}"*'])
+
+    def match_sql(self):
+        return f'{SEARCH_TABLE} MATCH %s'
+
+    def rank_sql(self):
+        return f'bm25({SEARCH_TABLE}, 0, 0, 10.0, 1.0)', 0
+
+
+class MySQLSearchBackend:
+    """InnoDB table with a FULLTEXT index, matched in boolean mode"""
+
+    create_sql = (
+        f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+        f'kind varchar(20) NOT NULL, object_id bigint NOT NULL, '
+        f'title longtext NOT NULL, body longtext NOT NULL, '
+        f'PRIMARY KEY (kind, object_id), '
+        f'FULLTEXT KEY {SEARCH_TABLE}_text (title, body)'
+        f') ENGINE=InnoDB'
+    )
+    drop_sql = f'DROP TABLE IF EXISTS {SEARCH_TABLE}'
+
+    def match_query(self, terms):
+        return ' '.join([*(f'+{term}' for term in terms[:-1]), f'+{terms[-1]}*'])
+
+    def match_sql(self):
+        return 'MATCH (title, body) AGAINST (%s IN BOOLEAN MODE)'
+
+    def rank_sql(self):
+        # MATCH scores grow with relevance; ORDER BY ascending like bm25
+        return '-MATCH (title, body) AGAINST (%s IN BOOLEAN MODE)', 1
+
+
+SEARCH_BACKENDS = {
+    'sqlite': SQLiteSearchBackend(),
+    'mysql': MySQLSearchBackend(),
+}
+
+
+def get_backend():
+    """The full-text backend for the current database, or None to fall back to LIKE scans"""
+    return SEARCH_BACKENDS.get(connection.vendor)
+
+
+# ============= INDEXING =============
+
+def document_rows(kind, queryset):
+    """(kind, object_id, title, body) rows for the documents of ``queryset``"""
+    _, title_fields, body_fields, _ = SEARCH_DOCUMENTS[kind]
+    for values in queryset.values_list('pk', *title_fields, *body_fields).iterator():
+        texts = [text or '' for text in values[1:]]
+        yield (
+            kind,
+            values[0],
+            ' '.join(texts[:len(title_fields)]),
+            ' '.join(text for text in texts[len(title_fields):] if text),
+        )
+
+
+def remove_documents(model, pks=None):
+    """Drop the documents of ``model`` rows, all of them when ``pks`` is None"""
+    if get_backend() is None:
+        return
+    kind = SEARCH_KINDS[model]
+    with connection.cursor() as cursor:
+        if pks is None:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE kind = %s', [kind])
+            return
+        pks = list(pks)
+        if pks:
+            placeholders = ', '.join(['%s'] * len(pks))
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE kind = %s AND object_id IN ({placeholders})',
+                [kind, *pks]
+            )
+
+
+def index_documents(model, pks=None, batch_size=500):
+    """(Re)write the documents of ``model`` rows, all of them when ``pks`` is None"""
+    if get_backend() is None:
+        return
+    kind = SEARCH_KINDS[model]
+    queryset = model.objects.all()
+    if pks is not None:
+        pks = list(pks)
+        queryset = queryset.filter(pk__in=pks)
+    remove_documents(model, pks)
+
+    sql = f'INSERT INTO {SEARCH_TABLE} (kind, object_id, title, body) VALUES (%s, %s, %s, %s)'
+    batch = []
+    with connection.cursor() as cursor:
+        for row in document_rows(kind, queryset):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+
+
+def rebuild_search_index():
+    """Recreate the search table and index every document"""
+    backend = get_backend()
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(backend.drop_sql)
+        cursor.execute(backend.create_sql)
+    for model in SEARCH_KINDS:
+        index_documents(model)
+
+
+# ============= QUERYING =============
+
+def visible_querysets(user):
+    """
+    Kind -> queryset of the rows ``user`` may find, or None when every row is
+    visible. Mirrors the scoping of the list views.
+    """
+    if user.is_admin:
+        return {kind: None for kind in SEARCH_DOCUMENTS}
+    if user.is_management:
+        return {
+            'project': Project.objects.filter(created_by=user),
+            'event': Event.objects.filter(project__created_by=user),
+            'decision': Decision.objects.filter(event__project__created_by=user),
+            'deliverable': Deliverable.objects.filter(decision__event__project__created_by=user),
+        }
+
+    scopes = {
+        'project': ('can_view_projects', Project.objects.filter(events__participants=user)),
+        'event': ('can_view_events', accessible_events(user, MEMBER_RELATIONS)),
+        'decision': (
+            'can_view_decisions',
+            Decision.objects.filter(Q(created_by=user) | Q(event__participants=user))
+        ),
+        'deliverable': ('can_manage_deliverables', Deliverable.objects.filter(assigned_to=user)),
+    }
+    return {
+        kind: queryset
+        for kind, (permission, queryset) in scopes.items()
+        if user.has_permission(permission)
+    }
+
+
+def filter_queryset(queryset, query):
+    """
+    Restrict ``queryset`` to rows containing every term of ``query`` in one of
+    their document fields, keeping its ordering. List pages filter with this,
+    so a term matches anywhere inside a word ("port" finds "report"), unlike
+    the whole-word and prefix matches of the ranked search.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+
+    _, title_fields, body_fields, _ = SEARCH_DOCUMENTS[SEARCH_KINDS[queryset.model]]
+    for term in terms:
+        match = Q()
+        for field in title_fields + body_fields:
+            match |= Q(**{f'{field}__icontains': term})
+        queryset = queryset.filter(match)
+    return queryset.distinct()
+
+
+def search_documents(user, query, kinds=None, limit=20):
+    """
+    Ranked ``(kind, object_id)`` pairs of the documents ``user`` may see that
+    match ``query``, best first.
+
+    Ranking, role scoping and the limit all happen in one statement against
+    the full-text index, so its cost follows the number of matches rather
+    than the size of the tables.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    scopes = visible_querysets(user)
+    if kinds:
+        scopes = {kind: scope for kind, scope in scopes.items() if kind in kinds}
+    if not scopes:
+        return []
+
+    backend = get_backend()
+    if backend is None:
+        return fallback_search_documents(scopes, query, limit)
+
+    scope_sql = []
+    scope_params = []
+    for kind, scope in scopes.items():
+        if scope is None:
+            scope_sql.append('kind = %s')
+            scope_params.append(kind)
+        else:
+            # Correlated per match: an IN list would materialise every visible row
+            visible = scope.order_by().filter(pk=RawSQL(f'{SEARCH_TABLE}.object_id', [])).values('pk')
+            subquery, subquery_params = visible.query.sql_with_params()
+            scope_sql.append(f'(kind = %s AND EXISTS ({subquery}))')
+            scope_params.extend([kind, *subquery_params])
+
+    match_query = backend.match_query(terms)
+    match_sql = backend.match_sql()
+    rank_sql, rank_param_count = backend.rank_sql()
+    sql = (
+        f'SELECT kind, object_id FROM {SEARCH_TABLE} '
+        f'WHERE {match_sql} AND ({" OR ".join(scope_sql)}) '
+        f'ORDER BY {rank_sql} LIMIT %s'
+    )
+    params = [match_query, *scope_params, *([match_query] * rank_param_count), limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(kind, int(object_id)) for kind, object_id in cursor.fetchall()]
+
+
+def fallback_search_documents(scopes, query, limit):
+    """Unranked matches for databases without a full-text backend"""
+    results = []
+    for kind, scope in scopes.items():
+        model = SEARCH_DOCUMENTS[kind][0]
+        queryset = filter_queryset(model.objects.all() if scope is None else scope, query)
+        results.extend((kind, pk) for pk in queryset.values_list('pk', flat=True)[:limit - len(results)])
+        if len(results) >= limit:
+            break
+    return results
+
+
+def search_results(user, query, kinds=None, limit=20):
+    """Ranked search hits as dicts ready for a template or JSON response"""
+    hits = search_documents(user, query, kinds, limit)
+    objects = {}
+    for kind in {kind for kind, _ in hits}:
+        model = SEARCH_DOCUMENTS[kind][0]
+        objects[kind] = model.objects.in_bulk([pk for hit_kind, pk in hits if hit_kind == kind])
+
+    results = []
+    for kind, pk in hits:
+        obj = objects[kind].get(pk)
+        if obj is None:
+            continue
+        model, title_fields, _, url_name = SEARCH_DOCUMENTS[kind]
+        results.append({
+            'kind': kind,
+            'kind_label': model._meta.verbose_name.title(),
+            'id': pk,
+            'title': getattr(obj, title_fields[0]),
+            'summary': Truncator(obj.description).chars(160),
+            'url': reverse(url_name, args=[pk]),
+        })
+    return results
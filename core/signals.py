@@ -0,0 +1,182 @@
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .access import add_event_access, remove_event_access, sync_organizer_access
+from .intervals import add_user_intervals, rebuild_event_intervals, remove_user_intervals
+from .models import Project, Event, Decision, Deliverable, EventAccess, Invitation, Notification
+from .notifications import adjust_unread_count, publish_notification, publish_unread_count
+from .search import index_documents, remove_documents
+
+
+# ============= BUSY INTERVAL INDEX =============
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, raw=False, **kwargs):
+    """Times, venue or organizer may have changed, so rebuild the event's intervals"""
+    if raw:
+        return
+    rebuild_event_intervals(instance)
+
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def event_participants_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep participant intervals in sync with the participants relation"""
+    if action not in ('post_add', 'post_remove', 'post_clear', 'pre_clear'):
+        return
+
+    if reverse:
+        # user.events_participated.add(...): instance is the user
+        if action == 'pre_clear':
+            # The cleared events are only known before the clear happens
+            instance._cleared_event_ids = list(instance.events_participated.values_list('id', flat=True))
+            return
+        if action == 'post_clear':
+            pk_set = getattr(instance, '_cleared_event_ids', [])
+        for event in Event.objects.filter(pk__in=pk_set or []):
+            if action == 'post_add':
+                add_user_intervals(event, [instance.pk])
+            else:
+                remove_user_intervals(event, [instance.pk])
+        return
+
+    if action == 'post_add':
+        add_user_intervals(instance, pk_set)
+    elif action == 'post_remove':
+        remove_user_intervals(instance, pk_set)
+    elif action == 'post_clear':
+        rebuild_event_intervals(instance)
+
+
+@receiver(post_save, sender=Invitation)
+def invitation_saved(sender, instance, created, raw=False, **kwargs):
+    """Accepted invitees are busy; a declined or reset invitation frees them"""
+    if raw:
+        return
+    if instance.status == 'accepted':
+        add_user_intervals(instance.event, [instance.invitee_id])
+    elif not created:
+        remove_user_intervals(instance.event, [instance.invitee_id])
+
+
+@receiver(post_delete, sender=Invitation)
+def invitation_deleted(sender, instance, **kwargs):
+    """Free the invitee unless they are busy with the event for another reason"""
+    try:
+        event = instance.event
+    except Event.DoesNotExist:
+        # The event itself is being deleted; its intervals cascade with it
+        return
+    remove_user_intervals(event, [instance.invitee_id])
+
+
+# ============= EVENT ACCESS =============
+#
+# One row per way a user is related to an event. Access rows cascade with
+# their event and user; invitation deletes need explicit removal.
+
+@receiver(post_save, sender=Event)
+def event_access_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sync_organizer_access(instance)
+
+
+@receiver(m2m_changed, sender=Event.participants.through)
+def event_access_participants_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        # user.events_participated.add(...): instance is the user
+        if action == 'post_clear':
+            EventAccess.objects.filter(user=instance, relation='participant').delete()
+            return
+        for event_id in pk_set:
+            if action == 'post_add':
+                add_event_access(event_id, [instance.pk], 'participant')
+            else:
+                remove_event_access(event_id, [instance.pk], 'participant')
+        return
+
+    if action == 'post_add':
+        add_event_access(instance.pk, pk_set, 'participant')
+    elif action == 'post_remove':
+        remove_event_access(instance.pk, pk_set, 'participant')
+    else:
+        EventAccess.objects.filter(event=instance, relation='participant').delete()
+
+
+@receiver(post_save, sender=Invitation)
+def invitation_access_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        add_event_access(instance.event_id, [instance.invitee_id], 'invitee')
+
+
+@receiver(post_delete, sender=Invitation)
+def invitation_access_deleted(sender, instance, **kwargs):
+    remove_event_access(instance.event_id, [instance.invitee_id], 'invitee')
+
+
+# ============= NOTIFICATION COUNTS AND STREAM =============
+#
+# The cached unread count is adjusted before publishing so pushed counts
+# read the updated value (on_commit callbacks run in registration order).
+# Rows held for a digest (core.digests) are neither counted nor pushed.
+
+@receiver(post_init, sender=Notification)
+def remember_notification_state(sender, instance, **kwargs):
+    instance._was_read = instance.is_read
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, raw=False, **kwargs):
+    """Keep the cached unread count current and push changes to the user's open streams"""
+    if raw:
+        return
+    if created and not instance.held:
+        if not instance.is_read:
+            adjust_unread_count(instance.user_id, 1)
+        publish_notification(instance)
+    elif not instance.held and instance.is_read != instance._was_read:
+        adjust_unread_count(instance.user_id, -1 if instance.is_read else 1)
+        publish_unread_count(instance.user_id)
+    instance._was_read = instance.is_read
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read and not instance.held:
+        adjust_unread_count(instance.user_id, -1)
+        publish_unread_count(instance.user_id)
+
+
+# ============= SEARCH INDEX =============
+#
+# Documents are written inside the saving transaction so the index rolls
+# back with the row. Event documents copy their project's name.
+
+@receiver(post_init, sender=Project)
+def remember_project_name(sender, instance, **kwargs):
+    instance._indexed_name = instance.name
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Decision)
+@receiver(post_save, sender=Deliverable)
+def search_document_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    index_documents(sender, [instance.pk])
+    if sender is Project:
+        if not created and instance.name != instance._indexed_name:
+            index_documents(Event, instance.events.values_list('pk', flat=True))
+        instance._indexed_name = instance.name
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Event)
+@receiver(post_delete, sender=Decision)
+@receiver(post_delete, sender=Deliverable)
+def search_document_deleted(sender, instance, **kwargs):
+    remove_documents(sender, [instance.pk])
@@ -0,0 +1,133 @@
+import asyncio
+import json
+from importlib import import_module
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import aget_user
+from django.http.cookie import parse_cookie
+
+from .notifications import unread_count
+from .pubsub import broker
+
+NOTIFICATION_STREAM_PATH = '/core/notifications/stream/'
+
+
+async def get_stream_user(scope):
+    """Resolve the logged-in user from the session cookie without going through middleware"""
+    cookies = {}
+    for name, value in scope.get('headers', []):
+        if name == b'cookie':
+            cookies = parse_cookie(value.decode('latin-1'))
+            break
+    session_key = cookies.get(settings.SESSION_COOKIE_NAME)
+    if not session_key:
+        return None
+
+    engine = import_module(settings.SESSION_ENGINE)
+    session = engine.SessionStore(session_key)
+    user = await aget_user(SimpleNamespace(session=session))
+    return user if user.is_authenticated and user.is_active else None
+
+
+class NotificationStream:
+    """
+    ASGI app pushing unread-count and new-notification events over
+    Server-Sent Events.
+
+    A connection costs one session lookup and an unread count when it
+    opens and then only wakes up for messages from the local broker and a
+    keepalive comment every ``keepalive`` seconds. The broker only reaches
+    connections in the publishing process, so every ``refresh`` seconds the
+    stream also rereads the count, a cache hit while it is current, and
+    sends it if it changed: notifications created by ``runworker`` or
+    another web process show up within that delay.
+    """
+
+    def __init__(self, keepalive=25, refresh=30, retry=5000):
+        self.keepalive = keepalive
+        self.refresh = refresh
+        self.retry = retry
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return
+
+        user = await get_stream_user(scope)
+        if user is None:
+            await send({
+                'type': 'http.response.start',
+                'status': 403,
+                'headers': [(b'content-type', b'text/plain')],
+            })
+            await send({'type': 'http.response.body', 'body': b'Authentication required'})
+            return
+
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+
+        subscription = broker.subscribe(user.pk)
+        _, queue = subscription
+        disconnected = asyncio.ensure_future(self.wait_for_disconnect(receive))
+        try:
+            await self.stream(send, queue, disconnected, user.pk)
+        finally:
+            broker.unsubscribe(user.pk, subscription)
+            disconnected.cancel()
+
+    async def stream(self, send, queue, disconnected, user_id):
+        loop = asyncio.get_running_loop()
+        sent_count = await self.count(user_id)
+        await self.send_event(send, 'count', {'unread_count': sent_count}, retry=True)
+        next_refresh = loop.time() + self.refresh
+        while not disconnected.done():
+            message_ready = asyncio.ensure_future(queue.get())
+            timeout = min(self.keepalive, max(next_refresh - loop.time(), 0))
+            done, _ = await asyncio.wait(
+                {message_ready, disconnected}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnected in done:
+                message_ready.cancel()
+                return
+
+            # cancel() fails once the getter holds a message, which must not be lost
+            if not message_ready.cancel():
+                message = dict(message_ready.result())
+                sent_count = message.get('unread_count', sent_count)
+                await self.send_event(send, message.pop('event'), message)
+            elif loop.time() >= next_refresh:
+                count = await self.count(user_id)
+                next_refresh = loop.time() + self.refresh
+                if count != sent_count:
+                    sent_count = count
+                    await self.send_event(send, 'count', {'unread_count': count})
+                else:
+                    await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+            else:
+                await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+
+    async def count(self, user_id):
+        return await sync_to_async(unread_count)(user_id)
+
+    async def send_event(self, send, event, data, retry=False):
+        lines = [f'retry: {self.retry}'] if retry else []
+        lines += [f'event: {event}', f'data: {json.dumps(data)}', '', '']
+        await send({'type': 'http.response.body', 'body': '\n'.join(lines).encode(), 'more_body': True})
+
+    @staticmethod
+    async def wait_for_disconnect(receive):
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+
+
+notification_stream = NotificationStream()
@@ -1,3 +1,1410 @@
-from django.test import TestCase
+import asyncio
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from .access import EDIT, MEMBER_RELATIONS, ObjectPermissions, accessible_events, object_permissions
+from .conflicts import find_conflicts, find_overlapping_pairs
+from .jobs import (
+    PERIODIC_TASKS, PRIORITY_HIGH, PRIORITY_LOW, claim_jobs, enqueue, requeue_stale_jobs, run_pending,
+    schedule_periodic_tasks, task
+)
+from .digests import send_notification_digests
+from .fanout import create_notifications, notify_invitation_response
+from .forms import EventForm, DecisionForm, DeliverableForm, InvitationForm
+from .models import (
+    Project, Event, Decision, Deliverable, Invitation, Notification, BusyInterval, EventAccess, Job,
+    SweepCheckpoint
+)
+from .notifications import notification_payload, unread_count, unread_count_key
+from .pagination import KeysetPaginator
+from .permissions import CanManageEvent, CanManageProject, CanUpdateDeliverable
+from .pubsub import LocalBroker, broker
+from .reminders import DUE_SOON, OVERDUE, open_deliverables_due, send_deliverable_reminders
+from .scheduling import find_free_slots, merge_intervals
+from .search import rebuild_search_index, search_documents
+from .streams import NotificationStream
+
+
+class FormChoiceQueryCountTests(TestCase):
+    """Rendering a form must not run one query per choice label"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='pass', role='admin')
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+    
+    def add_events(self, count):
+        start = timezone.now()
+        for index in range(count):
+            project = Project.objects.create(
+                name=f'Project {index}', description='', created_by=self.manager
+            )
+            event = Event.objects.create(
+                project=project, title=f'Event {index}', description='', agenda='',
+                start_time=start + timedelta(days=index), end_time=start + timedelta(days=index, hours=1),
+                venue='', organizer=self.manager
+            )
+            Decision.objects.create(event=event, title=f'Decision {index}', description='', created_by=self.manager)
+    
+    def render_query_count(self, form_factory):
+        with CaptureQueriesContext(connection) as queries:
+            form_factory().as_p()
+        return len(queries)
+    
+    def assertConstantQueries(self, form_factory):
+        self.add_events(2)
+        few = self.render_query_count(form_factory)
+        self.add_events(10)
+        many = self.render_query_count(form_factory)
+        self.assertEqual(few, many)
+    
+    def test_event_form_linked_events(self):
+        self.assertConstantQueries(lambda: EventForm(user=self.admin))
+    
+    def test_decision_form_events(self):
+        self.assertConstantQueries(lambda: DecisionForm(user=self.admin))
+    
+    def test_deliverable_form_decisions(self):
+        self.assertConstantQueries(lambda: DeliverableForm(user=self.admin))
+    
+    def test_invitation_form_events(self):
+        self.assertConstantQueries(lambda: InvitationForm(user=self.manager))
+    
+    def test_forms_without_user(self):
+        self.assertConstantQueries(lambda: DeliverableForm())
+
+
+class OverlappingPairsTests(SimpleTestCase):
+    """The sweep finds exactly the pairs a brute-force comparison finds"""
+    
+    def test_matches_brute_force(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            intervals = []
+            for key in range(40):
+                start = rng.randrange(100)
+                intervals.append((key, start, start + rng.randrange(20)))
+            expected = {
+                frozenset((a[0], b[0]))
+                for a in intervals for b in intervals
+                if a[0] < b[0] and a[1] < b[2] and b[1] < a[2]
+            }
+            self.assertEqual({frozenset(pair) for pair in find_overlapping_pairs(intervals)}, expected)
+    
+    def test_touching_intervals_do_not_overlap(self):
+        self.assertEqual(list(find_overlapping_pairs([(1, 0, 10), (2, 10, 20)])), [])
+
+
+class ConflictEngineTests(TestCase):
+    """Conflicts for a batch of events are found in a constant number of queries"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.project = Project.objects.create(name='Project', description='', created_by=cls.manager)
+        cls.start = timezone.now().replace(microsecond=0)
+    
+    def add_events(self, count, offset=0):
+        # Each event overlaps its neighbours and shares their venue
+        return [
+            Event.objects.create(
+                project=self.project, title=f'Event {index}', description='', agenda='',
+                start_time=self.start + timedelta(hours=index), end_time=self.start + timedelta(hours=index, minutes=90),
+                venue='Room', organizer=self.manager
+            )
+            for index in range(offset, offset + count)
+        ]
+    
+    def test_neighbours_conflict(self):
+        events = self.add_events(4)
+        conflicts = find_conflicts(events)
+        self.assertEqual(conflicts[events[0].pk], {events[1].pk})
+        self.assertEqual(conflicts[events[1].pk], {events[0].pk, events[2].pk})
+        self.assertEqual(events[3].get_conflicting_event_ids(), {events[2].pk})
+    
+    def test_constant_queries(self):
+        events = self.add_events(3)
+        with CaptureQueriesContext(connection) as few:
+            find_conflicts(events)
+        events += self.add_events(20, offset=3)
+        with CaptureQueriesContext(connection) as many:
+            find_conflicts(events)
+        self.assertEqual(len(few), len(many))
+    
+    def test_detail_view_lists_conflicts(self):
+        events = self.add_events(2)
+        self.client.force_login(self.manager)
+        response = self.client.get(f'/core/events/{events[0].pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['conflicts']), [events[1]])
+
+
+class ScopedConflictTests(TestCase):
+    """Events only conflict through a shared person or venue, tracked in BusyInterval rows"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.alice = CustomUser.objects.create_user('alice', password='pass', role='project_user')
+        cls.bob = CustomUser.objects.create_user('bob', password='pass', role='project_user')
+        cls.project = Project.objects.create(name='Project', description='', created_by=cls.manager)
+    
+    def setUp(self):
+        start = timezone.now().replace(microsecond=0)
+        self.event = Event.objects.create(
+            project=self.project, title='Event', description='', agenda='',
+            start_time=start, end_time=start + timedelta(hours=2), venue='Room A', organizer=self.alice
+        )
+        self.other = Event.objects.create(
+            project=self.project, title='Other', description='', agenda='',
+            start_time=start + timedelta(hours=1), end_time=start + timedelta(hours=3), venue='Room B', organizer=self.manager
+        )
+    
+    def conflicts(self):
+        return self.event.get_conflicting_event_ids()
+    
+    def test_unrelated_overlap_is_no_conflict(self):
+        self.assertEqual(self.conflicts(), set())
+    
+    def test_shared_participant(self):
+        self.other.participants.add(self.alice)
+        self.assertTrue(BusyInterval.objects.filter(event=self.other, user=self.alice).exists())
+        self.assertEqual(self.conflicts(), {self.other.pk})
+        self.alice.events_participated.remove(self.other)
+        self.assertEqual(self.conflicts(), set())
+    
+    def test_accepted_invitation(self):
+        invitation = Invitation.objects.create(event=self.other, invitee=self.alice, invited_by=self.manager)
+        self.assertEqual(self.conflicts(), set())
+        invitation.status = 'accepted'
+        invitation.save()
+        self.assertEqual(self.conflicts(), {self.other.pk})
+        invitation.status = 'declined'
+        invitation.save()
+        self.assertEqual(self.conflicts(), set())
+    
+    def test_normalized_venue(self):
+        self.other.venue = ' room a '
+        self.other.save()
+        self.assertEqual(self.conflicts(), {self.other.pk})
+        self.other.delete()
+        self.assertEqual(self.conflicts(), set())
+    
+    def test_rebuild_command(self):
+        self.other.participants.add(self.bob)
+        expected = set(BusyInterval.objects.values_list('event_id', 'user_id', 'venue', 'start_time', 'end_time'))
+        BusyInterval.objects.all().delete()
+        call_command('rebuild_busy_intervals', stdout=StringIO())
+        self.assertEqual(
+            set(BusyInterval.objects.values_list('event_id', 'user_id', 'venue', 'start_time', 'end_time')), expected
+        )
+
+
+class FreeSlotTests(SimpleTestCase):
+    """Free slots are the gaps between merged busy intervals, on a 15 minute grid"""
+    
+    def at(self, hour, minute=0):
+        return datetime(2025, 1, 1, hour, minute, tzinfo=dt_timezone.utc)
+    
+    def test_merge_and_find(self):
+        busy = [(self.at(9), self.at(10)), (self.at(9, 30), self.at(11)), (self.at(12), self.at(12, 20))]
+        self.assertEqual(merge_intervals(busy), [(self.at(9), self.at(11)), (self.at(12), self.at(12, 20))])
+        slots = find_free_slots(busy, self.at(8, 10), self.at(14), timedelta(minutes=45), limit=5)
+        self.assertEqual(slots, [
+            (self.at(8, 15), self.at(9)),
+            (self.at(11), self.at(11, 45)),
+            (self.at(12, 30), self.at(13, 15)),
+            (self.at(13, 15), self.at(14)),
+        ])
+
+
+class FreeSlotApiTests(TestCase):
+    """The free/busy endpoint only reveals people the user may schedule into the project"""
+    
+    url = '/core/events/free-slots/'
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.member = CustomUser.objects.create_user('member', password='pass', role='project_user')
+        cls.colleague = CustomUser.objects.create_user('colleague', password='pass', role='project_user')
+        cls.outsider = CustomUser.objects.create_user('outsider', password='pass', role='project_user')
+        cls.project = Project.objects.create(name='Project', description='', created_by=cls.manager)
+        cls.other_project = Project.objects.create(name='Other', description='', created_by=cls.manager)
+        start = timezone.now() + timedelta(days=1)
+        event = Event.objects.create(
+            project=cls.project, title='Kickoff', description='', agenda='',
+            start_time=start, end_time=start + timedelta(hours=1), venue='', organizer=cls.manager
+        )
+        event.participants.add(cls.member, cls.colleague)
+    
+    def get(self, user, **params):
+        self.client.force_login(user)
+        return self.client.get(self.url, {'duration': 30, 'limit': 3, **params})
+    
+    def test_project_member_lookup(self):
+        response = self.get(self.member, project=self.project.pk, participants=self.colleague.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['slots']), 3)
+    
+    def test_outsider_lookup_is_forbidden(self):
+        response = self.get(self.member, project=self.project.pk, participants=f'{self.colleague.pk},{self.outsider.pk}')
+        self.assertEqual(response.status_code, 403)
+    
+    def test_project_outside_scope_is_forbidden(self):
+        self.assertEqual(self.get(self.member, project=self.other_project.pk).status_code, 403)
+    
+    def test_owner_may_look_up_anyone(self):
+        response = self.get(self.manager, project=self.project.pk, participants=self.outsider.pk)
+        self.assertEqual(response.status_code, 200)
+    
+    def test_invalid_parameters(self):
+        self.assertEqual(self.get(self.member).status_code, 400)
+        self.assertEqual(self.get(self.member, project=self.project.pk, duration='x').status_code, 400)
+
+
+class WorkloadDistributionTests(TestCase):
+    """Team workload counters come from one grouped query"""
+    
+    url = '/core/management/workload/'
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.busy = CustomUser.objects.create_user('busy', password='pass', role='project_user')
+        cls.idle = CustomUser.objects.create_user('idle', password='pass', role='project_user')
+        project = Project.objects.create(name='Project', description='', created_by=cls.manager)
+        now = timezone.now()
+        event = Event.objects.create(
+            project=project, title='Event', description='', agenda='',
+            start_time=now, end_time=now + timedelta(hours=1), venue='', organizer=cls.manager
+        )
+        event.participants.add(cls.busy, cls.idle)
+        decision = Decision.objects.create(event=event, title='Decision', description='', created_by=cls.manager)
+        for status, due in [('pending', -1), ('in-progress', 1), ('completed', -1), ('pending', None)]:
+            Deliverable.objects.create(
+                decision=decision, title=status, description='', assigned_to=cls.busy, status=status,
+                due_date=now + timedelta(days=due) if due is not None else None
+            )
+        # Tasks outside the manager's projects are not counted
+        Deliverable.objects.create(title='Loose', description='', assigned_to=cls.busy)
+    
+    def setUp(self):
+        self.client.force_login(self.manager)
+    
+    def test_counters(self):
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        rows = {row['member'].username: row for row in response.context['team_workload']}
+        busy = rows['busy']
+        self.assertEqual(
+            (busy['total_tasks'], busy['pending_tasks'], busy['completed_tasks'], busy['overdue_tasks']),
+            (4, 3, 1, 1)
+        )
+        self.assertEqual(rows['idle']['total_tasks'], 0)
+        
+        for index in range(5):
+            member = CustomUser.objects.create_user(f'member{index}', password='pass', role='project_user')
+            Event.objects.get().participants.add(member)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.url)
+        self.assertEqual(len(few), len(many))
+    
+    def test_exports(self):
+        rows = self.client.get(self.url, {'format': 'json'}).json()['team_workload']
+        self.assertEqual([row['username'] for row in rows], ['busy', 'idle'])
+        self.assertEqual(rows[0]['completion_rate'], 25.0)
+        
+        response = self.client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = response.content.decode().splitlines()
+        self.assertTrue(lines[0].startswith('username,full_name,email'))
+        self.assertEqual(len(lines), 3)
+
+
+class TaskProgressTests(TestCase):
+    """Task progress is summed from grouped per-project counts"""
+    
+    url = '/core/user/task-progress/'
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.member = CustomUser.objects.create_user('member', password='pass', role='project_user')
+        cls.projects = []
+        now = timezone.now()
+        for index in range(4):
+            project = Project.objects.create(name=f'Project {index}', description='', created_by=cls.manager)
+            event = Event.objects.create(
+                project=project, title='Event', description='', agenda='',
+                start_time=now, end_time=now + timedelta(hours=1), venue='', organizer=cls.manager
+            )
+            event.participants.add(cls.member)
+            decision = Decision.objects.create(event=event, title='Decision', description='', created_by=cls.manager)
+            for task in range(index + 2):
+                Deliverable.objects.create(
+                    decision=decision, title=f'Task {index}.{task}', description='', assigned_to=cls.member,
+                    status=['pending', 'in-progress', 'completed'][task % 3]
+                )
+            cls.projects.append(project)
+        Deliverable.objects.create(title='Loose', description='', assigned_to=cls.member, status='completed')
+    
+    def test_counters(self):
+        self.client.force_login(self.member)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        context = response.context
+        self.assertEqual(
+            (context['total_tasks'], context['completed_tasks'], context['in_progress_tasks'], context['pending_tasks']),
+            (15, 4, 5, 6)
+        )
+        progress = context['project_progress']
+        self.assertEqual([progress[project]['total'] for project in self.projects], [2, 3, 4, 5])
+        self.assertEqual([progress[project]['completed'] for project in self.projects], [0, 1, 1, 1])
+        # Only the three most recent tasks of each project are listed
+        self.assertEqual(
+            [task.title for task in progress[self.projects[3]]['tasks']], ['Task 3.4', 'Task 3.3', 'Task 3.2']
+        )
+    
+    def test_constant_queries(self):
+        self.client.force_login(self.member)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        event = Event.objects.filter(project=self.projects[0]).get()
+        for index in range(4):
+            project = Project.objects.create(name=f'Extra {index}', description='', created_by=self.manager)
+            extra = Event.objects.create(
+                project=project, title='Event', description='', agenda='',
+                start_time=event.start_time, end_time=event.end_time, venue='', organizer=self.manager
+            )
+            extra.participants.add(self.member)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.url)
+        self.assertEqual(len(few), len(many))
+    
+    def test_requires_permission(self):
+        self.member.can_track_progress = False
+        self.member.save()
+        self.client.force_login(self.member)
+        self.assertRedirects(
+            self.client.get(self.url), '/dashboard/project-user/', fetch_redirect_response=False
+        )
+
+
+class LocalBrokerTests(SimpleTestCase):
+    """Messages published from any thread reach the subscribed queues"""
+    
+    def test_publish_from_thread(self):
+        broker = LocalBroker(max_queued=2)
+        
+        async def run():
+            subscription = broker.subscribe(1)
+            other = broker.subscribe(2)
+            publisher = threading.Thread(target=lambda: [broker.publish(1, index) for index in range(3)])
+            publisher.start()
+            await asyncio.get_running_loop().run_in_executor(None, publisher.join)
+            await asyncio.sleep(0)
+            _, queue = subscription
+            # A full queue drops its oldest message
+            received = [await asyncio.wait_for(queue.get(), 1) for _ in range(2)]
+            self.assertTrue(other[1].empty())
+            self.assertEqual(broker.subscriber_count(), 2)
+            broker.unsubscribe(1, subscription)
+            broker.unsubscribe(2, other)
+            return received
+        
+        self.assertEqual(async_to_sync(run)(), [1, 2])
+        self.assertFalse(broker.has_subscribers(1))
+        self.assertEqual(broker.subscriber_count(), 0)
+
+
+class NotificationStreamTests(TestCase):
+    """The SSE stream sends the unread count, then whatever the broker publishes"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('member', password='pass', role='project_user')
+    
+    def setUp(self):
+        cache.clear()
+    
+    def scope(self, session_key=None):
+        headers = []
+        if session_key:
+            headers.append((b'cookie', f'{settings.SESSION_COOKIE_NAME}={session_key}'.encode()))
+        return {'type': 'http', 'path': '/core/notifications/stream/', 'headers': headers}
+    
+    def run_stream(self, scope, until, refresh=60):
+        """Feed the stream until ``until(bodies)`` holds, then disconnect; returns the response"""
+        messages = []
+        
+        async def run():
+            changed = asyncio.Event()
+            disconnected = asyncio.Event()
+            
+            async def receive():
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+            
+            async def send(message):
+                messages.append(message)
+                changed.set()
+            
+            stream = asyncio.ensure_future(
+                NotificationStream(keepalive=0.05, refresh=refresh)(scope, receive, send)
+            )
+            while not stream.done() and not until([m.get('body', b'') for m in messages]):
+                changed.clear()
+                await asyncio.wait_for(changed.wait(), 2)
+            disconnected.set()
+            await asyncio.wait_for(stream, 2)
+        
+        async_to_sync(run)()
+        return messages
+    
+    def test_requires_session(self):
+        messages = self.run_stream(self.scope(), lambda bodies: False)
+        self.assertEqual(messages[0]['status'], 403)
+    
+    def test_count_then_published_messages(self):
+        self.client.force_login(self.user)
+        session_key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        
+        def until(bodies):
+            if len(bodies) == 2:
+                broker.publish(self.user.pk, {'event': 'count', 'unread_count': 7})
+            return any(b'"unread_count": 7' in body for body in bodies)
+        
+        messages = self.run_stream(self.scope(session_key), until)
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertIn(b'retry: 5000\nevent: count\ndata: {"unread_count": 0}', messages[1]['body'])
+        self.assertFalse(broker.has_subscribers(self.user.pk))
+    
+    def test_refresh_sends_changed_count(self):
+        # Counts changed by another process only reach the stream through the cache
+        cache.clear()
+        self.client.force_login(self.user)
+        session_key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        
+        def until(bodies):
+            if len(bodies) == 2:
+                cache.set(unread_count_key(self.user.pk), 3)
+            return any(b'"unread_count": 3' in body for body in bodies)
+        
+        messages = self.run_stream(self.scope(session_key), until, refresh=0.05)
+        counts = [message['body'] for message in messages if b'event: count' in message.get('body', b'')]
+        self.assertEqual(len(counts), 2)
+
+
+class UnreadCountCacheTests(TestCase):
+    """Unread counts are cached and kept current by the notification writes"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('member', password='pass', role='project_user')
+    
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+    
+    def cached(self):
+        return cache.get(unread_count_key(self.user.pk))
+    
+    def test_write_through(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            notifications = [
+                Notification.objects.create(user=self.user, title='Title', message='Message') for _ in range(3)
+            ]
+        self.assertEqual(self.client.get('/core/notifications/count/').json()['count'], 3)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/core/notifications/count/')
+        self.assertFalse(any('core_notification' in query['sql'] for query in queries.captured_queries))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f'/core/notifications/{notifications[0].pk}/read/', HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+            )
+        self.assertEqual(self.cached(), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            notifications[1].delete()
+        self.assertEqual(self.cached(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/core/notifications/mark-all-read/', HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertIsNone(self.cached())
+        self.assertEqual(unread_count(self.user.pk), 0)
+    
+    def test_rolled_back_write_leaves_count(self):
+        self.assertEqual(unread_count(self.user.pk), 0)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Notification.objects.create(user=self.user, title='Title', message='Message')
+        # The increment waits for the commit
+        self.assertEqual(self.cached(), 0)
+        self.assertTrue(callbacks)
+
+
+class ExplainViewQueriesTests(TestCase):
+    """The plan checker replays every listed view and explains its queries"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        CustomUser.objects.create_user('admin', password='pass', role='admin')
+        member = CustomUser.objects.create_user('member', password='pass', role='project_user')
+        project = Project.objects.create(name='Project', description='', created_by=manager)
+        now = timezone.now()
+        event = Event.objects.create(
+            project=project, title='Event', description='', agenda='',
+            start_time=now, end_time=now + timedelta(hours=1), venue='', organizer=manager
+        )
+        event.participants.add(member)
+        decision = Decision.objects.create(event=event, title='Decision', description='', created_by=manager)
+        Deliverable.objects.create(decision=decision, title='Deliverable', description='', assigned_to=member)
+    
+    def test_reports_every_view(self):
+        from .management.commands.explain_view_queries import VIEW_REQUESTS
+        
+        out = StringIO()
+        call_command('explain_view_queries', stdout=out)
+        lines = out.getvalue().splitlines()
+        views = [line for line in lines if ': HTTP ' in line]
+        self.assertEqual(len(views), len(VIEW_REQUESTS))
+        self.assertTrue(all(': HTTP 200,' in line or ': HTTP 302,' in line for line in views), views)
+        self.assertTrue(any(line.startswith('Explained ') for line in lines))
+        # The replay runs in a rolled back transaction
+        self.assertEqual(Project.objects.count(), 1)
+    
+    def test_ignored_tables(self):
+        out = StringIO()
+        ignored = [f'--ignore-table={table}' for table in connection.introspection.table_names()]
+        call_command('explain_view_queries', '--fail-on-scan', *ignored, stdout=out)
+        self.assertIn('No full table scans found', out.getvalue())
+
+
+class AutocompleteTests(TestCase):
+    """Pickers search their choices by prefix instead of rendering all of them"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management', first_name='Zed')
+        cls.member = CustomUser.objects.create_user('member', password='pass', role='project_user', last_name='Alpha')
+        cls.alice = CustomUser.objects.create_user('alice', password='pass', role='project_user')
+        project = Project.objects.create(name='Project', description='', created_by=cls.manager)
+        now = timezone.now()
+        cls.events = [
+            Event.objects.create(
+                project=project, title=f'Event {index}', description='', agenda='',
+                start_time=now + timedelta(days=index), end_time=now + timedelta(days=index, hours=1),
+                venue='', organizer=cls.manager
+            )
+            for index in range(30)
+        ]
+        cls.events[0].participants.add(cls.member)
+        Decision.objects.create(event=cls.events[0], title='Budget', description='', created_by=cls.manager)
+    
+    def results(self, field, **params):
+        response = self.client.get(f'/core/autocomplete/{field}/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+    
+    def test_prefix_search(self):
+        self.client.force_login(self.manager)
+        # Usernames and last names match case-insensitively
+        self.assertEqual(
+            [result['text'] for result in self.results('participants', q='AL')],
+            ['alice (Project User)', 'member (Project User)']
+        )
+        self.assertEqual(len(self.results('linked-events', q='event 1', limit=5)), 5)
+        self.assertEqual(len(self.results('deliverable-decisions', q='bud')), 1)
+        self.assertNotIn(self.manager.pk, [result['id'] for result in self.results('invitees')])
+    
+    def test_choices_follow_form_scope(self):
+        self.client.force_login(self.member)
+        self.assertEqual([result['id'] for result in self.results('decision-events')], [self.events[0].pk])
+        self.assertEqual(
+            {result['id'] for result in self.results('assignees')}, {self.member.pk, self.alice.pk}
+        )
+    
+    def test_invalid_requests(self):
+        self.client.force_login(self.manager)
+        self.assertEqual(self.client.get('/core/autocomplete/unknown/').status_code, 404)
+        self.assertEqual(self.client.get('/core/autocomplete/invitees/', {'limit': 'x'}).status_code, 400)
+    
+    def test_forms_render_selected_choices_only(self):
+        self.events[1].participants.add(self.alice)
+        form = EventForm(user=self.manager, instance=self.events[1])
+        participants = str(form['participants'])
+        self.assertIn('data-autocomplete-url="/core/autocomplete/participants/"', participants)
+        self.assertEqual(participants.count('<option'), 1)
+        self.assertEqual(str(form['linked_events']).count('<option'), 0)
+        self.assertEqual(str(DeliverableForm(user=self.member)['assigned_to']).count('<option'), 1)
+        self.assertIn('Event 5', str(DecisionForm(user=self.manager, data={'event': self.events[5].pk})['event']))
+        
+        form = EventForm(user=self.manager, data={'participants': [self.alice.pk, 'x']})
+        self.assertIn('participants', form.errors)
+
+
+class SearchTests(TestCase):
+    """Full-text search is ranked, kept current by signals and scoped to the user"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='pass', role='admin')
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.other_manager = CustomUser.objects.create_user('other', password='pass', role='management')
+        cls.member = CustomUser.objects.create_user(
+            'member', password='pass', role='project_user', email='member@example.com'
+        )
+        cls.project = Project.objects.create(name='Apollo rollout', description='Moon landing', created_by=cls.manager)
+        cls.other_project = Project.objects.create(
+            name='Gemini', description='Apollo mentioned in passing', created_by=cls.other_manager
+        )
+        now = timezone.now()
+        cls.event = Event.objects.create(
+            project=cls.project, title='Kickoff', description='Planning the launch', agenda='',
+            start_time=now, end_time=now + timedelta(hours=1), venue='Room', organizer=cls.manager
+        )
+        cls.event.participants.add(cls.member)
+        cls.decision = Decision.objects.create(
+            event=cls.event, title='Choose vendor', description='Apollo vendor selection', created_by=cls.manager
+        )
+        cls.deliverable = Deliverable.objects.create(
+            decision=cls.decision, title='Vendor contract', description='Sign', assigned_to=cls.member
+        )
+    
+    def test_ranked_and_scoped(self):
+        hits = search_documents(self.admin, 'apollo')
+        # A title match ranks above a body match
+        self.assertEqual(hits[0], ('project', self.project.pk))
+        self.assertIn(('project', self.other_project.pk), hits)
+        # Events are also found by their project's name
+        self.assertIn(('event', self.event.pk), hits)
+        self.assertEqual(search_documents(self.admin, 'apollo', kinds=['event']), [('event', self.event.pk)])
+        
+        self.assertNotIn(('project', self.other_project.pk), search_documents(self.manager, 'apollo'))
+        self.assertEqual(search_documents(self.other_manager, 'vendor'), [])
+        self.assertEqual(search_documents(self.member, 'vend'), [('deliverable', self.deliverable.pk)])
+    
+    def test_query_syntax_is_escaped(self):
+        self.assertEqual(search_documents(self.admin, '"*) OR'), [])
+    
+    def test_index_follows_writes(self):
+        self.project.name = 'Artemis'
+        self.project.save()
+        self.assertIn(('event', self.event.pk), search_documents(self.admin, 'artemis'))
+        self.assertNotIn(('event', self.event.pk), search_documents(self.admin, 'apollo'))
+        self.project.delete()
+        self.assertEqual(search_documents(self.admin, 'artemis'), [])
+        self.assertEqual(search_documents(self.admin, 'vendor'), [])
+        rebuild_search_index()
+        self.assertEqual(search_documents(self.admin, 'gemini'), [('project', self.other_project.pk)])
+    
+    def test_views(self):
+        self.client.force_login(self.manager)
+        response = self.client.get('/core/search/', {'q': 'apollo', 'format': 'json'})
+        self.assertEqual(response.json()['results'][0]['kind'], 'project')
+        self.assertContains(self.client.get('/core/search/', {'q': 'apollo'}), 'Apollo rollout')
+        self.assertEqual(self.client.get('/core/search/', {'q': '', 'format': 'json'}).json()['results'], [])
+        self.assertEqual(
+            list(self.client.get('/core/events/', {'search': 'apoll'}).context['page_obj']), [self.event]
+        )
+        self.assertContains(self.client.get('/core/projects/', {'search': 'moon'}), 'Apollo rollout')
+        # List filters match inside words, which the full-text index does not
+        self.assertContains(self.client.get('/core/projects/', {'search': 'llout'}), 'Apollo rollout')
+        self.assertNotContains(self.client.get('/core/projects/', {'search': 'gemini'}), 'Apollo rollout')
+    
+    def test_permissions_page_matches_email(self):
+        self.client.force_login(self.manager)
+        for term in ('MEM', 'member@ex'):
+            response = self.client.get('/core/permissions/', {'search': term})
+            self.assertEqual(list(response.context['project_users']), [self.member], term)
+        response = self.client.get('/core/permissions/', {'search': 'example.com'})
+        self.assertEqual(list(response.context['project_users']), [])
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages walk the ordering without offsets, ties broken by pk"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.project = Project.objects.create(name='Project', description='', created_by=cls.manager)
+        now = timezone.now()
+        # Three events share every start time
+        for index in range(25):
+            Event.objects.create(
+                project=cls.project, title=f'Event {index}', description='', agenda='',
+                start_time=now - timedelta(hours=index // 3), end_time=now, venue='', organizer=cls.manager
+            )
+    
+    def walk(self, paginator):
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return pages
+    
+    def test_walk_both_ways(self):
+        events = Event.objects.all()
+        paginator = KeysetPaginator(events, '-start_time', 4)
+        pages = self.walk(paginator)
+        seen = [event for page in pages for event in page]
+        self.assertEqual(seen, list(events.order_by('-start_time', '-pk')))
+        self.assertFalse(pages[0].has_previous())
+        
+        page, back = pages[-1], []
+        while page.has_previous():
+            page = paginator.get_page(page.previous_cursor)
+            back = list(page) + back
+        self.assertEqual(back + list(pages[-1]), seen)
+        
+        ascending = [event for page in self.walk(KeysetPaginator(events, 'start_time', 7)) for event in page]
+        self.assertEqual(ascending, list(events.order_by('start_time', 'pk')))
+    
+    def test_stable_under_inserts(self):
+        paginator = KeysetPaginator(Event.objects.all(), '-start_time', 5)
+        first = paginator.get_page()
+        expected = list(Event.objects.order_by('-start_time', '-pk')[5:10])
+        Event.objects.create(
+            project=self.project, title='New', description='', agenda='',
+            start_time=timezone.now() + timedelta(days=1), end_time=timezone.now() + timedelta(days=2),
+            venue='', organizer=self.manager
+        )
+        self.assertEqual(list(paginator.get_page(first.next_cursor)), expected)
+        # An invalid cursor starts over
+        self.assertEqual(
+            list(paginator.get_page('garbage!!')), list(Event.objects.order_by('-start_time', '-pk')[:5])
+        )
+    
+    def test_views(self):
+        self.client.force_login(self.manager)
+        data = self.client.get('/core/events/', {'format': 'json'}).json()
+        self.assertEqual(len(data['results']), 10)
+        self.assertIsNone(data['previous_cursor'])
+        following = self.client.get('/core/events/', {'format': 'json', 'cursor': data['next_cursor']}).json()
+        self.assertEqual(len(following['results']), 10)
+        self.assertTrue(self.client.get('/core/events/', {'cursor': ''}).context['page_obj'].is_keyset)
+        self.assertFalse(hasattr(self.client.get('/core/events/', {'page': 2}).context['page_obj'], 'is_keyset'))
+        for url in ('/core/projects/', '/core/decisions/', '/core/deliverables/'):
+            for params in ({}, {'format': 'json'}, {'cursor': ''}):
+                self.assertEqual(self.client.get(url, params).status_code, 200, (url, params))
+
+
+class EventAccessTests(TestCase):
+    """EventAccess answers the same event lists as the relationship joins"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.ann = CustomUser.objects.create_user('ann', password='pass', role='project_user')
+        cls.bob = CustomUser.objects.create_user('bob', password='pass', role='project_user')
+        project = Project.objects.create(name='Project', description='', created_by=cls.manager)
+        now = timezone.now()
+        cls.events = [
+            Event.objects.create(
+                project=project, title=f'Event {index}', description='', agenda='',
+                start_time=now, end_time=now, venue='', organizer=cls.manager
+            )
+            for index in range(4)
+        ]
+    
+    def assertInSync(self):
+        for user in (self.manager, self.ann, self.bob):
+            members = Q(organizer=user) | Q(participants=user)
+            expected = set(Event.objects.filter(members).values_list('pk', flat=True))
+            self.assertEqual(set(accessible_events(user, MEMBER_RELATIONS).values_list('pk', flat=True)), expected)
+            expected |= set(Event.objects.filter(invitations__invitee=user).values_list('pk', flat=True))
+            self.assertEqual(set(accessible_events(user).values_list('pk', flat=True)), expected)
+    
+    def test_kept_in_sync(self):
+        events = self.events
+        events[0].participants.add(self.ann, self.bob)
+        events[0].participants.remove(self.bob)
+        self.assertInSync()
+        self.ann.events_participated.add(events[1], events[2])
+        self.ann.events_participated.remove(events[1])
+        self.assertInSync()
+        self.ann.events_participated.clear()
+        events[3].participants.add(self.ann)
+        events[3].participants.clear()
+        self.assertInSync()
+        events[1].organizer = self.ann
+        events[1].save()
+        invitation = Invitation.objects.create(event=events[2], invitee=self.bob, invited_by=self.manager)
+        self.assertInSync()
+        # Still a participant once the invitation is gone
+        events[2].participants.add(self.bob)
+        invitation.delete()
+        self.assertInSync()
+        events[2].delete()
+        self.assertInSync()
+    
+    def test_rebuild_command(self):
+        self.events[0].participants.add(self.ann)
+        Invitation.objects.create(event=self.events[1], invitee=self.bob, invited_by=self.manager)
+        rows = set(EventAccess.objects.values_list('event_id', 'user_id', 'relation'))
+        EventAccess.objects.all().delete()
+        call_command('rebuild_event_access', stdout=StringIO())
+        self.assertEqual(set(EventAccess.objects.values_list('event_id', 'user_id', 'relation')), rows)
+        self.assertInSync()
+    
+    def test_views(self):
+        self.events[0].participants.add(self.ann)
+        Invitation.objects.create(event=self.events[1], invitee=self.ann, invited_by=self.manager)
+        self.client.force_login(self.ann)
+        for url in ('/core/events/', '/core/my-events/', '/dashboard/calendar/', '/dashboard/api/calendar-events/'):
+            self.assertEqual(self.client.get(url, follow=True).status_code, 200, url)
+
+
+class ObjectPermissionsTests(TestCase):
+    """Object permissions follow the role rules and are answered in bulk"""
+    
+    # user -> objects they may view ('v') or view and edit ('ve')
+    EXPECTED = {
+        'admin': dict.fromkeys([
+            'project', 'other_project', 'event', 'other_event', 'decision', 'other_decision',
+            'deliverable', 'other_deliverable', 'loose_deliverable',
+        ], 've'),
+        'manager': {
+            'project': 've', 'event': 've', 'decision': 've',
+            'deliverable': 've', 'other_deliverable': 've', 'loose_deliverable': 've',
+        },
+        'other_manager': {
+            'other_project': 've', 'other_event': 've', 'other_decision': 've',
+            'other_deliverable': 've', 'loose_deliverable': 've',
+        },
+        'ann': {'project': 'v', 'event': 'v', 'decision': 'v', 'other_event': 've', 'deliverable': 've'},
+        'bob': {'other_decision': 've', 'loose_deliverable': 've'},
+    }
+    
+    @classmethod
+    def setUpTestData(cls):
+        create = CustomUser.objects.create_user
+        cls.users = {
+            'admin': create('admin', password='pass', role='admin'),
+            'manager': create('manager', password='pass', role='management'),
+            'other_manager': create('other_manager', password='pass', role='management'),
+            'ann': create('ann', password='pass', role='project_user'),
+            'bob': create('bob', password='pass', role='project_user'),
+        }
+        users = cls.users
+        now = timezone.now()
+        project = Project.objects.create(name='Project', description='', created_by=users['manager'])
+        other_project = Project.objects.create(name='Other', description='', created_by=users['other_manager'])
+        event = Event.objects.create(
+            project=project, title='Event', description='', agenda='',
+            start_time=now, end_time=now, venue='', organizer=users['manager']
+        )
+        other_event = Event.objects.create(
+            project=other_project, title='Other', description='', agenda='',
+            start_time=now, end_time=now, venue='', organizer=users['ann']
+        )
+        event.participants.add(users['ann'])
+        Invitation.objects.create(event=other_event, invitee=users['bob'], invited_by=users['other_manager'])
+        decision = Decision.objects.create(event=event, title='Decision', description='', created_by=users['manager'])
+        other_decision = Decision.objects.create(
+            event=other_event, title='Other', description='', created_by=users['bob']
+        )
+        cls.objects = {
+            'project': project, 'other_project': other_project,
+            'event': event, 'other_event': other_event,
+            'decision': decision, 'other_decision': other_decision,
+            'deliverable': Deliverable.objects.create(
+                decision=decision, title='Deliverable', description='', assigned_to=users['ann']
+            ),
+            'other_deliverable': Deliverable.objects.create(
+                decision=other_decision, title='Other', description='', assigned_to=users['manager']
+            ),
+            'loose_deliverable': Deliverable.objects.create(
+                title='Loose', description='', assigned_to=users['bob']
+            ),
+        }
+    
+    def test_rules(self):
+        for name, user in self.users.items():
+            permissions = ObjectPermissions(user)
+            for key, obj in self.objects.items():
+                expected = self.EXPECTED[name].get(key, '')
+                self.assertEqual(
+                    (permissions.can_view(obj), permissions.can_edit(obj)),
+                    ('v' in expected, 'e' in expected),
+                    (name, key)
+                )
+    
+    def test_bulk_lookup_is_memoized(self):
+        permissions = ObjectPermissions(self.users['ann'])
+        with CaptureQueriesContext(connection) as queries:
+            allowed = permissions.allowed_ids(Deliverable.objects.all(), EDIT)
+            permissions.can_view(self.objects['deliverable'])
+            permissions.can_manage(self.objects['other_deliverable'])
+        self.assertEqual(allowed, {self.objects['deliverable'].pk})
+        # The listing and one permission query
+        self.assertEqual(len(queries), 2)
+    
+    def test_views(self):
+        self.client.force_login(self.users['ann'])
+        response = self.client.get(f"/core/deliverables/{self.objects['deliverable'].pk}/update/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(type(response.context['form']).__name__, 'DeliverableProgressForm')
+        response = self.client.get(f"/core/events/{self.objects['other_event'].pk}/")
+        self.assertTrue(response.context['can_edit'])
+        
+        # Only the assignee (or an admin) posts quick progress updates
+        url = f"/core/deliverables/{self.objects['deliverable'].pk}/quick-update/"
+        self.assertEqual(self.client.post(url, {'progress': 50}).status_code, 200)
+        self.client.force_login(self.users['manager'])
+        self.assertEqual(self.client.post(url, {'progress': 60}).status_code, 403)
+        # Any management user adds decisions to any event
+        self.client.force_login(self.users['other_manager'])
+        self.client.post(
+            f"/core/events/{self.objects['event'].pk}/quick-decisions/", {'decision_titles[]': ['Agreed']}
+        )
+        self.assertTrue(Decision.objects.filter(title='Agreed', event=self.objects['event']).exists())
+    
+    def test_api_permissions(self):
+        request = RequestFactory().post('/')
+        request.user = self.users['ann']
+        self.assertTrue(CanManageEvent().has_object_permission(request, None, self.objects['other_event']))
+        self.assertFalse(CanManageEvent().has_object_permission(request, None, self.objects['event']))
+        self.assertTrue(CanUpdateDeliverable().has_object_permission(request, None, self.objects['deliverable']))
+        self.assertFalse(CanManageProject().has_object_permission(request, None, self.objects['project']))
+        # Decision creators update the decision's deliverables through the API
+        request.user = self.users['bob']
+        self.assertTrue(
+            CanUpdateDeliverable().has_object_permission(request, None, self.objects['other_deliverable'])
+        )
+        # Management users cannot even read projects they do not own
+        request = RequestFactory().get('/')
+        request.user = self.users['other_manager']
+        self.assertFalse(CanManageProject().has_object_permission(request, None, self.objects['project']))
+        request.user = self.users['ann']
+        self.assertTrue(CanManageProject().has_object_permission(request, None, self.objects['project']))
+        self.assertIs(object_permissions(request), object_permissions(request))
+
+
+@override_settings(JOBS_RUN_EAGERLY=False)
+class FanoutTests(TestCase):
+    """Invitations and notifications are bulk inserted by jobs, off the request"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.project = Project.objects.create(name='Project', description='', created_by=cls.manager)
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_invite_participants(self):
+        users = CustomUser.objects.bulk_create(
+            [CustomUser(username=f'member{index}', role='project_user') for index in range(300)]
+        )
+        now = timezone.now()
+        event = Event.objects.create(
+            project=self.project, title='All hands', description='', agenda='',
+            start_time=now, end_time=now + timedelta(hours=1), venue='', organizer=self.manager
+        )
+        event.participants.add(*users)
+        Invitation.objects.create(event=event, invitee=users[0], invited_by=self.manager)
+        
+        enqueue('core.invite_participants', event_id=event.pk, invited_by_id=self.manager.pk)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(run_pending(), 1)
+        self.assertLess(len(queries), 30)
+        self.assertEqual(Invitation.objects.filter(event=event).count(), 300)
+        self.assertEqual(Notification.objects.filter(event=event).count(), 299)
+        self.assertEqual(EventAccess.objects.filter(event=event, relation='invitee').count(), 300)
+        self.assertEqual(Job.objects.get().status, 'done')
+        
+        # Running it again invites nobody twice
+        enqueue('core.invite_participants', event_id=event.pk, invited_by_id=self.manager.pk)
+        run_pending()
+        self.assertEqual(Notification.objects.filter(event=event).count(), 299)
+    
+    def test_views_queue_the_work(self):
+        member = CustomUser.objects.create_user('member', password='pass', role='project_user')
+        self.client.force_login(self.manager)
+        start = timezone.now() + timedelta(days=1)
+        response = self.client.post('/core/events/create/', {
+            'project': self.project.pk, 'title': 'Event', 'description': 'Description', 'agenda': 'Agenda',
+            'start_time': start.strftime('%Y-%m-%dT%H:%M'),
+            'end_time': (start + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M'),
+            'venue': 'Room', 'participants': [member.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Notification.objects.exists())
+        call_command('runworker', '--once', '--processes', '0', stdout=StringIO())
+        self.assertEqual(Notification.objects.filter(user=member).count(), 1)
+        
+        invitation = Invitation.objects.get(invitee=member)
+        self.client.force_login(member)
+        response = self.client.post(f'/core/invitations/{invitation.pk}/respond-ajax/', {'response': 'accepted'})
+        self.assertTrue(response.json()['success'])
+        run_pending()
+        self.assertEqual(
+            Notification.objects.filter(user=self.manager, notification_type='invitation_response').count(), 1
+        )
+        
+        with self.settings(JOBS_RUN_EAGERLY=True), self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/core/invitations/{invitation.pk}/respond-ajax/', {'response': 'declined'})
+        self.assertEqual(Notification.objects.filter(user=self.manager, title='Invitation Declined').count(), 1)
+        self.assertFalse(Job.objects.exclude(status='done').exists())
+    
+    def test_worker_needs_shared_cache(self):
+        from .checks import check_job_cache
+        
+        self.assertEqual([warning.id for warning in check_job_cache(None)], ['core.W001'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}}
+        with self.settings(CACHES=shared):
+            self.assertEqual(check_job_cache(None), [])
+
+
+class NotificationDigestTests(TestCase):
+    """Repeated responses coalesce, and opted-in users get them in one digest instead"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        project = Project.objects.create(name='Project', description='', created_by=cls.manager)
+        now = timezone.now()
+        cls.event = Event.objects.create(
+            project=project, title='All hands', description='', agenda='',
+            start_time=now, end_time=now + timedelta(hours=1), venue='', organizer=cls.manager
+        )
+        cls.members = [
+            CustomUser.objects.create_user(f'member{index}', password='pass', role='project_user')
+            for index in range(5)
+        ]
+        cls.invitations = [
+            Invitation.objects.create(event=cls.event, invitee=member, invited_by=cls.manager)
+            for member in cls.members
+        ]
+    
+    def setUp(self):
+        cache.clear()
+    
+    def respond(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for invitation in self.invitations[:4]:
+                notify_invitation_response(invitation.pk, 'accepted')
+            notify_invitation_response(self.invitations[4].pk, 'declined')
+    
+    def test_responses_coalesce(self):
+        self.respond()
+        rows = Notification.objects.filter(user=self.manager).order_by('title')
+        self.assertEqual(
+            [(row.title, row.count) for row in rows], [('Invitation Accepted', 4), ('Invitation Declined', 1)]
+        )
+        accepted = rows[0]
+        self.assertIn('member3', accepted.message)
+        self.assertEqual(accepted.invitation_id, self.invitations[3].pk)
+        self.assertEqual(notification_payload(accepted)['count'], 4)
+        self.assertEqual(unread_count(self.manager.pk), 2)
+        
+        # Once read, or once old, a row takes no more occurrences
+        accepted.is_read = True
+        accepted.save()
+        notify_invitation_response(self.invitations[0].pk, 'accepted')
+        self.assertEqual(Notification.objects.filter(user=self.manager, title='Invitation Accepted').count(), 2)
+        Notification.objects.filter(is_read=False).update(created_at=timezone.now() - timedelta(hours=2))
+        notify_invitation_response(self.invitations[1].pk, 'declined')
+        self.assertEqual(Notification.objects.filter(user=self.manager, title='Invitation Declined').count(), 2)
+        
+        # Other types are one row per occurrence
+        create_notifications(
+            Notification(user=self.members[0], title='Notice', message='', notification_type='system')
+            for _ in range(3)
+        )
+        self.assertEqual(Notification.objects.filter(user=self.members[0]).count(), 3)
+    
+    def test_digest(self):
+        CustomUser.objects.filter(pk=self.manager.pk).update(notification_digest=True)
+        self.respond()
+        with self.captureOnCommitCallbacks(execute=True):
+            create_notifications([Notification(
+                user=self.manager, title='Invitation', message='', notification_type='event_invitation',
+                event=self.event
+            )])
+        
+        # Held responses are stored but neither counted nor listed
+        self.assertEqual(Notification.objects.filter(user=self.manager, held=True).count(), 2)
+        self.assertEqual(unread_count(self.manager.pk), 1)
+        self.client.force_login(self.manager)
+        dropdown = self.client.get('/core/notifications/dropdown/').json()
+        self.assertEqual([row['type'] for row in dropdown['notifications']], ['event_invitation'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/core/notifications/mark-all-read/')
+        self.assertEqual(Notification.objects.filter(user=self.manager, held=True, is_read=False).count(), 2)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            digest, = send_notification_digests()
+        self.assertEqual(digest.title, 'Notification digest: 5 updates')
+        self.assertEqual(digest.message, 'Invitation Response: 5 across 1 event')
+        self.assertEqual(digest.get_url(), '/core/notifications/')
+        # The responses stay, read, behind the digest
+        self.assertEqual(
+            list(Notification.objects.filter(user=self.manager, is_read=False).values_list('pk', flat=True)),
+            [digest.pk]
+        )
+        self.assertFalse(Notification.objects.filter(held=True).exists())
+        self.assertEqual(Notification.objects.filter(user=self.manager).count(), 4)
+        self.assertEqual(unread_count(self.manager.pk), 1)
+        self.assertEqual(self.client.get('/core/notifications/count/').json()['count'], 1)
+        
+        self.assertEqual(send_notification_digests(), [])
+    
+    def test_digest_skips_other_users(self):
+        self.respond()
+        self.assertFalse(Notification.objects.filter(held=True).exists())
+        self.assertEqual(send_notification_digests(), [])
+        self.assertEqual(unread_count(self.manager.pk), 2)
+
+
+class OutOfProcessJobTests(TransactionTestCase):
+    """A job run by a runworker pool process updates the counts the web process serves"""
+    
+    # The pool processes open the test database (dicision_tracker.test_runner)
+    shared_database = True
+    
+    def setUp(self):
+        location = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(self.settings(JOBS_RUN_EAGERLY=False, CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+        }))
+    
+    def test_worker_updates_web_count(self):
+        manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        member = CustomUser.objects.create_user('member', password='pass', role='project_user')
+        project = Project.objects.create(name='Project', description='', created_by=manager)
+        now = timezone.now()
+        event = Event.objects.create(
+            project=project, title='Event', description='', agenda='',
+            start_time=now, end_time=now + timedelta(hours=1), venue='', organizer=manager
+        )
+        event.participants.add(member)
+        
+        self.client.force_login(member)
+        self.assertEqual(self.client.get('/core/notifications/count/').json()['count'], 0)
+        enqueue('core.invite_participants', event_id=event.pk, invited_by_id=manager.pk)
+        self.assertFalse(Notification.objects.exists())
+        
+        call_command('runworker', '--once', '--processes', '1', stdout=StringIO())
+        self.assertEqual(Job.objects.get().status, 'done')
+        # Updated in place by the worker rather than recounted here
+        self.assertEqual(cache.get(unread_count_key(member.pk)), 1)
+        self.assertEqual(self.client.get('/core/notifications/count/').json()['count'], 1)
+    
+    def test_pool_drains_queue(self):
+        for index in range(6):
+            # Events deleted before their job ran are skipped
+            enqueue('core.invite_participants', event_id=1000 + index, invited_by_id=1)
+        call_command('runworker', '--once', '--processes', '2', stdout=StringIO())
+        self.assertEqual(Job.objects.filter(status='done').count(), 6)
+
+
+recorded = []
+
+
+@task('tests.record')
+def record(tag):
+    recorded.append(tag)
+
+
+@task('tests.outlive_lease')
+def outlive_lease(seconds):
+    time.sleep(seconds)
+    # What another worker's stale sweep would find meanwhile
+    recorded.append(requeue_stale_jobs())
+
+
+@task('tests.fail')
+def fail(times):
+    recorded.append('fail')
+    if recorded.count('fail') <= times:
+        raise RuntimeError('failed')
+
+
+@override_settings(JOBS_RUN_EAGERLY=False, JOBS_RETRY_DELAY=0)
+class JobQueueTests(TestCase):
+    """Jobs run by priority, collapse by dedup key and retry with backoff"""
+    
+    def setUp(self):
+        recorded.clear()
+    
+    def test_priority_and_dedup(self):
+        enqueue('tests.record', tag='low', priority=PRIORITY_LOW)
+        enqueue('tests.record', tag='normal')
+        first = enqueue('tests.record', tag='high', priority=PRIORITY_HIGH, dedup_key='key')
+        self.assertEqual(enqueue('tests.record', tag='again', dedup_key='key').pk, first.pk)
+        enqueue('tests.record', tag='later', delay=3600)
+        run_pending()
+        self.assertEqual(recorded, ['high', 'normal', 'low'])
+        # Once the job has run the key is free again
+        self.assertNotEqual(enqueue('tests.record', tag='again', dedup_key='key').pk, first.pk)
+    
+    def test_retry_then_fail(self):
+        recovers = enqueue('tests.fail', times=1)
+        run_pending()
+        recovers.refresh_from_db()
+        self.assertEqual((recovers.status, recovers.attempts), ('done', 2))
+        
+        recorded.clear()
+        gives_up = enqueue('tests.fail', times=5, max_attempts=2)
+        run_pending()
+        gives_up.refresh_from_db()
+        self.assertEqual((gives_up.status, gives_up.attempts), ('failed', 2))
+        self.assertIn('RuntimeError', gives_up.last_error)
+    
+    def test_stale_jobs_requeued(self):
+        job = enqueue('tests.record', tag='stale')
+        self.assertEqual([claimed.pk for claimed in claim_jobs(5)], [job.pk])
+        self.assertEqual(requeue_stale_jobs(), 0)
+        # Its worker died and stopped renewing the lease
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+    
+    def test_broken_pool_is_replaced(self):
+        pools = []
+        
+        class Pool:
+            """Runs jobs inline; the first pool breaks like one whose process was killed"""
+            
+            def __init__(self, *args, **kwargs):
+                self.broken = not pools
+                pools.append(self)
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc_info):
+                return False
+            
+            def submit(self, func, *args):
+                future = Future()
+                if self.broken:
+                    future.set_exception(BrokenProcessPool('A process terminated abruptly'))
+                else:
+                    future.set_result(func(*args))
+                return future
+        
+        jobs = [enqueue('tests.record', tag=tag) for tag in ('first', 'second')]
+        out = StringIO()
+        # Closing connections would end the test's transaction
+        with mock.patch('core.management.commands.runworker.ProcessPoolExecutor', Pool), \
+                mock.patch('core.management.commands.runworker.close_old_connections'):
+            call_command('runworker', '--once', '--processes', '2', stdout=out)
+        self.assertEqual(len(pools), 2)
+        self.assertIn('requeued 2 jobs', out.getvalue())
+        self.assertEqual(sorted(recorded), ['first', 'second'])
+        for job in jobs:
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ('done', 2))
+
+
+@override_settings(JOBS_RUN_EAGERLY=False, JOBS_TIMEOUT=0.3)
+class JobLeaseTests(TransactionTestCase):
+    """A running job's lease is renewed, so it is not run twice however long it takes"""
+    
+    def test_lease_renewed_while_running(self):
+        recorded.clear()
+        job = enqueue('tests.outlive_lease', seconds=1)
+        self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('done', 1))
+        self.assertEqual(recorded, [0])
+
+
+@override_settings(DELIVERABLE_DUE_SOON=24 * 60 * 60)
+class DeliverableReminderTests(TestCase):
+    """Each assignee is reminded once per kind as deliverables become due soon or overdue"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user('member', password='pass', role='project_user')
+    
+    def setUp(self):
+        self.now = timezone.now()
+    
+    def deliverable(self, hours, status='pending'):
+        return Deliverable.objects.create(
+            title=f'Due in {hours}h', description='Report', assigned_to=self.user, status=status,
+            due_date=self.now + timedelta(hours=hours)
+        )
+    
+    def sweep(self, now):
+        return {(notification.deliverable_id, notification.reminder_kind)
+                for notification in send_deliverable_reminders(now=now)}
+    
+    def test_due_dates_crossing_thresholds(self):
+        soon, late, old, _, far = [
+            self.deliverable(hours, status) for hours, status in
+            [(10, 'pending'), (-2, 'in-progress'), (-48, 'pending'), (-1, 'completed'), (50, 'pending')]
+        ]
+        # Written long before the sweeps, so only their due dates matter
+        Deliverable.objects.update(updated_at=self.now - timedelta(days=5))
+        
+        self.assertEqual(self.sweep(self.now), {(soon.pk, DUE_SOON), (late.pk, OVERDUE)})
+        self.assertEqual(self.sweep(self.now), set())
+        later = self.now + timedelta(hours=30)
+        with self.assertNumQueries(9):
+            self.assertEqual(self.sweep(later), {(soon.pk, OVERDUE), (far.pk, DUE_SOON)})
+        
+        # Sweeping the same days again only adds what was never sent
+        Notification.objects.update(title='Renamed')
+        SweepCheckpoint.objects.update(swept_until=self.now - timedelta(days=5))
+        self.assertEqual(self.sweep(later), {(old.pk, OVERDUE)})
+        self.assertEqual(Notification.objects.filter(notification_type='deliverable_due').count(), 5)
+    
+    def test_changed_deliverables(self):
+        reopened = self.deliverable(-3, 'completed')
+        moved = self.deliverable(100)
+        self.assertEqual(self.sweep(self.now), set())
+        
+        created = self.deliverable(2)
+        reopened.status = 'pending'
+        reopened.save()
+        moved.due_date = self.now + timedelta(hours=5)
+        moved.save()
+        now = timezone.now()
+        self.assertEqual(
+            self.sweep(now), {(created.pk, DUE_SOON), (reopened.pk, OVERDUE), (moved.pk, DUE_SOON)}
+        )
+        
+        # Editing a deliverable already reminded of sends nothing new
+        created.notes = 'Started'
+        created.save()
+        self.assertEqual(self.sweep(timezone.now()), set())
+    
+    def test_sweep_seeks_the_due_date_index(self):
+        plan = open_deliverables_due(self.now, self.now + timedelta(hours=1)).explain()
+        self.assertIn('core_delive_status_76e1e6_idx', plan)
+    
+    @override_settings(JOBS_RUN_EAGERLY=False)
+    def test_runs_periodically(self):
+        self.assertIn('core.send_deliverable_reminders', PERIODIC_TASKS)
+        schedule_periodic_tasks()
+        schedule_periodic_tasks()
+        self.assertEqual(Job.objects.filter(status='queued').count(), len(PERIODIC_TASKS))
+        self.assertEqual(run_pending(), len(PERIODIC_TASKS))
+        # Each run schedules the next one an interval later
+        upcoming = Job.objects.get(status='queued', name='core.send_deliverable_reminders')
+        self.assertGreater(upcoming.run_after, timezone.now() + timedelta(minutes=10))
+        self.assertEqual(run_pending(), 0)
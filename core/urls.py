@@ -14,6 +14,7 @@ urlpatterns = [
     # Event URLs
     path('events/', views.event_list, name='event_list'),
     path('events/create/', views.event_create, name='event_create'),
+    path('events/free-slots/', views.event_free_slots, name='event_free_slots'),
     path('events/<int:pk>/', views.event_detail, name='event_detail'),
     path('events/<int:pk>/edit/', views.event_edit, name='event_edit'),
     path('events/<int:pk>/quick-decisions/', views.quick_add_decisions, name='quick_add_decisions'),
@@ -42,6 +43,12 @@ urlpatterns = [
     path('invitations/<int:pk>/respond-ajax/', views.invitation_respond_ajax, name='invitation_respond_ajax'),
     path('my-invitations/', views.my_invitations, name='my_invitations'),
     
+    # Search URLs
+    path('search/', views.search, name='search'),
+    
+    # Form picker URLs
+    path('autocomplete/<slug:scope>/', views.autocomplete, name='autocomplete'),
+    
     # Management User URLs
     path('management/team-overview/', views.team_overview, name='team_overview'),
     path('management/workload/', views.workload_distribution, name='workload_distribution'),
@@ -54,6 +61,7 @@ urlpatterns = [
     path('permissions/', views.manage_user_permissions, name='manage_user_permissions'),
     path('permissions/user/<int:user_id>/', views.user_permissions_detail, name='user_permissions_detail'),
     path('permissions/toggle/', views.toggle_user_permission, name='toggle_user_permission'),
+    path('permissions/bulk/', views.bulk_apply_permission_profile, name='bulk_apply_permission_profile'),
     
     # Notification URLs
     path('notifications/', views.notification_list, name='notification_list'),
@@ -0,0 +1,34 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+def parse_datetime_param(value):
+    """Parse an ISO date or datetime query parameter into an aware datetime"""
+    if not value:
+        return None
+    # A '+' in an unencoded offset arrives as a space
+    value = value.strip().replace(' ', '+')
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            parsed_date = parse_date(value[:10])
+            if parsed_date is None:
+                return None
+            parsed = datetime.combine(parsed_date, time.min)
+    except ValueError:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_date_param(value):
+    """Parse an ISO date query parameter, ignoring any time part"""
+    if not value:
+        return None
+    try:
+        return parse_date(value.strip()[:10])
+    except ValueError:
+        return None
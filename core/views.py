@@ -3,46 +3,96 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.db.models import Q, Count, F, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_POST
+import csv
+import json
+from datetime import timedelta
 
-from accounts.models import CustomUser
+from accounts.models import CustomUser, PERMISSION_BITS, permission_mask_expression
+from accounts.profiles import UnknownProfile, apply_permission_profile
 from accounts.permissions import (
     admin_required, management_required, project_user_required,
     require_management_or_admin,
     AdminRequiredMixin, ManagementRequiredMixin, ProjectUserRequiredMixin
 )
+from .access import MEMBER_RELATIONS, PROGRESS, accessible_events, object_permissions
+from .conflicts import find_conflicts
+from .jobs import PRIORITY_HIGH, enqueue
 from .models import Project, Event, Decision, Deliverable, Invitation, Notification
+from .pagination import KeysetPaginator
+from .notifications import notification_payload, publish_unread_count, reset_unread_count, unread_count
+from .scheduling import find_common_free_slots
+from .search import SEARCH_DOCUMENTS, filter_queryset, search_results
+from .utils import parse_datetime_param
 from .forms import (
     ProjectForm, EventForm, DecisionForm, DeliverableForm, 
-    DeliverableProgressForm, InvitationForm, InvitationResponseForm
+    DeliverableProgressForm, InvitationForm, InvitationResponseForm,
+    AUTOCOMPLETE_SCOPES, PERMISSION_SEARCH_FIELDS, event_project_choices, prefix_search,
+    schedulable_user_choices, with_choice_labels
 )
 
 User = get_user_model()
 
+
+def _paginate(request, queryset, ordering, per_page=10):
+    """
+    Offset pages by default. Requests carrying a ``cursor`` (empty for the
+    first page) and JSON requests get keyset pages, which cost the same at
+    any depth.
+    """
+    if 'cursor' in request.GET or request.GET.get('format') == 'json':
+        return KeysetPaginator(queryset, ordering, per_page).get_page(request.GET.get('cursor'))
+    return Paginator(queryset, per_page).get_page(request.GET.get('page'))
+
+
+def _invite_participants_later(event, invited_by):
+    """Queue invitations for the event's participants, off the request"""
+    enqueue(
+        'core.invite_participants',
+        priority=PRIORITY_HIGH,
+        dedup_key=f'invite-participants:{event.pk}',
+        event_id=event.pk,
+        invited_by_id=invited_by.pk
+    )
+
+
+def _keyset_json(page_obj, serialize):
+    return JsonResponse({
+        'results': [serialize(obj) for obj in page_obj],
+        'next_cursor': page_obj.next_cursor,
+        'previous_cursor': page_obj.previous_cursor,
+    })
+
+
 # ============= PROJECT VIEWS =============
 
 @management_required
 def project_list(request):
     """List all projects (admin) or user's projects (management)"""
     if request.user.is_admin:
-        projects = Project.objects.all().select_related('created_by').order_by('-created_at')
+        projects = Project.objects.all().select_related('created_by')
     else:
-        projects = Project.objects.filter(created_by=request.user).select_related('created_by').order_by('-created_at')
+        projects = Project.objects.filter(created_by=request.user).select_related('created_by')
     
     # Search functionality
     search_query = request.GET.get('search')
     if search_query:
-        projects = projects.filter(
-            Q(name__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
+        projects = filter_queryset(projects, search_query)
     
-    paginator = Paginator(projects, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = _paginate(request, projects, '-created_at')
+    
+    if request.GET.get('format') == 'json':
+        return _keyset_json(page_obj, lambda project: {
+            'id': project.id,
+            'name': project.name,
+            'description': project.description,
+            'created_by': project.created_by.username,
+            'created_at': project.created_at.isoformat(),
+        })
     
     context = {
         'page_obj': page_obj,
@@ -74,17 +124,17 @@ def project_create(request):
 @login_required
 def project_detail(request, pk):
     """Project detail view"""
-    project = get_object_or_404(Project, pk=pk)
+    permissions = object_permissions(request)
+    project = permissions.get_object_or_404(Project, pk)
     
     # Check permissions
-    if not request.user.is_admin and not request.user.is_management:
+    if not permissions.can_view(project):
+        if request.user.is_management:
+            messages.error(request, "You can only view your own projects.")
+            return redirect('core:my_projects')
         # Project users can only view projects they participate in
-        if not project.events.filter(participants=request.user).exists():
-            messages.error(request, "You don't have permission to view this project.")
-            return redirect('dashboard:index')
-    elif request.user.is_management and project.created_by != request.user:
-        messages.error(request, "You can only view your own projects.")
-        return redirect('core:my_projects')
+        messages.error(request, "You don't have permission to view this project.")
+        return redirect('dashboard:index')
     
     events = project.events.all().select_related('organizer').order_by('-start_time')
     recent_decisions = Decision.objects.filter(event__project=project).select_related('event', 'created_by').order_by('-created_at')[:5]
@@ -93,7 +143,7 @@ def project_detail(request, pk):
         'project': project,
         'events': events,
         'recent_decisions': recent_decisions,
-        'can_edit': request.user.is_admin or project.created_by == request.user,
+        'can_edit': permissions.can_edit(project),
     }
     return render(request, 'core/project_detail.html', context)
 
@@ -101,10 +151,11 @@ def project_detail(request, pk):
 @management_required
 def project_edit(request, pk):
     """Edit project"""
-    project = get_object_or_404(Project, pk=pk)
+    permissions = object_permissions(request)
+    project = permissions.get_object_or_404(Project, pk)
     
     # Check permissions
-    if not request.user.is_admin and project.created_by != request.user:
+    if not permissions.can_edit(project):
         messages.error(request, "You can only edit your own projects.")
         return redirect('core:project_detail', pk=pk)
     
@@ -156,27 +207,32 @@ def event_list(request):
     elif request.user.is_management:
         events = Event.objects.filter(project__created_by=request.user)
     else:
-        events = Event.objects.filter(
-            Q(organizer=request.user) | Q(participants=request.user)
-        ).distinct()
+        events = accessible_events(request.user, MEMBER_RELATIONS)
     
-    events = events.select_related('project', 'organizer').order_by('-start_time')
+    events = events.select_related('project', 'organizer')
     
     # Search functionality
     search_query = request.GET.get('search')
     if search_query:
-        events = events.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(project__name__icontains=search_query)
-        )
-    
-    paginator = Paginator(events, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        events = filter_queryset(events, search_query)
+    
+    page_obj = _paginate(request, events, '-start_time')
+    
+    if request.GET.get('format') == 'json':
+        return _keyset_json(page_obj, lambda event: {
+            'id': event.id,
+            'title': event.title,
+            'project': event.project.name,
+            'organizer': event.organizer.username,
+            'start_time': event.start_time.isoformat(),
+            'end_time': event.end_time.isoformat(),
+            'venue': event.venue,
+        })
     
     context = {
         'page_obj': page_obj,
+        'events': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
         'search_query': search_query,
     }
     return render(request, 'core/event_list.html', context)
@@ -193,32 +249,13 @@ def event_create(request):
             event.save()
             form.save_m2m()  # Save many-to-many relationships
             
-            # Create invitations and notifications for participants
-            for participant in event.participants.all():
-                # Create invitation
-                invitation, created = Invitation.objects.get_or_create(
-                    event=event,
-                    invitee=participant,
-                    defaults={
-                        'invited_by': request.user,
-                        'message': f'You have been invited to participate in "{event.title}"'
-                    }
-                )
-                
-                # Create notification for the participant
-                if created:  # Only create notification if invitation was newly created
-                    Notification.objects.create(
-                        user=participant,
-                        title=f'New Event Invitation: {event.title}',
-                        message=f'{request.user.get_full_name() or request.user.username} has invited you to participate in "{event.title}" on {event.start_time.strftime("%B %d, %Y at %I:%M %p")}',
-                        notification_type='event_invitation',
-                        event=event,
-                        invitation=invitation
-                    )
+            # Invite and notify the participants in the background
+            _invite_participants_later(event, request.user)
             
             # Check for conflicts
-            if event.has_conflicts():
-                conflicts = event.get_conflicting_events()
+            conflict_ids = find_conflicts([event])[event.pk]
+            if conflict_ids:
+                conflicts = Event.objects.filter(pk__in=conflict_ids).order_by('start_time')
                 conflict_list = ', '.join([e.title for e in conflicts[:3]])
                 messages.warning(
                     request, 
@@ -240,22 +277,17 @@ def event_create(request):
 @login_required
 def event_detail(request, pk):
     """Event detail view"""
-    event = get_object_or_404(Event, pk=pk)
+    permissions = object_permissions(request)
+    event = permissions.get_object_or_404(Event, pk)
     
     # Check permissions
-    can_view = (
-        request.user.is_admin or
-        (request.user.is_management and event.project.created_by == request.user) or
-        event.organizer == request.user or
-        event.participants.filter(id=request.user.id).exists()
-    )
-    
-    if not can_view:
+    if not permissions.can_view(event):
         messages.error(request, "You don't have permission to view this event.")
         return redirect('dashboard:index')
     
     decisions = event.decisions.all().select_related('created_by').order_by('-created_at')
-    conflicts = event.get_conflicting_events() if event.pk else []
+    conflict_ids = find_conflicts([event]).get(event.pk, set())
+    conflicts = Event.objects.filter(pk__in=conflict_ids).select_related('project') if conflict_ids else []
     
     # Get invitation status for current user
     user_invitation = None
@@ -270,8 +302,7 @@ def event_detail(request, pk):
         'decisions': decisions,
         'conflicts': conflicts,
         'user_invitation': user_invitation,
-        'can_edit': request.user.is_admin or event.organizer == request.user or 
-                   (request.user.is_management and event.project.created_by == request.user),
+        'can_edit': permissions.can_edit(event),
         'now': timezone.now(),
     }
     return render(request, 'core/event_detail.html', context)
@@ -280,16 +311,11 @@ def event_detail(request, pk):
 @project_user_required
 def event_edit(request, pk):
     """Edit event"""
-    event = get_object_or_404(Event, pk=pk)
+    permissions = object_permissions(request)
+    event = permissions.get_object_or_404(Event, pk)
     
     # Check permissions
-    can_edit = (
-        request.user.is_admin or
-        event.organizer == request.user or
-        (request.user.is_management and event.project.created_by == request.user)
-    )
-    
-    if not can_edit:
+    if not permissions.can_edit(event):
         messages.error(request, "You don't have permission to edit this event.")
         return redirect('core:event_detail', pk=pk)
     
@@ -318,7 +344,7 @@ def quick_add_decisions(request, pk):
     can_add = (
         request.user.is_admin or
         request.user.is_management or
-        event.created_by == request.user
+        event.organizer_id == request.user.id
     )
     
     if not can_add:
@@ -364,9 +390,7 @@ def my_events(request):
     elif request.user.is_management:
         events = Event.objects.filter(project__created_by=request.user)
     else:
-        events = Event.objects.filter(
-            Q(organizer=request.user) | Q(participants=request.user)
-        ).distinct()
+        events = accessible_events(request.user, MEMBER_RELATIONS)
     
     events = events.select_related('project', 'organizer').order_by('-start_time')
     
@@ -388,13 +412,25 @@ def decision_list(request):
             Q(created_by=request.user) | Q(event__participants=request.user)
         ).distinct()
     
-    decisions = decisions.select_related('event__project', 'created_by').order_by('-created_at')
+    decisions = decisions.select_related('event__project', 'created_by')
     
-    paginator = Paginator(decisions, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = _paginate(request, decisions, '-created_at')
     
-    context = {'page_obj': page_obj}
+    if request.GET.get('format') == 'json':
+        return _keyset_json(page_obj, lambda decision: {
+            'id': decision.id,
+            'title': decision.title,
+            'event': decision.event.title,
+            'project': decision.event.project.name,
+            'created_by': decision.created_by.username,
+            'created_at': decision.created_at.isoformat(),
+        })
+    
+    context = {
+        'page_obj': page_obj,
+        'decisions': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+    }
     return render(request, 'core/decision_list.html', context)
 
 
@@ -421,17 +457,11 @@ def decision_create(request):
 @login_required
 def decision_detail(request, pk):
     """Decision detail view"""
-    decision = get_object_or_404(Decision, pk=pk)
+    permissions = object_permissions(request)
+    decision = permissions.get_object_or_404(Decision, pk)
     
     # Check permissions
-    can_view = (
-        request.user.is_admin or
-        (request.user.is_management and decision.event.project.created_by == request.user) or
-        decision.created_by == request.user or
-        decision.event.participants.filter(id=request.user.id).exists()
-    )
-    
-    if not can_view:
+    if not permissions.can_view(decision):
         messages.error(request, "You don't have permission to view this decision.")
         return redirect('dashboard:index')
     
@@ -440,8 +470,7 @@ def decision_detail(request, pk):
     context = {
         'decision': decision,
         'deliverables': deliverables,
-        'can_edit': request.user.is_admin or decision.created_by == request.user or
-                   (request.user.is_management and decision.event.project.created_by == request.user),
+        'can_edit': permissions.can_edit(decision),
     }
     return render(request, 'core/decision_detail.html', context)
 
@@ -449,16 +478,11 @@ def decision_detail(request, pk):
 @login_required
 def decision_edit(request, pk):
     """Edit an existing decision"""
-    decision = get_object_or_404(Decision, pk=pk)
+    permissions = object_permissions(request)
+    decision = permissions.get_object_or_404(Decision, pk)
     
     # Check permissions
-    can_edit = (
-        request.user.is_admin or 
-        decision.created_by == request.user or
-        (request.user.is_management and decision.event.project.created_by == request.user)
-    )
-    
-    if not can_edit:
+    if not permissions.can_edit(decision):
         messages.error(request, "You don't have permission to edit this decision.")
         return redirect('core:decision_detail', pk=pk)
     
@@ -510,19 +534,30 @@ def deliverable_list(request):
     
     deliverables = deliverables.select_related(
         'assigned_to', 'decision__event__project'
-    ).order_by('-created_at')
+    )
     
     # Filter by status
     status_filter = request.GET.get('status')
     if status_filter:
         deliverables = deliverables.filter(status=status_filter)
     
-    paginator = Paginator(deliverables, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = _paginate(request, deliverables, '-created_at')
+    
+    if request.GET.get('format') == 'json':
+        return _keyset_json(page_obj, lambda deliverable: {
+            'id': deliverable.id,
+            'title': deliverable.title,
+            'status': deliverable.status,
+            'progress': deliverable.progress,
+            'assigned_to': deliverable.assigned_to.username,
+            'due_date': deliverable.due_date.isoformat() if deliverable.due_date else None,
+            'created_at': deliverable.created_at.isoformat(),
+        })
     
     context = {
         'page_obj': page_obj,
+        'deliverables': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
         'status_filter': status_filter,
         'status_choices': Deliverable.STATUS_CHOICES,
     }
@@ -565,35 +600,17 @@ def deliverable_create(request):
 @login_required
 def deliverable_detail(request, pk):
     """Deliverable detail view"""
-    deliverable = get_object_or_404(Deliverable, pk=pk)
+    permissions = object_permissions(request)
+    deliverable = permissions.get_object_or_404(Deliverable, pk)
     
     # Check permissions
-    can_view = (
-        request.user.is_admin or
-        deliverable.assigned_to == request.user or
-        (request.user.is_management and (
-            # Can view if they created the decision that led to this deliverable
-            (deliverable.decision and 
-             deliverable.decision.event.project.created_by == request.user) or
-            # For standalone deliverables, allow management users to view all
-            (not deliverable.decision)
-        ))
-    )
-    
-    if not can_view:
+    if not permissions.can_view(deliverable):
         messages.error(request, "You don't have permission to view this deliverable.")
         return redirect('dashboard:index')
     
     context = {
         'deliverable': deliverable,
-        'can_edit': request.user.is_admin or deliverable.assigned_to == request.user or
-                   (request.user.is_management and (
-                       # Can edit if they created the decision that led to this deliverable
-                       (deliverable.decision and
-                        deliverable.decision.event.project.created_by == request.user) or
-                       # For standalone deliverables, allow management users to edit all
-                       (not deliverable.decision)
-                   )),
+        'can_edit': permissions.can_edit(deliverable),
     }
     return render(request, 'core/deliverable_detail.html', context)
 
@@ -601,27 +618,16 @@ def deliverable_detail(request, pk):
 @login_required
 def deliverable_update(request, pk):
     """Update deliverable progress"""
-    deliverable = get_object_or_404(Deliverable, pk=pk)
+    permissions = object_permissions(request)
+    deliverable = permissions.get_object_or_404(Deliverable, pk)
     
     # Check permissions
-    can_edit = (
-        request.user.is_admin or
-        deliverable.assigned_to == request.user or
-        (request.user.is_management and (
-            # Can edit if they created the decision that led to this deliverable
-            (deliverable.decision and
-             deliverable.decision.event.project.created_by == request.user) or
-            # For standalone deliverables, allow management users to edit all
-            (not deliverable.decision)
-        ))
-    )
-    
-    if not can_edit:
+    if not permissions.can_edit(deliverable):
         messages.error(request, "You don't have permission to edit this deliverable.")
         return redirect('core:deliverable_detail', pk=pk)
     
     # Use different form based on user role
-    if deliverable.assigned_to == request.user and not request.user.is_admin:
+    if deliverable.assigned_to_id == request.user.id and not request.user.is_admin:
         form_class = DeliverableProgressForm
     else:
         form_class = DeliverableForm
@@ -786,10 +792,11 @@ def my_invitations(request):
 @login_required
 def quick_progress_update(request, pk):
     """Quick AJAX progress update"""
-    deliverable = get_object_or_404(Deliverable, pk=pk)
+    permissions = object_permissions(request)
+    deliverable = permissions.get_object_or_404(Deliverable, pk)
     
     # Check permissions
-    if deliverable.assigned_to != request.user and not request.user.is_admin:
+    if not permissions.has(deliverable, PROGRESS):
         return JsonResponse({'error': 'Permission denied'}, status=403)
     
     try:
@@ -831,48 +838,12 @@ def invitation_respond_ajax(request, pk):
         if response == 'accepted':
             invitation.event.participants.add(request.user)
             message = 'Invitation accepted! You have been added to the event.'
-            
-            # Create notification for event organizer and project creator
-            organizer = invitation.event.organizer
-            project_creator = invitation.event.project.created_by if invitation.event.project else None
-            
-            # Notify event organizer
-            if organizer and organizer != request.user:
-                Notification.objects.create(
-                    user=organizer,
-                    title=f'Invitation Accepted',
-                    message=f'{request.user.get_full_name() or request.user.username} accepted the invitation to "{invitation.event.title}"',
-                    notification_type='invitation_response',
-                    event=invitation.event,
-                    invitation=invitation
-                )
-            
-            # Notify project creator (if different from organizer)
-            if project_creator and project_creator != request.user and project_creator != organizer:
-                Notification.objects.create(
-                    user=project_creator,
-                    title=f'Event Invitation Accepted',
-                    message=f'{request.user.get_full_name() or request.user.username} accepted the invitation to "{invitation.event.title}" in project "{invitation.event.project.name}"',
-                    notification_type='invitation_response',
-                    event=invitation.event,
-                    invitation=invitation
-                )
-                
         else:
             invitation.event.participants.remove(request.user)
             message = 'Invitation declined.'
-            
-            # Create notification for decline (optional - you can remove this if you don't want decline notifications)
-            organizer = invitation.event.organizer
-            if organizer and organizer != request.user:
-                Notification.objects.create(
-                    user=organizer,
-                    title=f'Invitation Declined',
-                    message=f'{request.user.get_full_name() or request.user.username} declined the invitation to "{invitation.event.title}"',
-                    notification_type='invitation_response',
-                    event=invitation.event,
-                    invitation=invitation
-                )
+        
+        # Notify the organizer and project creator in the background
+        enqueue('core.notify_invitation_response', invitation_id=invitation.pk, response=response)
         
         return JsonResponse({
             'success': True,
@@ -884,6 +855,119 @@ def invitation_respond_ajax(request, pk):
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 
+@login_required
+def event_free_slots(request):
+    """
+    AJAX endpoint suggesting free slots for a set of participants and a venue.
+    
+    Busy times are only revealed for people the user may schedule into the
+    chosen project (``schedulable_user_choices``).
+    """
+    try:
+        project_id = int(request.GET.get('project', ''))
+        participant_ids = {
+            int(value)
+            for raw in request.GET.getlist('participants')
+            for value in raw.split(',')
+            if value.strip()
+        }
+        duration = timedelta(minutes=int(request.GET.get('duration', 60)))
+        limit = min(int(request.GET.get('limit', 5)), 50)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid parameters'}, status=400)
+    
+    if duration <= timedelta(0) or limit <= 0:
+        return JsonResponse({'error': 'Invalid parameters'}, status=400)
+    
+    project = event_project_choices(request.user).filter(pk=project_id).first()
+    if project is None:
+        return JsonResponse({'error': 'You cannot schedule events in this project'}, status=403)
+    allowed_ids = set(
+        schedulable_user_choices(request.user, project)
+        .filter(pk__in=participant_ids)
+        .values_list('pk', flat=True)
+    )
+    if participant_ids - allowed_ids:
+        return JsonResponse({'error': 'Some participants are not members of this project'}, status=403)
+    
+    # The organizer has to attend as well
+    participant_ids.add(request.user.id)
+    
+    window_start = parse_datetime_param(request.GET.get('start')) or timezone.now()
+    window_end = parse_datetime_param(request.GET.get('end')) or window_start + timedelta(days=14)
+    if window_end <= window_start or window_end - window_start > timedelta(days=366):
+        return JsonResponse({'error': 'Invalid search window'}, status=400)
+    
+    slots = find_common_free_slots(
+        participant_ids,
+        request.GET.get('venue', ''),
+        window_start,
+        window_end,
+        duration,
+        limit
+    )
+    
+    return JsonResponse({
+        'slots': [
+            {'start': start.isoformat(), 'end': end.isoformat()}
+            for start, end in slots
+        ]
+    })
+
+
+@login_required
+def autocomplete(request, scope):
+    """AJAX endpoint listing the choices of a form picker that start with ``q``"""
+    if scope not in AUTOCOMPLETE_SCOPES:
+        return JsonResponse({'error': 'Unknown picker'}, status=404)
+    try:
+        limit = min(int(request.GET.get('limit', 20)), 50)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid parameters'}, status=400)
+    if limit <= 0:
+        return JsonResponse({'error': 'Invalid parameters'}, status=400)
+    
+    choices, search_fields = AUTOCOMPLETE_SCOPES[scope]
+    term = request.GET.get('q', '').strip()[:100]
+    matches = with_choice_labels(prefix_search(choices(request.user), search_fields, term))
+    
+    return JsonResponse({
+        'results': [
+            {'id': obj.pk, 'text': str(obj)}
+            for obj in matches[:limit]
+        ]
+    })
+
+
+# ============= SEARCH =============
+
+@login_required
+def search(request):
+    """Ranked full-text search over the projects, events, decisions and deliverables the user can see"""
+    query = request.GET.get('q', '').strip()[:200]
+    kinds = [kind for kind in request.GET.getlist('kind') if kind in SEARCH_DOCUMENTS]
+    try:
+        limit = min(int(request.GET.get('limit', 20)), 50)
+    except ValueError:
+        limit = 20
+    
+    results = search_results(request.user, query, kinds, max(limit, 1)) if query else []
+    
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'query': query, 'results': results})
+    
+    context = {
+        'query': query,
+        'kinds': kinds,
+        'kind_choices': [
+            (kind, model._meta.verbose_name_plural.title())
+            for kind, (model, *_) in SEARCH_DOCUMENTS.items()
+        ],
+        'results': results,
+    }
+    return render(request, 'core/search.html', context)
+
+
 # ============= MANAGEMENT USER VIEWS =============
 
 @management_required
@@ -915,38 +999,87 @@ def team_overview(request):
     return render(request, 'core/management/team_overview.html', context)
 
 
+WORKLOAD_EXPORT_FIELDS = [
+    'username', 'full_name', 'email', 'role', 'total_tasks', 'pending_tasks',
+    'completed_tasks', 'overdue_tasks', 'completion_rate', 'workload_percentage',
+]
+
+
+def _team_workload(user_projects):
+    """Per-member deliverable counters for the given projects in a single grouped query"""
+    project_tasks = Q(assigned_deliverables__decision__event__project__in=user_projects)
+    open_tasks = Q(assigned_deliverables__status__in=['pending', 'in-progress'])
+    team_members = User.objects.filter(
+        pk__in=Event.participants.through.objects.filter(
+            event__project__in=user_projects
+        ).values('customuser_id')
+    ).annotate(
+        total_tasks=Count('assigned_deliverables', filter=project_tasks),
+        pending_tasks=Count('assigned_deliverables', filter=project_tasks & open_tasks),
+        completed_tasks=Count(
+            'assigned_deliverables',
+            filter=project_tasks & Q(assigned_deliverables__status='completed')
+        ),
+        overdue_tasks=Count(
+            'assigned_deliverables',
+            filter=project_tasks & open_tasks & Q(assigned_deliverables__due_date__lt=timezone.now())
+        ),
+    ).order_by('username')
+    
+    return [
+        {
+            'member': member,
+            'pending_tasks': member.pending_tasks,
+            'completed_tasks': member.completed_tasks,
+            'overdue_tasks': member.overdue_tasks,
+            'total_tasks': member.total_tasks,
+            'completion_rate': (member.completed_tasks / member.total_tasks * 100) if member.total_tasks > 0 else 0,
+            'workload_percentage': min(member.total_tasks * 5, 100)  # Scale tasks to percentage (max 100%)
+        }
+        for member in team_members
+    ]
+
+
+def _workload_export_rows(team_workload):
+    """Flatten workload entries into plain rows for CSV/JSON export"""
+    for workload in team_workload:
+        member = workload['member']
+        yield {
+            'username': member.username,
+            'full_name': member.get_full_name(),
+            'email': member.email,
+            'role': member.role,
+            'total_tasks': workload['total_tasks'],
+            'pending_tasks': workload['pending_tasks'],
+            'completed_tasks': workload['completed_tasks'],
+            'overdue_tasks': workload['overdue_tasks'],
+            'completion_rate': round(workload['completion_rate'], 1),
+            'workload_percentage': workload['workload_percentage'],
+        }
+
+
 @management_required
 def workload_distribution(request):
-    """Management view for workload distribution analysis"""
+    """Management view for workload distribution analysis
+    
+    ``?format=csv`` or ``?format=json`` returns the same per-member data
+    as a download instead of the page.
+    """
     user_projects = Project.objects.filter(created_by=request.user)
     
     # Get workload data for team members
-    team_workload = []
-    team_members = User.objects.filter(
-        events_participated__project__in=user_projects
-    ).distinct()
-    
-    for member in team_members:
-        assigned_tasks = Deliverable.objects.filter(
-            assigned_to=member,
-            decision__event__project__in=user_projects
-        )
-        pending_tasks = assigned_tasks.filter(status__in=['pending', 'in_progress']).count()
-        completed_tasks = assigned_tasks.filter(status='completed').count()
-        overdue_tasks = assigned_tasks.filter(
-            due_date__lt=timezone.now().date(),
-            status__in=['pending', 'in_progress']
-        ).count()
-        
-        team_workload.append({
-            'member': member,
-            'pending_tasks': pending_tasks,
-            'completed_tasks': completed_tasks,
-            'overdue_tasks': overdue_tasks,
-            'total_tasks': assigned_tasks.count(),
-            'completion_rate': (completed_tasks / assigned_tasks.count() * 100) if assigned_tasks.count() > 0 else 0,
-            'workload_percentage': min(assigned_tasks.count() * 5, 100)  # Scale tasks to percentage (max 100%)
-        })
+    team_workload = _team_workload(user_projects)
+    
+    export_format = request.GET.get('format')
+    if export_format == 'json':
+        return JsonResponse({'team_workload': list(_workload_export_rows(team_workload))})
+    if export_format == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="workload_distribution.csv"'
+        writer = csv.DictWriter(response, fieldnames=WORKLOAD_EXPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(_workload_export_rows(team_workload))
+        return response
     
     context = {
         'team_workload': team_workload,
@@ -967,30 +1100,55 @@ def task_progress(request):
     
     user_deliverables = Deliverable.objects.filter(assigned_to=request.user)
     
+    # Status counts per project in one grouped query; the overall
+    # statistics are the sum of the groups (including unlinked tasks)
+    project_counts = user_deliverables.order_by().values('decision__event__project_id').annotate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='completed')),
+        in_progress=Count('id', filter=Q(status='in-progress')),
+        pending=Count('id', filter=Q(status='pending')),
+        overdue=Count('id', filter=Q(
+            due_date__lt=timezone.now(),
+            status__in=['pending', 'in-progress']
+        )),
+    )
+    counts_by_project = {row['decision__event__project_id']: row for row in project_counts}
+    
     # Progress statistics
-    total_tasks = user_deliverables.count()
-    completed_tasks = user_deliverables.filter(status='completed').count()
-    in_progress_tasks = user_deliverables.filter(status='in_progress').count()
-    pending_tasks = user_deliverables.filter(status='pending').count()
-    overdue_tasks = user_deliverables.filter(
-        due_date__lt=timezone.now().date(),
-        status__in=['pending', 'in_progress']
-    ).count()
+    total_tasks = sum(row['total'] for row in counts_by_project.values())
+    completed_tasks = sum(row['completed'] for row in counts_by_project.values())
+    in_progress_tasks = sum(row['in_progress'] for row in counts_by_project.values())
+    pending_tasks = sum(row['pending'] for row in counts_by_project.values())
+    overdue_tasks = sum(row['overdue'] for row in counts_by_project.values())
+    
+    # Recent 3 tasks of every project in one partitioned query
+    user_projects = list(Project.objects.filter(events__participants=request.user).distinct())
+    recent_tasks = {}
+    for task in user_deliverables.filter(
+        decision__event__project__in=[project.id for project in user_projects]
+    ).annotate(
+        project_id=F('decision__event__project_id'),
+        recent_rank=Window(
+            RowNumber(),
+            partition_by=F('decision__event__project_id'),
+            order_by=F('created_at').desc()
+        )
+    ).filter(recent_rank__lte=3).order_by('project_id', 'recent_rank'):
+        recent_tasks.setdefault(task.project_id, []).append(task)
     
     # Progress by project
     project_progress = {}
-    user_projects = Project.objects.filter(events__participants=request.user).distinct()
     for project in user_projects:
-        project_tasks = user_deliverables.filter(decision__event__project=project)
-        project_completed = project_tasks.filter(status='completed').count()
-        project_total = project_tasks.count()
+        counts = counts_by_project.get(project.id, {'total': 0, 'completed': 0})
+        project_total = counts['total']
+        project_completed = counts['completed']
         completion_rate = (project_completed / project_total * 100) if project_total > 0 else 0
         
         project_progress[project] = {
             'total': project_total,
             'completed': project_completed,
             'completion_rate': completion_rate,
-            'tasks': project_tasks[:3]  # Recent 3 tasks
+            'tasks': recent_tasks.get(project.id, [])  # Recent 3 tasks
         }
     
     context = {
@@ -1036,17 +1194,15 @@ def time_tracker(request):
 @require_management_or_admin
 def manage_user_permissions(request):
     """Manage project user permissions"""
-    project_users = CustomUser.objects.filter(role='project_user').order_by('username')
+    # The packed mask answers the permission badges without reading each flag
+    project_users = CustomUser.objects.filter(role='project_user').annotate(
+        permission_mask=permission_mask_expression()
+    ).order_by('username')
     
     # Search functionality
     search_query = request.GET.get('search', '')
     if search_query:
-        project_users = project_users.filter(
-            Q(username__icontains=search_query) |
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(email__icontains=search_query)
-        )
+        project_users = prefix_search(project_users, PERMISSION_SEARCH_FIELDS, search_query.strip())
     
     context = {
         'project_users': project_users,
@@ -1076,14 +1232,17 @@ def user_permissions_detail(request, user_id):
     
     if request.method == 'POST':
         # Update permissions based on form data
+        changed_fields = []
         for perm_name, _, _ in permissions:
             new_value = perm_name in request.POST
             current_value = getattr(user, perm_name, False)
             
             if new_value != current_value:
                 setattr(user, perm_name, new_value)
+                changed_fields.append(perm_name)
         
-        user.save()
+        if changed_fields:
+            user.save(update_fields=[*changed_fields, 'updated_at'])
         messages.success(request, f'Permissions updated for {user.get_full_name() or user.username}')
         return redirect('core:user_permissions_detail', user_id=user.id)
     
@@ -1112,11 +1271,14 @@ def toggle_user_permission(request):
         user_id = request.POST.get('user_id')
         permission = request.POST.get('permission')
         
+        if permission not in PERMISSION_BITS:
+            return JsonResponse({'success': False, 'message': 'Unknown permission'})
+        
         try:
             user = CustomUser.objects.get(id=user_id, role='project_user')
             current_value = getattr(user, permission, False)
             setattr(user, permission, not current_value)
-            user.save()
+            user.save(update_fields=[permission, 'updated_at'])
             
             return JsonResponse({
                 'success': True,
@@ -1131,6 +1293,66 @@ def toggle_user_permission(request):
     return JsonResponse({'success': False, 'message': 'Invalid request'})
 
 
+@require_POST
+@login_required
+@require_management_or_admin
+def bulk_apply_permission_profile(request):
+    """
+    AJAX endpoint applying a named permission profile to many project users.
+
+    Takes ``profile`` plus ``user_ids`` (repeated or a JSON list), a name
+    ``search``, or ``all``, as form fields or a JSON body.
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return JsonResponse({'success': False, 'message': 'Invalid JSON'}, status=400)
+        user_ids = data.get('user_ids')
+        if user_ids is not None and not isinstance(user_ids, list):
+            return JsonResponse({'success': False, 'message': 'Invalid user ids'}, status=400)
+    else:
+        data = request.POST
+        user_ids = data.getlist('user_ids') or None
+    
+    users = CustomUser.objects.filter(role='project_user')
+    if user_ids is not None:
+        try:
+            users = users.filter(pk__in=[int(pk) for pk in user_ids])
+        except (TypeError, ValueError):
+            return JsonResponse({'success': False, 'message': 'Invalid user ids'}, status=400)
+    search_query = (data.get('search') or '').strip()
+    if search_query:
+        users = prefix_search(users, PERMISSION_SEARCH_FIELDS, search_query)
+    if user_ids is None and not search_query and not data.get('all'):
+        return JsonResponse({'success': False, 'message': 'Select users, a search, or all'}, status=400)
+    
+    try:
+        audit, diffs = apply_permission_profile(
+            data.get('profile'), users, actor=request.user, source='api'
+        )
+    except UnknownProfile:
+        return JsonResponse({'success': False, 'message': 'Unknown profile'}, status=400)
+    
+    usernames = dict(CustomUser.objects.filter(pk__in=diffs).values_list('pk', 'username'))
+    return JsonResponse({
+        'success': True,
+        'profile': data.get('profile'),
+        'changed': len(diffs),
+        'audit_id': audit.pk if audit else None,
+        'changes': [
+            {
+                'user_id': pk,
+                'username': usernames.get(pk),
+                'changes': {name: {'old': old, 'new': new} for name, (old, new) in changes.items()},
+            }
+            for pk, changes in sorted(diffs.items())
+        ],
+    })
+
+
 # ============================
 # Notification Views
 # ============================
@@ -1138,7 +1360,7 @@ def toggle_user_permission(request):
 @login_required
 def notification_list(request):
     """List user's notifications"""
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
+    notifications = Notification.objects.filter(user=request.user, held=False).order_by('-created_at')
     
     # Separate unread and read notifications
     unread_notifications = notifications.filter(is_read=False)
@@ -1147,7 +1369,7 @@ def notification_list(request):
     context = {
         'unread_notifications': unread_notifications,
         'read_notifications': read_notifications,
-        'total_unread': unread_notifications.count()
+        'total_unread': unread_count(request.user.id)
     }
     return render(request, 'core/notification_list.html', context)
 
@@ -1155,15 +1377,14 @@ def notification_list(request):
 @login_required
 def notification_count(request):
     """Get unread notification count for AJAX requests"""
-    count = Notification.objects.filter(user=request.user, is_read=False).count()
-    return JsonResponse({'count': count})
+    return JsonResponse({'count': unread_count(request.user.id)})
 
 
 @login_required
 def mark_notification_read(request, pk):
     """Mark a specific notification as read"""
     try:
-        notification = get_object_or_404(Notification, pk=pk, user=request.user)
+        notification = get_object_or_404(Notification, pk=pk, user=request.user, held=False)
         notification.is_read = True
         notification.save()
         
@@ -1184,7 +1405,9 @@ def mark_notification_read(request, pk):
 def mark_all_notifications_read(request):
     """Mark all notifications as read for the current user"""
     if request.method == 'POST':
-        Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        Notification.objects.filter(user=request.user, is_read=False, held=False).update(is_read=True)
+        reset_unread_count(request.user.id)
+        publish_unread_count(request.user.id)
         
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({'success': True})
@@ -1199,24 +1422,12 @@ def mark_all_notifications_read(request):
 def notification_dropdown(request):
     """Get recent notifications for dropdown"""
     notifications = Notification.objects.filter(
-        user=request.user
+        user=request.user, held=False
     ).order_by('-created_at')[:10]
     
-    notification_data = []
-    for notification in notifications:
-        notification_data.append({
-            'id': notification.id,
-            'title': notification.title,
-            'message': notification.message,
-            'type': notification.notification_type,
-            'is_read': notification.is_read,
-            'created_at': notification.created_at.strftime('%B %d, %Y at %I:%M %p'),
-            'url': notification.get_url()
-        })
-    
-    unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
+    notification_data = [notification_payload(notification) for notification in notifications]
     
     return JsonResponse({
         'notifications': notification_data,
-        'unread_count': unread_count
+        'unread_count': unread_count(request.user.id)
     })
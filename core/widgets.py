@@ -0,0 +1,54 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.forms.models import ModelChoiceIterator
+from django.urls import reverse
+
+
+class AutocompleteMixin:
+    """
+    Render only the selected options of a model choice field.
+
+    The remaining options are fetched on demand from the ``core:autocomplete``
+    endpoint for ``scope`` by the picker script in ``base.html``, so the
+    page does not grow with the size of the table behind the field.
+    """
+
+    def __init__(self, scope, attrs=None, choices=()):
+        self.scope = scope
+        super().__init__(attrs, choices)
+
+    def get_context(self, name, value, attrs):
+        attrs = {**(attrs or {}), 'data-autocomplete-url': reverse('core:autocomplete', args=[self.scope])}
+        return super().get_context(name, value, attrs)
+
+    def selected_choices(self, value):
+        if not isinstance(self.choices, ModelChoiceIterator):
+            return self.choices
+        field = self.choices.field
+        selected = [pk for pk in value if pk not in (None, '')]
+        choices = []
+        if not self.allow_multiple_selected and field.empty_label is not None:
+            choices.append(('', field.empty_label))
+        if selected:
+            try:
+                choices.extend(self.choices.choice(obj) for obj in self.choices.queryset.filter(pk__in=selected))
+            except (ValueError, TypeError, ValidationError):
+                # A tampered value; the field reports it as an invalid choice
+                pass
+        return choices
+
+    def optgroups(self, name, value, attrs=None):
+        all_choices = self.choices
+        self.choices = self.selected_choices(value)
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = all_choices
+
+
+class AutocompleteSelect(AutocompleteMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteMixin, forms.SelectMultiple):
+    pass
@@ -0,0 +1,20 @@
+"""
+Process setup for the ``runworker`` pool.
+
+Spawned processes start from a fresh interpreter and unpickle their
+initializer before Django is configured, so this module must not import
+models.
+"""
+import django
+
+
+def setup_worker_process(overrides=None):
+    """
+    Configure Django in a pool process. ``overrides`` are settings copied
+    from the parent, so both use the same database and cache even when the
+    parent's differ from the settings module (as under the test runner).
+    """
+    from django.conf import settings
+    for name, value in (overrides or {}).items():
+        setattr(settings, name, value)
+    django.setup()
@@ -0,0 +1,34 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.rollups import rebuild_daily_activity
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or backfill) the daily activity rollup from events, decisions and deliverables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only rebuild days on or after this date (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--project',
+            type=int,
+            action='append',
+            dest='projects',
+            help='Only rebuild the rows of the given project id (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError(f'Invalid date: {options["since"]}')
+
+        self.stdout.write('Rebuilding daily activity...')
+        count = rebuild_daily_activity(since=since, project_ids=options['projects'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} daily activity rows.'))
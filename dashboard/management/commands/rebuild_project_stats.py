@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.rollups import rebuild_project_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-project statistics rollup from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project',
+            type=int,
+            action='append',
+            dest='projects',
+            help='Only rebuild the given project id (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding project statistics...')
+        count = rebuild_project_stats(options['projects'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics for {count} projects.'))
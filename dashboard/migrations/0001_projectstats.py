@@ -0,0 +1,72 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_project_stats(apps, schema_editor):
+    Project = apps.get_model('core', 'Project')
+    Event = apps.get_model('core', 'Event')
+    Decision = apps.get_model('core', 'Decision')
+    Deliverable = apps.get_model('core', 'Deliverable')
+    ProjectStats = apps.get_model('dashboard', 'ProjectStats')
+
+    now = django.utils.timezone.now()
+    rows = {
+        project_id: ProjectStats(project_id=project_id, refreshed_at=now)
+        for project_id in Project.objects.values_list('id', flat=True)
+    }
+    for row in Event.objects.order_by().values('project_id').annotate(count=Count('id')):
+        rows[row['project_id']].event_count = row['count']
+    for row in Decision.objects.order_by().values('event__project_id').annotate(count=Count('id')):
+        rows[row['event__project_id']].decision_count = row['count']
+    deliverable_rows = Deliverable.objects.filter(decision__isnull=False).order_by().values(
+        'decision__event__project_id'
+    ).annotate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='completed')),
+        in_progress=Count('id', filter=Q(status='in-progress')),
+        pending=Count('id', filter=Q(status='pending')),
+        overdue=Count('id', filter=Q(due_date__lt=now, status__in=['pending', 'in-progress'])),
+    )
+    for row in deliverable_rows:
+        stats = rows[row['decision__event__project_id']]
+        stats.deliverable_count = row['total']
+        stats.completed_deliverables = row['completed']
+        stats.in_progress_deliverables = row['in_progress']
+        stats.pending_deliverables = row['pending']
+        stats.overdue_deliverables = row['overdue']
+    ProjectStats.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0005_busyinterval'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectStats',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='core.project')),
+                ('event_count', models.PositiveIntegerField(default=0)),
+                ('decision_count', models.PositiveIntegerField(default=0)),
+                ('deliverable_count', models.PositiveIntegerField(default=0)),
+                ('completed_deliverables', models.PositiveIntegerField(default=0)),
+                ('in_progress_deliverables', models.PositiveIntegerField(default=0)),
+                ('pending_deliverables', models.PositiveIntegerField(default=0)),
+                ('overdue_deliverables', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'project stats',
+            },
+        ),
+        migrations.RunPython(populate_project_stats, migrations.RunPython.noop),
+    ]
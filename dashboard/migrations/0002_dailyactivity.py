@@ -0,0 +1,68 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def populate_daily_activity(apps, schema_editor):
+    Event = apps.get_model('core', 'Event')
+    Decision = apps.get_model('core', 'Decision')
+    Deliverable = apps.get_model('core', 'Deliverable')
+    DailyActivity = apps.get_model('dashboard', 'DailyActivity')
+
+    sources = [
+        ('events_created', Event.objects.all(), 'project_id', 'organizer_id', 'created_at'),
+        ('decisions_created', Decision.objects.all(), 'event__project_id', 'created_by_id', 'created_at'),
+        ('deliverables_created', Deliverable.objects.all(),
+         'decision__event__project_id', 'assigned_to_id', 'created_at'),
+        ('deliverables_completed', Deliverable.objects.filter(status='completed'),
+         'decision__event__project_id', 'assigned_to_id', 'updated_at'),
+    ]
+    rows = {}
+    for field, queryset, project_lookup, user_lookup, timestamp in sources:
+        grouped = queryset.annotate(day=TruncDate(timestamp)).order_by().values(
+            'day', project_lookup, user_lookup
+        ).annotate(count=Count('id'))
+        for row in grouped:
+            keys = [(row['day'], None, None), (row['day'], None, row[user_lookup])]
+            if row[project_lookup] is not None:
+                keys.append((row['day'], row[project_lookup], None))
+            for key in keys:
+                if key not in rows:
+                    rows[key] = DailyActivity(day=key[0], project_id=key[1], user_id=key[2])
+                setattr(rows[key], field, getattr(rows[key], field) + row['count'])
+    DailyActivity.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_busyinterval'),
+        ('dashboard', '0001_projectstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('events_created', models.PositiveIntegerField(default=0)),
+                ('decisions_created', models.PositiveIntegerField(default=0)),
+                ('deliverables_created', models.PositiveIntegerField(default=0)),
+                ('deliverables_completed', models.PositiveIntegerField(default=0)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to='core.project')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'daily activity',
+                'indexes': [models.Index(fields=['project', 'day'], name='dashboard_d_project_da5f15_idx'), models.Index(fields=['user', 'day'], name='dashboard_d_user_id_b00d2e_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('project__isnull', True), ('user__isnull', True)), fields=('day',), name='unique_daily_activity_system'), models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('project', 'day'), name='unique_daily_activity_project'), models.UniqueConstraint(condition=models.Q(('project__isnull', True)), fields=('user', 'day'), name='unique_daily_activity_user')],
+            },
+        ),
+        migrations.RunPython(populate_daily_activity, migrations.RunPython.noop),
+    ]
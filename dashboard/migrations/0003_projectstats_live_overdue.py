@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:07
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_dailyactivity'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='projectstats',
+            name='overdue_deliverables',
+        ),
+    ]
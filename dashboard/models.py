@@ -1,3 +1,96 @@
+from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+from core.models import Project
+
+User = get_user_model()
+
+
+class ProjectStats(models.Model):
+    """Per-project rollup of event, decision and deliverable counters.
+    
+    Maintained incrementally by signals in ``dashboard.signals``. Overdue
+    counts are not stored: a deliverable becomes overdue without being
+    written, so they are counted live off the (status, due_date) index.
+    """
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    event_count = models.PositiveIntegerField(default=0)
+    decision_count = models.PositiveIntegerField(default=0)
+    deliverable_count = models.PositiveIntegerField(default=0)
+    completed_deliverables = models.PositiveIntegerField(default=0)
+    in_progress_deliverables = models.PositiveIntegerField(default=0)
+    pending_deliverables = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Stats for project {self.project_id}"
+    
+    class Meta:
+        verbose_name_plural = 'project stats'
+
+
+class DailyActivity(models.Model):
+    """Per-day counts of created events, decisions and deliverables and of completed deliverables.
+    
+    Each day has one system-wide row (no project, no user), one row per
+    active project and one row per active user (organizer, decision author
+    or assignee). Maintained incrementally by signals in
+    ``dashboard.signals``; ``rebuild_daily_activity`` backfills it and dates
+    completions by the deliverable's last update.
+    """
+    day = models.DateField()
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='daily_activity'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='daily_activity'
+    )
+    events_created = models.PositiveIntegerField(default=0)
+    decisions_created = models.PositiveIntegerField(default=0)
+    deliverables_created = models.PositiveIntegerField(default=0)
+    deliverables_completed = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        scope = f"project {self.project_id}" if self.project_id else (
+            f"user {self.user_id}" if self.user_id else "system"
+        )
+        return f"Activity for {scope} on {self.day}"
+    
+    class Meta:
+        verbose_name_plural = 'daily activity'
+        indexes = [
+            models.Index(fields=['project', 'day']),
+            models.Index(fields=['user', 'day']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day'],
+                condition=models.Q(project__isnull=True, user__isnull=True),
+                name='unique_daily_activity_system'
+            ),
+            models.UniqueConstraint(
+                fields=['project', 'day'],
+                condition=models.Q(user__isnull=True),
+                name='unique_daily_activity_project'
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'day'],
+                condition=models.Q(project__isnull=True),
+                name='unique_daily_activity_user'
+            ),
+        ]
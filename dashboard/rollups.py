@@ -0,0 +1,215 @@
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from core.models import Project, Event, Decision, Deliverable
+from .models import ProjectStats, DailyActivity
+
+# Deliverable status -> ProjectStats counter
+STATUS_FIELDS = {
+    'completed': 'completed_deliverables',
+    'in-progress': 'in_progress_deliverables',
+    'pending': 'pending_deliverables',
+}
+
+
+def rebuild_project_stats(project_ids=None):
+    """Recompute ProjectStats rows from scratch, for all projects or the given ids"""
+    now = timezone.now()
+    projects = Project.objects.all()
+    events = Event.objects.all()
+    decisions = Decision.objects.all()
+    deliverables = Deliverable.objects.filter(decision__isnull=False)
+    if project_ids is not None:
+        projects = projects.filter(pk__in=project_ids)
+        events = events.filter(project_id__in=project_ids)
+        decisions = decisions.filter(event__project_id__in=project_ids)
+        deliverables = deliverables.filter(decision__event__project_id__in=project_ids)
+
+    rows = {
+        project_id: ProjectStats(project_id=project_id, refreshed_at=now)
+        for project_id in projects.values_list('id', flat=True)
+    }
+
+    for row in events.order_by().values('project_id').annotate(count=Count('id')):
+        if row['project_id'] in rows:
+            rows[row['project_id']].event_count = row['count']
+
+    for row in decisions.order_by().values('event__project_id').annotate(count=Count('id')):
+        if row['event__project_id'] in rows:
+            rows[row['event__project_id']].decision_count = row['count']
+
+    deliverable_rows = deliverables.order_by().values('decision__event__project_id').annotate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='completed')),
+        in_progress=Count('id', filter=Q(status='in-progress')),
+        pending=Count('id', filter=Q(status='pending')),
+    )
+    for row in deliverable_rows:
+        stats = rows.get(row['decision__event__project_id'])
+        if stats:
+            stats.deliverable_count = row['total']
+            stats.completed_deliverables = row['completed']
+            stats.in_progress_deliverables = row['in_progress']
+            stats.pending_deliverables = row['pending']
+
+    stale = ProjectStats.objects.all()
+    if project_ids is not None:
+        stale = stale.filter(project_id__in=project_ids)
+    with transaction.atomic():
+        stale.delete()
+        ProjectStats.objects.bulk_create(rows.values(), batch_size=500)
+    return len(rows)
+
+
+def apply_project_deltas(project_id, **deltas):
+    """Add ``deltas`` to a project's counters with a single UPDATE"""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if project_id is None or not deltas:
+        return
+
+    ProjectStats.objects.filter(project_id=project_id).update(
+        **{field: Greatest(F(field) + delta, Value(0)) for field, delta in deltas.items()},
+        updated_at=timezone.now()
+    )
+
+
+def deliverable_contribution(status):
+    """Counters a deliverable in the given state adds to its project"""
+    contribution = {'deliverable_count': 1}
+    if status in STATUS_FIELDS:
+        contribution[STATUS_FIELDS[status]] = 1
+    return contribution
+
+
+def project_for_decision(decision_id):
+    """Project id a decision (and so its deliverables) belongs to"""
+    if decision_id is None:
+        return None
+    return Decision.objects.filter(pk=decision_id).values_list('event__project_id', flat=True).first()
+
+
+def project_for_event(event_id):
+    """Project id an event (and so its decisions) belongs to"""
+    if event_id is None:
+        return None
+    return Event.objects.filter(pk=event_id).values_list('project_id', flat=True).first()
+
+
+# ============= DAILY ACTIVITY =============
+
+ACTIVITY_FIELDS = ('events_created', 'decisions_created', 'deliverables_created', 'deliverables_completed')
+
+# Counter -> (queryset, project lookup, user lookup, timestamp the day is taken from)
+ACTIVITY_SOURCES = {
+    'events_created': (Event.objects.all(), 'project_id', 'organizer_id', 'created_at'),
+    'decisions_created': (Decision.objects.all(), 'event__project_id', 'created_by_id', 'created_at'),
+    'deliverables_created': (
+        Deliverable.objects.all(), 'decision__event__project_id', 'assigned_to_id', 'created_at'
+    ),
+    'deliverables_completed': (
+        Deliverable.objects.filter(status='completed'),
+        'decision__event__project_id', 'assigned_to_id', 'completed_at'
+    ),
+}
+
+
+def activity_rows_for(day, project_id, user_id):
+    """Keys of the system, project and user rows a single activity counts towards"""
+    keys = [(day, None, None)]
+    if project_id is not None:
+        keys.append((day, project_id, None))
+    if user_id is not None:
+        keys.append((day, None, user_id))
+    return keys
+
+
+def rebuild_daily_activity(since=None, project_ids=None):
+    """
+    Recompute DailyActivity rows from scratch.
+
+    ``since`` limits the rebuild to days on or after that date. With
+    ``project_ids`` only the rows of those projects are rebuilt, which is
+    what moving an event or decision between projects needs.
+    """
+    rows = {}
+    for field, (queryset, project_lookup, user_lookup, timestamp) in ACTIVITY_SOURCES.items():
+        queryset = queryset.annotate(day=TruncDate(timestamp))
+        if since is not None:
+            queryset = queryset.filter(day__gte=since)
+        if project_ids is not None:
+            queryset = queryset.filter(**{f'{project_lookup}__in': project_ids})
+        grouped = queryset.order_by().values('day', project_lookup, user_lookup).annotate(count=Count('id'))
+
+        for row in grouped:
+            keys = activity_rows_for(row['day'], row[project_lookup], row[user_lookup])
+            if project_ids is not None:
+                keys = [key for key in keys if key[1] is not None]
+            for day, project_id, user_id in keys:
+                activity = rows.get((day, project_id, user_id))
+                if activity is None:
+                    activity = rows[(day, project_id, user_id)] = DailyActivity(
+                        day=day, project_id=project_id, user_id=user_id
+                    )
+                setattr(activity, field, getattr(activity, field) + row['count'])
+
+    stale = DailyActivity.objects.all()
+    if since is not None:
+        stale = stale.filter(day__gte=since)
+    if project_ids is not None:
+        stale = stale.filter(project_id__in=project_ids)
+    with transaction.atomic():
+        stale.delete()
+        DailyActivity.objects.bulk_create(rows.values(), batch_size=500)
+    return len(rows)
+
+
+def apply_activity_deltas(day, project_id, user_id, **deltas):
+    """Add ``deltas`` to one DailyActivity row, creating it on first activity"""
+    rows = DailyActivity.objects.filter(day=day, project_id=project_id, user_id=user_id)
+    updates = {field: Greatest(F(field) + delta, Value(0)) for field, delta in deltas.items()}
+    if rows.update(**updates):
+        return
+
+    initial = {field: delta for field, delta in deltas.items() if delta > 0}
+    if not initial:
+        return
+    try:
+        with transaction.atomic():
+            DailyActivity.objects.create(day=day, project_id=project_id, user_id=user_id, **initial)
+    except IntegrityError:
+        # Another request created the row first
+        rows.update(**updates)
+
+
+def apply_activity_changes(old_entries, new_entries):
+    """
+    Move activity from ``old_entries`` to ``new_entries``.
+
+    Entries are ``(timestamp, project_id, user_id, field)`` tuples describing
+    what a row contributed before and after a write; only rows whose
+    counters actually change are touched.
+    """
+    changes = Counter()
+    for entries, sign in ((old_entries, -1), (new_entries, 1)):
+        for timestamp, project_id, user_id, field in entries:
+            for key in activity_rows_for(timezone.localdate(timestamp), project_id, user_id):
+                changes[key + (field,)] += sign
+
+    deltas = defaultdict(dict)
+    for (day, project_id, user_id, field), delta in changes.items():
+        if delta:
+            deltas[(day, project_id, user_id)][field] = delta
+    for (day, project_id, user_id), row_deltas in deltas.items():
+        apply_activity_deltas(day, project_id, user_id, **row_deltas)
+
+
+def deliverable_activity(project_id, user_id, status, created_at, completed_at):
+    """Activity entries a deliverable in the given state contributes"""
+    entries = [(created_at, project_id, user_id, 'deliverables_created')]
+    if status == 'completed':
+        entries.append((completed_at, project_id, user_id, 'deliverables_completed'))
+    return entries
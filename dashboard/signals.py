@@ -0,0 +1,225 @@
+from django.db.models.signals import post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.models import Project, Event, Decision, Deliverable
+from .models import ProjectStats
+from .rollups import (
+    apply_activity_changes, apply_project_deltas, deliverable_activity, deliverable_contribution,
+    project_for_decision, project_for_event, rebuild_daily_activity, rebuild_project_stats
+)
+
+
+# ============= SNAPSHOTS =============
+#
+# Both rollups move counters from what a row contributed when it was
+# loaded to what it contributes after a save. One snapshot per instance
+# records the fields either rollup compares; it is refreshed by the last
+# post_save receiver of this module, after both rollups have used it.
+
+SNAPSHOT_FIELDS = {
+    Event: ('project_id', 'organizer_id'),
+    Decision: ('event_id', 'created_by_id'),
+    Deliverable: ('decision_id', 'assigned_to_id', 'status', 'completed_at'),
+}
+
+
+def snapshot(instance):
+    """Current values of the fields the rollups compare a save against"""
+    return {field: getattr(instance, field) for field in SNAPSHOT_FIELDS[type(instance)]}
+
+
+@receiver(post_init, sender=Event)
+@receiver(post_init, sender=Decision)
+@receiver(post_init, sender=Deliverable)
+def remember_state(sender, instance, **kwargs):
+    instance._saved_state = snapshot(instance)
+
+
+# ============= PROJECT STATS ROLLUP =============
+#
+# Deletions are counted in pre_delete: cascades may remove the parent rows
+# needed to resolve the project before post_delete fires. pre_delete runs
+# inside the deletion's transaction, so a failed delete rolls these back.
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        ProjectStats.objects.get_or_create(project=instance)
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_project_id = instance._saved_state['project_id']
+    if created:
+        apply_project_deltas(instance.project_id, event_count=1)
+    elif old_project_id != instance.project_id:
+        # Moving an event moves its decisions and deliverables too
+        rebuild_project_stats([old_project_id, instance.project_id])
+
+
+@receiver(pre_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    apply_project_deltas(instance.project_id, event_count=-1)
+
+
+@receiver(post_save, sender=Decision)
+def decision_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_event_id = instance._saved_state['event_id']
+    if created:
+        apply_project_deltas(project_for_decision(instance.pk), decision_count=1)
+    elif old_event_id != instance.event_id:
+        old_project_id = project_for_event(old_event_id)
+        new_project_id = project_for_decision(instance.pk)
+        if old_project_id != new_project_id:
+            rebuild_project_stats([old_project_id, new_project_id])
+
+
+@receiver(pre_delete, sender=Decision)
+def decision_deleted(sender, instance, **kwargs):
+    apply_project_deltas(project_for_event(instance.event_id), decision_count=-1)
+
+
+@receiver(post_save, sender=Deliverable)
+def deliverable_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = instance._saved_state
+    deltas = {}
+
+    if not created:
+        if (old['decision_id'], old['status']) == (instance.decision_id, instance.status):
+            return
+        old_project_id = project_for_decision(old['decision_id'])
+        for field, value in deliverable_contribution(old['status']).items():
+            deltas.setdefault(old_project_id, {}).setdefault(field, 0)
+            deltas[old_project_id][field] -= value
+
+    new_project_id = project_for_decision(instance.decision_id)
+    for field, value in deliverable_contribution(instance.status).items():
+        deltas.setdefault(new_project_id, {}).setdefault(field, 0)
+        deltas[new_project_id][field] += value
+
+    for project_id, project_deltas in deltas.items():
+        apply_project_deltas(project_id, **project_deltas)
+
+
+@receiver(pre_delete, sender=Deliverable)
+def deliverable_deleted(sender, instance, **kwargs):
+    contribution = deliverable_contribution(instance.status)
+    apply_project_deltas(
+        project_for_decision(instance.decision_id),
+        **{field: -value for field, value in contribution.items()}
+    )
+
+
+# ============= DAILY ACTIVITY ROLLUP =============
+#
+# Each handler describes what the row contributed before and after the
+# write and lets apply_activity_changes move the difference. Deletions
+# are handled in pre_delete for the same reason as above.
+
+@receiver(post_save, sender=Event)
+def event_activity_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = instance._saved_state
+    if created:
+        apply_activity_changes(
+            [], [(instance.created_at, instance.project_id, instance.organizer_id, 'events_created')]
+        )
+    elif old != snapshot(instance):
+        apply_activity_changes(
+            [(instance.created_at, old['project_id'], old['organizer_id'], 'events_created')],
+            [(instance.created_at, instance.project_id, instance.organizer_id, 'events_created')]
+        )
+        if old['project_id'] != instance.project_id:
+            # Its decisions and deliverables move with the event
+            rebuild_daily_activity(project_ids=[old['project_id'], instance.project_id])
+
+
+@receiver(pre_delete, sender=Event)
+def event_activity_deleted(sender, instance, **kwargs):
+    apply_activity_changes(
+        [(instance.created_at, instance.project_id, instance.organizer_id, 'events_created')], []
+    )
+
+
+@receiver(post_save, sender=Decision)
+def decision_activity_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = instance._saved_state
+    if created:
+        apply_activity_changes(
+            [], [(instance.created_at, project_for_event(instance.event_id), instance.created_by_id,
+                  'decisions_created')]
+        )
+    elif old != snapshot(instance):
+        old_project_id = project_for_event(old['event_id'])
+        new_project_id = project_for_event(instance.event_id)
+        apply_activity_changes(
+            [(instance.created_at, old_project_id, old['created_by_id'], 'decisions_created')],
+            [(instance.created_at, new_project_id, instance.created_by_id, 'decisions_created')]
+        )
+        if old_project_id != new_project_id:
+            # Its deliverables move with the decision
+            rebuild_daily_activity(project_ids=[old_project_id, new_project_id])
+
+
+@receiver(pre_delete, sender=Decision)
+def decision_activity_deleted(sender, instance, **kwargs):
+    apply_activity_changes(
+        [(instance.created_at, project_for_event(instance.event_id), instance.created_by_id,
+          'decisions_created')], []
+    )
+
+
+@receiver(post_save, sender=Deliverable)
+def deliverable_activity_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = instance._saved_state
+    new_project_id = project_for_decision(instance.decision_id)
+
+    if created:
+        apply_activity_changes([], deliverable_activity(
+            new_project_id, instance.assigned_to_id, instance.status,
+            instance.created_at, instance.completed_at
+        ))
+    elif old != snapshot(instance):
+        old_project_id = (
+            new_project_id if old['decision_id'] == instance.decision_id
+            else project_for_decision(old['decision_id'])
+        )
+        apply_activity_changes(
+            deliverable_activity(
+                old_project_id, old['assigned_to_id'], old['status'], instance.created_at, old['completed_at']
+            ),
+            deliverable_activity(
+                new_project_id, instance.assigned_to_id, instance.status,
+                instance.created_at, instance.completed_at
+            )
+        )
+
+
+@receiver(pre_delete, sender=Deliverable)
+def deliverable_activity_deleted(sender, instance, **kwargs):
+    apply_activity_changes(deliverable_activity(
+        project_for_decision(instance.decision_id), instance.assigned_to_id, instance.status,
+        instance.created_at, instance.completed_at
+    ), [])
+
+
+# ============= SNAPSHOT REFRESH =============
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Decision)
+@receiver(post_save, sender=Deliverable)
+def refresh_state(sender, instance, raw=False, **kwargs):
+    """Take the saved values as the baseline for the instance's next save"""
+    if not raw:
+        instance._saved_state = snapshot(instance)
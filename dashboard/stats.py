@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import Project, Event, Decision, Deliverable
+from .models import ProjectStats, DailyActivity
+from .rollups import ACTIVITY_FIELDS
+
+User = get_user_model()
+
+
+def deliverable_stats(deliverables):
+    """Total, per-status and overdue counts for a deliverable queryset in one query"""
+    return deliverables.order_by().aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='completed')),
+        in_progress=Count('id', filter=Q(status='in-progress')),
+        pending=Count('id', filter=Q(status='pending')),
+        overdue=Count('id', filter=Q(
+            due_date__lt=timezone.now(),
+            status__in=['pending', 'in-progress']
+        )),
+    )
+
+
+def system_stats():
+    """System-wide counters, one query per model"""
+    return {
+        'users': User.objects.count(),
+        'projects': Project.objects.count(),
+        'events': Event.objects.count(),
+        'decisions': Decision.objects.count(),
+        'deliverables': deliverable_stats(Deliverable.objects.all()),
+    }
+
+
+def overdue_deliverable_count(deliverables):
+    """Open deliverables past their due date, a range seek on the (status, due_date) index"""
+    return deliverables.filter(
+        status__in=['pending', 'in-progress'], due_date__lt=timezone.now()
+    ).order_by().count()
+
+
+def management_stats(user):
+    """Counters for the projects created by a management user, summed from ProjectStats"""
+    totals = ProjectStats.objects.filter(project__created_by=user).aggregate(
+        projects=Count('pk'),
+        events=Coalesce(Sum('event_count'), 0),
+        decisions=Coalesce(Sum('decision_count'), 0),
+        total=Coalesce(Sum('deliverable_count'), 0),
+        completed=Coalesce(Sum('completed_deliverables'), 0),
+        in_progress=Coalesce(Sum('in_progress_deliverables'), 0),
+        pending=Coalesce(Sum('pending_deliverables'), 0),
+    )
+    # Deliverables turn overdue without being written, so this one is counted live
+    totals['overdue'] = overdue_deliverable_count(
+        Deliverable.objects.filter(decision__event__project__created_by=user)
+    )
+    return {
+        'projects': totals['projects'],
+        'events': totals['events'],
+        'decisions': totals['decisions'],
+        'deliverables': {
+            key: totals[key] for key in ('total', 'completed', 'in_progress', 'pending', 'overdue')
+        },
+    }
+
+
+def assignee_stats(user):
+    """Counters for the deliverables assigned to a user in one query"""
+    return {
+        'deliverables': deliverable_stats(Deliverable.objects.filter(assigned_to=user)),
+    }
+
+
+def activity_rows(user):
+    """DailyActivity rows describing the activity a user's reports cover"""
+    if user.is_admin:
+        return DailyActivity.objects.filter(project__isnull=True, user__isnull=True)
+    if user.is_management:
+        return DailyActivity.objects.filter(project__created_by=user, user__isnull=True)
+    return DailyActivity.objects.filter(user=user, project__isnull=True)
+
+
+def activity_totals(rows, **periods):
+    """
+    Sum the activity counters of ``rows`` over several periods in one query.
+
+    Each keyword maps a period name to its first day, e.g.
+    ``activity_totals(rows, week=date(...))`` returns ``{'week': {...}}``.
+    """
+    totals = rows.order_by().aggregate(**{
+        f'{name}__{field}': Coalesce(Sum(field, filter=Q(day__gte=since)), 0)
+        for name, since in periods.items()
+        for field in ACTIVITY_FIELDS
+    })
+    return {
+        name: {field: totals[f'{name}__{field}'] for field in ACTIVITY_FIELDS}
+        for name in periods
+    }
+
+
+def activity_trend(rows, start, end):
+    """Per-day activity counters from ``start`` to ``end`` inclusive, zero-filled"""
+    daily = rows.filter(day__gte=start, day__lte=end).order_by().values('day').annotate(
+        **{field: Sum(field) for field in ACTIVITY_FIELDS}
+    )
+    by_day = {row['day']: row for row in daily}
+
+    trend = []
+    day = start
+    while day <= end:
+        row = by_day.get(day, {})
+        trend.append({'day': day, **{field: row.get(field) or 0 for field in ACTIVITY_FIELDS}})
+        day += timedelta(days=1)
+    return trend
@@ -1,3 +1,353 @@
+import random
+from datetime import timedelta
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from core.models import Project, Event, Decision, Deliverable, Invitation
+from .models import DailyActivity, ProjectStats
+from .rollups import ACTIVITY_FIELDS, rebuild_daily_activity, rebuild_project_stats
+from .stats import deliverable_stats, management_stats
+
+
+class CalendarEventsApiTests(TestCase):
+    """The calendar feed is windowed and filtered on the server"""
+
+    url = '/dashboard/api/calendar-events/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='pass', role='admin')
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.member = CustomUser.objects.create_user('member', password='pass', role='project_user')
+        cls.project = Project.objects.create(name='Alpha', description='', created_by=cls.manager)
+        cls.other_project = Project.objects.create(name='Beta', description='', created_by=cls.manager)
+        cls.start = timezone.now().replace(microsecond=0)
+        cls.events = [cls.add_event(index) for index in range(6)]
+        cls.events[0].participants.add(cls.member)
+        Invitation.objects.create(event=cls.events[1], invitee=cls.member, invited_by=cls.manager)
+
+    @classmethod
+    def add_event(cls, index, hours=2):
+        # Each event overlaps the next one by an hour
+        return Event.objects.create(
+            project=cls.project if index % 2 == 0 else cls.other_project,
+            title=f'Event {index}', description='', agenda='',
+            start_time=cls.start + timedelta(hours=index), end_time=cls.start + timedelta(hours=index + hours),
+            venue='Room', organizer=cls.manager
+        )
+
+    def fetch(self, user, **params):
+        self.client.force_login(user)
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return {item['id']: item for item in response.json()}
+
+    def test_window_and_project_filter(self):
+        window = {
+            'start': (self.start + timedelta(hours=2, minutes=30)).isoformat(),
+            'end': (self.start + timedelta(hours=4)).isoformat(),
+        }
+        self.assertEqual(set(self.fetch(self.admin, **window)), {e.pk for e in self.events[1:4]})
+        self.assertEqual(
+            set(self.fetch(self.admin, project=self.project.pk, **window)),
+            {self.events[2].pk}
+        )
+
+    def test_invalid_project(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(self.url, {'project': 'x'}).status_code, 400)
+
+    def test_relationship_flags(self):
+        events = self.fetch(self.member)
+        self.assertEqual(set(events), {self.events[0].pk, self.events[1].pk})
+        participating = events[self.events[0].pk]['extendedProps']
+        invited = events[self.events[1].pk]['extendedProps']
+        self.assertTrue(participating['isParticipant'])
+        self.assertFalse(participating['isInvited'])
+        self.assertTrue(invited['isInvited'])
+        self.assertFalse(invited['isOrganizer'])
+        self.assertTrue(self.fetch(self.manager)[self.events[0].pk]['extendedProps']['isOrganizer'])
+
+    def test_conflict_flags(self):
+        events = self.fetch(self.admin)
+        self.assertTrue(all(item['extendedProps']['hasConflict'] for item in events.values()))
+        lone = Event.objects.create(
+            project=self.project, title='Lone', description='', agenda='',
+            start_time=self.start + timedelta(days=3), end_time=self.start + timedelta(days=3, hours=1),
+            venue='Elsewhere', organizer=self.admin
+        )
+        self.assertFalse(self.fetch(self.admin)[lone.pk]['extendedProps']['hasConflict'])
+
+    def test_constant_queries(self):
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        for index in range(6, 20):
+            self.add_event(index)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(self.url)
+        self.assertEqual(len(few), len(many))
+
+
+class AdminConflictsTests(TestCase):
+    """The admin dashboard finds conflicts among upcoming events a batch at a time"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='pass', role='admin')
+        cls.project = Project.objects.create(name='Alpha', description='', created_by=cls.admin)
+        cls.start = timezone.now() + timedelta(hours=1)
+        # More conflict-free events than one batch holds, two hours apart
+        for index in range(60):
+            cls.add_event(f'Free {index}', timedelta(hours=2 * index), f'Room {index}')
+        cls.add_event('Late', timedelta(hours=121), 'Hall')
+        cls.add_event('Late clash', timedelta(hours=121, minutes=30), 'Hall')
+        cls.add_event('Far', timedelta(days=40), 'Hall')
+        cls.add_event('Far clash', timedelta(days=40, minutes=30), 'Hall')
+
+    @classmethod
+    def add_event(cls, title, offset, venue):
+        start = cls.start + offset
+        return Event.objects.create(
+            project=cls.project, title=title, description='', agenda='',
+            start_time=start, end_time=start + timedelta(hours=1), venue=venue, organizer=cls.admin
+        )
+
+    def test_conflicts_within_window(self):
+        self.client.force_login(self.admin)
+        response = self.client.get('/dashboard/admin/')
+        self.assertEqual(
+            [conflict['event'].title for conflict in response.context['conflicting_events']],
+            ['Late', 'Late clash']
+        )
+
+
+class DashboardStatsTests(TestCase):
+    """Dashboard counters come from conditional aggregates"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('admin', password='pass', role='admin')
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.member = CustomUser.objects.create_user('member', password='pass', role='project_user')
+        project = Project.objects.create(name='Alpha', description='', created_by=cls.manager)
+        now = timezone.now()
+        event = Event.objects.create(
+            project=project, title='Event', description='', agenda='',
+            start_time=now, end_time=now + timedelta(hours=1), venue='', organizer=cls.manager
+        )
+        decision = Decision.objects.create(event=event, title='Decision', description='', created_by=cls.manager)
+        for status, due in [
+            ('pending', -1), ('pending', 1), ('in-progress', -1), ('completed', -1), ('completed', None),
+        ]:
+            Deliverable.objects.create(
+                decision=decision, title=status, description='', assigned_to=cls.member, status=status,
+                due_date=now + timedelta(days=due) if due is not None else None
+            )
+
+    def test_deliverable_stats(self):
+        with CaptureQueriesContext(connection) as queries:
+            stats = deliverable_stats(Deliverable.objects.all())
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(stats, {'total': 5, 'completed': 2, 'in_progress': 1, 'pending': 2, 'overdue': 2})
+
+    def test_dashboards(self):
+        expected = {
+            '/dashboard/admin/': (self.admin, {'total_deliverables': 5, 'total_events': 1}),
+            '/dashboard/management/': (self.manager, {
+                'total_deliverables': 5, 'completed_deliverables': 2,
+                'pending_deliverables': 2, 'in_progress_deliverables': 1,
+            }),
+            '/dashboard/project-user/': (self.member, {
+                'total_deliverables': 5, 'overdue_deliverables': 2, 'completed_deliverables': 2,
+            }),
+        }
+        for url, (user, counters) in expected.items():
+            self.client.force_login(user)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            for key, value in counters.items():
+                self.assertEqual(response.context[key], value, (url, key))
+
+
+class ProjectStatsRollupTests(TestCase):
+    """Incrementally maintained project counters match a rebuild"""
+
+    fields = [
+        'event_count', 'decision_count', 'deliverable_count',
+        'completed_deliverables', 'in_progress_deliverables', 'pending_deliverables',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.member = CustomUser.objects.create_user('member', password='pass', role='project_user')
+        cls.projects = [
+            Project.objects.create(name=name, description='', created_by=cls.manager) for name in ('Alpha', 'Beta')
+        ]
+        now = timezone.now()
+        cls.events = [
+            Event.objects.create(
+                project=cls.projects[index % 2], title=f'Event {index}', description='', agenda='',
+                start_time=now, end_time=now + timedelta(hours=1), venue='', organizer=cls.manager
+            )
+            for index in range(6)
+        ]
+
+    def snapshot(self):
+        return {row['project_id']: row for row in ProjectStats.objects.values('project_id', *self.fields)}
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        rebuild_project_stats()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_incremental_matches_rebuild(self):
+        rng = random.Random(3)
+        statuses = ['pending', 'in-progress', 'completed']
+        decisions = [
+            Decision.objects.create(event=event, title='Decision', description='', created_by=self.manager)
+            for event in self.events
+        ]
+        deliverables = [
+            Deliverable.objects.create(
+                decision=rng.choice(decisions + [None]), title='Deliverable', description='',
+                assigned_to=self.member, status=rng.choice(statuses)
+            )
+            for _ in range(30)
+        ]
+        for _ in range(40):
+            deliverable = rng.choice(deliverables)
+            deliverable.status = rng.choice(statuses)
+            deliverable.decision = rng.choice(decisions + [None])
+            deliverable.save()
+        self.assertMatchesRebuild()
+
+        decisions[0].event = self.events[1]
+        decisions[0].save()
+        self.assertMatchesRebuild()
+        self.events[2].project = self.projects[1]
+        self.events[2].save()
+        self.assertMatchesRebuild()
+        decisions[3].delete()
+        self.events[5].delete()
+        self.assertMatchesRebuild()
+
+    def test_overdue_counted_live(self):
+        decision = Decision.objects.create(
+            event=self.events[0], title='Decision', description='', created_by=self.manager
+        )
+        deliverable = Deliverable.objects.create(
+            decision=decision, title='Deliverable', description='', assigned_to=self.member,
+            due_date=timezone.now() + timedelta(days=1)
+        )
+        self.assertEqual(management_stats(self.manager)['deliverables']['overdue'], 0)
+        # Time passing writes nothing, as a queryset update does not fire signals
+        Deliverable.objects.filter(pk=deliverable.pk).update(due_date=timezone.now() - timedelta(days=1))
+        self.assertEqual(management_stats(self.manager)['deliverables']['overdue'], 1)
+
+
+class DailyActivityRollupTests(TestCase):
+    """Incrementally maintained activity rows match a rebuild"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = CustomUser.objects.create_user('manager', password='pass', role='management')
+        cls.members = [
+            CustomUser.objects.create_user(name, password='pass', role='project_user') for name in ('ann', 'bob')
+        ]
+        cls.projects = [
+            Project.objects.create(name=name, description='', created_by=cls.manager) for name in ('Alpha', 'Beta')
+        ]
+        now = timezone.now()
+        cls.events = [
+            Event.objects.create(
+                project=cls.projects[index % 2], title=f'Event {index}', description='', agenda='',
+                start_time=now, end_time=now + timedelta(hours=1), venue='', organizer=cls.manager
+            )
+            for index in range(6)
+        ]
+
+    def snapshot(self):
+        return {
+            (row['day'], row['project_id'], row['user_id']): tuple(row[field] for field in ACTIVITY_FIELDS)
+            for row in DailyActivity.objects.values('day', 'project_id', 'user_id', *ACTIVITY_FIELDS)
+            if any(row[field] for field in ACTIVITY_FIELDS)
+        }
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        rebuild_daily_activity()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_incremental_matches_rebuild(self):
+        rng = random.Random(5)
+        statuses = ['pending', 'in-progress', 'completed']
+        decisions = [
+            Decision.objects.create(
+                event=event, title='Decision', description='', created_by=rng.choice(self.members)
+            )
+            for event in self.events
+        ]
+        deliverables = [
+            Deliverable.objects.create(
+                decision=rng.choice(decisions + [None]), title='Deliverable', description='',
+                assigned_to=rng.choice(self.members), status=rng.choice(statuses)
+            )
+            for _ in range(30)
+        ]
+        for _ in range(40):
+            deliverable = rng.choice(deliverables)
+            deliverable.status = rng.choice(statuses)
+            deliverable.decision = rng.choice(decisions + [None])
+            deliverable.assigned_to = rng.choice(self.members)
+            deliverable.save()
+        self.assertMatchesRebuild()
+
+        decisions[0].event = self.events[1]
+        decisions[0].created_by = self.manager
+        decisions[0].save()
+        self.assertMatchesRebuild()
+        self.events[2].project = self.projects[1]
+        self.events[2].organizer = self.members[0]
+        self.events[2].save()
+        self.assertMatchesRebuild()
+        decisions[3].delete()
+        self.events[5].delete()
+        self.projects[1].delete()
+        self.assertMatchesRebuild()
+
+    def test_completion_day_survives_later_edits(self):
+        deliverable = Deliverable.objects.create(
+            title='Deliverable', description='', assigned_to=self.members[0], status='completed'
+        )
+        completed_at = timezone.now() - timedelta(days=3)
+        Deliverable.objects.filter(pk=deliverable.pk).update(completed_at=completed_at)
+        rebuild_daily_activity()
+
+        deliverable = Deliverable.objects.get(pk=deliverable.pk)
+        deliverable.title = 'Renamed'
+        deliverable.save()
+        self.assertEqual(deliverable.completed_at, completed_at)
+        self.assertMatchesRebuild()
+        self.assertEqual(
+            DailyActivity.objects.get(
+                day=timezone.localdate(completed_at), project=None, user=self.members[0]
+            ).deliverables_completed,
+            1
+        )
+
+        deliverable.status = 'pending'
+        deliverable.save()
+        self.assertIsNone(deliverable.completed_at)
+        self.assertMatchesRebuild()
 
-# Create your tests here.
+    def test_reports(self):
+        self.client.force_login(self.manager)
+        response = self.client.get('/dashboard/reports/', {'start': 'bad'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['activity_trend']['labels']), 30)
@@ -1,12 +1,50 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Q
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Exists, OuterRef, Q
 from django.utils import timezone
 from django.http import JsonResponse
 from datetime import timedelta
 
 from accounts.permissions import admin_required, management_required, project_user_required
+from core.access import MEMBER_RELATIONS, accessible_events
+from core.conflicts import find_conflicts
 from core.models import Project, Event, Decision, Deliverable, Invitation
+from core.utils import parse_date_param, parse_datetime_param
+from .stats import (
+    system_stats, management_stats, assignee_stats, activity_rows, activity_totals, activity_trend
+)
+
+User = get_user_model()
+
+# Longest range the reports activity chart will sum
+MAX_TREND_DAYS = 366
+
+# The admin dashboard shows the first conflicts among the events starting
+# within this many days, checking them this many at a time
+CONFLICT_WINDOW_DAYS = 30
+CONFLICT_BATCH_SIZE = 50
+
+
+def upcoming_conflicts(limit):
+    """The first ``limit`` upcoming events in conflict, each with the ids of the events it conflicts with"""
+    now = timezone.now()
+    upcoming = Event.objects.filter(
+        start_time__gte=now, start_time__lt=now + timedelta(days=CONFLICT_WINDOW_DAYS)
+    ).order_by('start_time', 'id')
+
+    conflicting_events = []
+    offset = 0
+    while len(conflicting_events) < limit:
+        batch = list(upcoming[offset:offset + CONFLICT_BATCH_SIZE])
+        if not batch:
+            break
+        conflict_map = find_conflicts(batch)
+        for event in batch:
+            if conflict_map.get(event.pk):
+                conflicting_events.append({'event': event, 'conflicts': conflict_map[event.pk]})
+        offset += CONFLICT_BATCH_SIZE
+    return conflicting_events[:limit]
 
 
 @login_required
@@ -25,11 +63,7 @@ def admin_dashboard(request):
     """Admin dashboard with system-wide statistics"""
     
     # Get statistics
-    total_users = request.user.__class__.objects.count()
-    total_projects = Project.objects.count()
-    total_events = Event.objects.count()
-    total_decisions = Decision.objects.count()
-    total_deliverables = Deliverable.objects.count()
+    stats = system_stats()
     
     # Recent activity
     recent_projects = Project.objects.select_related('created_by').order_by('-created_at')[:5]
@@ -38,7 +72,7 @@ def admin_dashboard(request):
     # Upcoming events
     upcoming_events = Event.objects.filter(
         start_time__gte=timezone.now()
-    ).order_by('start_time')[:5]
+    ).select_related('project', 'organizer').order_by('start_time')[:5]
     
     # Overdue deliverables
     overdue_deliverables = Deliverable.objects.filter(
@@ -46,27 +80,20 @@ def admin_dashboard(request):
         status__in=['pending', 'in-progress']
     ).select_related('assigned_to', 'decision__event')[:5]
     
-    # Event conflicts
-    conflicting_events = []
-    for event in Event.objects.filter(start_time__gte=timezone.now()):
-        conflicts = event.get_conflicting_events()
-        if conflicts.exists():
-            conflicting_events.append({
-                'event': event,
-                'conflicts': conflicts
-            })
+    # Event conflicts, swept a batch of upcoming events at a time
+    conflicting_events = upcoming_conflicts(5)
     
     context = {
-        'total_users': total_users,
-        'total_projects': total_projects,
-        'total_events': total_events,
-        'total_decisions': total_decisions,
-        'total_deliverables': total_deliverables,
+        'total_users': stats['users'],
+        'total_projects': stats['projects'],
+        'total_events': stats['events'],
+        'total_decisions': stats['decisions'],
+        'total_deliverables': stats['deliverables']['total'],
         'recent_projects': recent_projects,
         'recent_events': recent_events,
         'upcoming_events': upcoming_events,
         'overdue_deliverables': overdue_deliverables,
-        'conflicting_events': conflicting_events[:5],
+        'conflicting_events': conflicting_events,
     }
     
     return render(request, 'dashboard/admin_dashboard.html', context)
@@ -78,14 +105,10 @@ def management_dashboard(request):
     
     # Get user's projects
     user_projects = Project.objects.filter(created_by=request.user)
+    projects_with_counts = user_projects.select_related('stats')
     
     # Get statistics for user's projects
-    total_projects = user_projects.count()
-    total_events = Event.objects.filter(project__in=user_projects).count()
-    total_decisions = Decision.objects.filter(event__project__in=user_projects).count()
-    total_deliverables = Deliverable.objects.filter(
-        decision__event__project__in=user_projects
-    ).count()
+    stats = management_stats(request.user)
     
     # Recent activity in user's projects
     recent_events = Event.objects.filter(
@@ -96,33 +119,28 @@ def management_dashboard(request):
     upcoming_events = Event.objects.filter(
         project__in=user_projects,
         start_time__gte=timezone.now()
-    ).order_by('start_time')[:5]
+    ).select_related('project').order_by('start_time')[:5]
     
     # Deliverables assigned by this user (base queryset)
     assigned_deliverables_base = Deliverable.objects.filter(
         decision__event__project__in=user_projects
     ).select_related('assigned_to', 'decision__event')
     
-    # Progress statistics (calculate before slicing)
-    completed_deliverables = assigned_deliverables_base.filter(status='completed').count()
-    pending_deliverables = assigned_deliverables_base.filter(status='pending').count()
-    in_progress_deliverables = assigned_deliverables_base.filter(status='in-progress').count()
-    
-    # Recent deliverables for display (slice after statistics)
+    # Recent deliverables for display
     assigned_deliverables = assigned_deliverables_base.order_by('-created_at')[:10]
     
     context = {
-        'user_projects': user_projects,
-        'total_projects': total_projects,
-        'total_events': total_events,
-        'total_decisions': total_decisions,
-        'total_deliverables': total_deliverables,
+        'user_projects': projects_with_counts,
+        'total_projects': stats['projects'],
+        'total_events': stats['events'],
+        'total_decisions': stats['decisions'],
+        'total_deliverables': stats['deliverables']['total'],
         'recent_events': recent_events,
         'upcoming_events': upcoming_events,
         'assigned_deliverables': assigned_deliverables,
-        'completed_deliverables': completed_deliverables,
-        'pending_deliverables': pending_deliverables,
-        'in_progress_deliverables': in_progress_deliverables,
+        'completed_deliverables': stats['deliverables']['completed'],
+        'pending_deliverables': stats['deliverables']['pending'],
+        'in_progress_deliverables': stats['deliverables']['in_progress'],
     }
     
     return render(request, 'dashboard/management_dashboard.html', context)
@@ -143,25 +161,17 @@ def project_user_dashboard(request):
     ).select_related('event__project', 'invited_by').order_by('-created_at')[:10]
     
     # Get events user is participating in or organized
-    my_events = Event.objects.filter(
-        Q(organizer=request.user) | Q(participants=request.user)
-    ).distinct().select_related('project').order_by('-start_time')[:10]
+    my_events = accessible_events(
+        request.user, MEMBER_RELATIONS
+    ).select_related('project').order_by('-start_time')[:10]
     
     # Upcoming events
-    upcoming_events = Event.objects.filter(
-        Q(organizer=request.user) | Q(participants=request.user),
+    upcoming_events = accessible_events(request.user, MEMBER_RELATIONS).filter(
         start_time__gte=timezone.now()
-    ).distinct().order_by('start_time')[:5]
+    ).select_related('project').order_by('start_time')[:5]
     
     # Deliverable statistics
-    total_deliverables = my_deliverables.count()
-    completed_deliverables = my_deliverables.filter(status='completed').count()
-    pending_deliverables = my_deliverables.filter(status='pending').count()
-    in_progress_deliverables = my_deliverables.filter(status='in-progress').count()
-    overdue_deliverables = my_deliverables.filter(
-        due_date__lt=timezone.now(),
-        status__in=['pending', 'in-progress']
-    ).count()
+    deliverable_counts = assignee_stats(request.user)['deliverables']
     
     # Recent decisions made by user
     my_decisions = Decision.objects.filter(
@@ -174,11 +184,11 @@ def project_user_dashboard(request):
         'my_events': my_events,
         'upcoming_events': upcoming_events,
         'my_decisions': my_decisions,
-        'total_deliverables': total_deliverables,
-        'completed_deliverables': completed_deliverables,
-        'pending_deliverables': pending_deliverables,
-        'in_progress_deliverables': in_progress_deliverables,
-        'overdue_deliverables': overdue_deliverables,
+        'total_deliverables': deliverable_counts['total'],
+        'completed_deliverables': deliverable_counts['completed'],
+        'pending_deliverables': deliverable_counts['pending'],
+        'in_progress_deliverables': deliverable_counts['in_progress'],
+        'overdue_deliverables': deliverable_counts['overdue'],
     }
     
     return render(request, 'dashboard/project_user_dashboard.html', context)
@@ -197,13 +207,9 @@ def calendar_view(request):
         projects = user_projects
     else:
         # Project users see events they're invited to, organizing, or participating in
-        events = Event.objects.filter(
-            Q(organizer=request.user) | 
-            Q(participants=request.user) |
-            Q(invitations__invitee=request.user)
-        ).distinct()
+        events = accessible_events(request.user)
         # Get projects from accessible events
-        projects = Project.objects.filter(events__in=events).distinct()
+        projects = Project.objects.filter(pk__in=events.values('project_id'))
     
     context = {
         'total_events': events.count(),
@@ -232,42 +238,80 @@ def reports_view(request):
         decisions = Decision.objects.filter(event__project__in=user_projects)
         deliverables = Deliverable.objects.filter(decision__event__project__in=user_projects)
         projects = user_projects
+        rollup = management_stats(request.user)
     else:
         template = 'dashboard/project_user_reports.html'
         # Project users see data from events they're involved in
-        events = Event.objects.filter(
-            Q(organizer=request.user) | 
-            Q(participants=request.user) |
-            Q(invitations__invitee=request.user)
-        ).distinct()
+        events = accessible_events(request.user)
         decisions = Decision.objects.filter(event__in=events)
-        deliverables = Deliverable.objects.filter(decision__event__in=events).distinct()
-        projects = Project.objects.filter(events__in=events).distinct()
-    
-    # Calculate time periods
-    now = timezone.now()
-    last_month = now - timedelta(days=30)
-    last_week = now - timedelta(days=7)
+        deliverables = Deliverable.objects.filter(decision__event__in=events)
+        projects = Project.objects.filter(pk__in=events.values('project_id'))
+    
+    # Recent activity and trends are summed from the daily activity rollup
+    today = timezone.localdate()
+    rows = activity_rows(request.user)
+    activity = activity_totals(
+        rows, week=today - timedelta(days=6), month=today - timedelta(days=29)
+    )
+    
+    # Trend range, defaulting to the last 30 days
+    trend_end = parse_date_param(request.GET.get('end')) or today
+    trend_start = parse_date_param(request.GET.get('start')) or trend_end - timedelta(days=29)
+    if trend_start > trend_end or (trend_end - trend_start).days >= MAX_TREND_DAYS:
+        trend_start = trend_end - timedelta(days=29)
+    trend = activity_trend(rows, trend_start, trend_end)
     
     # Calculate statistics
+    if request.user.is_management:
+        # Totals and status breakdown come from the per-project rollup
+        totals = {
+            'total_projects': rollup['projects'],
+            'total_events': rollup['events'],
+            'total_decisions': rollup['decisions'],
+            'total_deliverables': rollup['deliverables']['total'],
+        }
+        deliverable_status_counts = [
+            {'status': status, 'count': rollup['deliverables'][key]}
+            for status, key in (('pending', 'pending'), ('in-progress', 'in_progress'), ('completed', 'completed'))
+            if rollup['deliverables'][key]
+        ]
+    else:
+        totals = {
+            'total_projects': projects.count(),
+            'total_events': events.count(),
+            'total_decisions': decisions.count(),
+            'total_deliverables': deliverables.count(),
+        }
+        deliverable_status_counts = deliverables.values('status').annotate(count=Count('id'))
+    
     context = {
-        'total_projects': projects.count(),
-        'total_events': events.count(),
-        'total_decisions': decisions.count(),
-        'total_deliverables': deliverables.count(),
+        **totals,
         
         # Recent activity
-        'recent_events': events.filter(created_at__gte=last_week).count(),
-        'recent_decisions': decisions.filter(created_at__gte=last_week).count(),
-        'recent_deliverables': deliverables.filter(created_at__gte=last_week).count(),
+        'recent_events': activity['week']['events_created'],
+        'recent_decisions': activity['week']['decisions_created'],
+        'recent_deliverables': activity['week']['deliverables_created'],
+        'recent_completed_deliverables': activity['week']['deliverables_completed'],
         
         # Monthly trends
-        'monthly_events': events.filter(created_at__gte=last_month).count(),
-        'monthly_decisions': decisions.filter(created_at__gte=last_month).count(),
-        'monthly_deliverables': deliverables.filter(created_at__gte=last_month).count(),
+        'monthly_events': activity['month']['events_created'],
+        'monthly_decisions': activity['month']['decisions_created'],
+        'monthly_deliverables': activity['month']['deliverables_created'],
+        'monthly_completed_deliverables': activity['month']['deliverables_completed'],
+        
+        # Daily activity chart
+        'trend_start': trend_start,
+        'trend_end': trend_end,
+        'activity_trend': {
+            'labels': [point['day'].isoformat() for point in trend],
+            'events': [point['events_created'] for point in trend],
+            'decisions': [point['decisions_created'] for point in trend],
+            'deliverables': [point['deliverables_created'] for point in trend],
+            'completed': [point['deliverables_completed'] for point in trend],
+        },
         
         # Status breakdowns
-        'deliverable_status_counts': deliverables.values('status').annotate(count=Count('id')),
+        'deliverable_status_counts': deliverable_status_counts,
         'decision_by_event_counts': decisions.values('event__title').annotate(count=Count('id'))[:10],
         
         # Recent items for display
@@ -281,32 +325,58 @@ def reports_view(request):
 
 @login_required
 def calendar_events_api(request):
-    """API endpoint for calendar events"""
+    """API endpoint for calendar events
+    
+    Accepts the FullCalendar ``start``/``end`` window and an optional
+    ``project`` id. Relationship flags are computed in the same query as
+    the events and conflicts in one sweep, so the cost does not grow with
+    event count.
+    """
     # Get user's accessible events based on role
     if request.user.is_admin:
-        events = Event.objects.all().select_related('project', 'organizer')
+        events = Event.objects.all()
     elif request.user.is_management:
         user_projects = Project.objects.filter(created_by=request.user)
-        events = Event.objects.filter(project__in=user_projects).select_related('project', 'organizer')
+        events = Event.objects.filter(project__in=user_projects)
     else:
         # Project users see events they're invited to, organizing, or participating in
-        events = Event.objects.filter(
-            Q(organizer=request.user) | 
-            Q(participants=request.user) |
-            Q(invitations__invitee=request.user)
-        ).distinct().select_related('project', 'organizer')
+        events = accessible_events(request.user)
+    
+    # Restrict to the visible calendar window
+    window_start = parse_datetime_param(request.GET.get('start'))
+    window_end = parse_datetime_param(request.GET.get('end'))
+    if window_start:
+        events = events.filter(end_time__gt=window_start)
+    if window_end:
+        events = events.filter(start_time__lt=window_end)
+    
+    # Server-side project filter
+    project_id = request.GET.get('project')
+    if project_id and project_id != 'all':
+        try:
+            events = events.filter(project_id=int(project_id))
+        except ValueError:
+            return JsonResponse({'error': 'Invalid project'}, status=400)
+    
+    # Check user's relationship to each event in the same query
+    events = events.select_related('project', 'organizer').annotate(
+        is_participant=Exists(
+            User.objects.filter(pk=request.user.pk, events_participated=OuterRef('pk'))
+        ),
+        is_invited=Exists(
+            Invitation.objects.filter(event=OuterRef('pk'), invitee=request.user)
+        ),
+    ).order_by('start_time')
+    
+    events = list(events)
+    conflict_map = find_conflicts(events)
     
     # Convert events to FullCalendar format
     calendar_events = []
     for event in events:
-        # Check user's relationship to the event
-        is_organizer = event.organizer == request.user
-        is_participant = request.user in event.participants.all()
-        is_invited = event.invitations.filter(invitee=request.user).exists()
-        
-        # Check for conflicts
-        conflicts = event.get_conflicting_events()
-        has_conflict = conflicts.exists()
+        is_organizer = event.organizer_id == request.user.id
+        is_participant = event.is_participant
+        is_invited = event.is_invited
         
         # Determine color based on relationship
         color = '#3B82F6'  # Default blue
@@ -332,7 +402,7 @@ def calendar_events_api(request):
                 'isOrganizer': is_organizer,
                 'isParticipant': is_participant,
                 'isInvited': is_invited,
-                'hasConflict': has_conflict,
+                'hasConflict': bool(conflict_map.get(event.pk)),
             }
         })
     
@@ -348,12 +418,7 @@ def user_projects_api(request):
         projects = Project.objects.filter(created_by=request.user)
     else:
         # Project users see projects from their accessible events
-        accessible_events = Event.objects.filter(
-            Q(organizer=request.user) | 
-            Q(participants=request.user) |
-            Q(invitations__invitee=request.user)
-        ).distinct()
-        projects = Project.objects.filter(events__in=accessible_events).distinct()
+        projects = Project.objects.filter(pk__in=accessible_events(request.user).values('project_id'))
     
     projects_data = [
         {
@@ -2,6 +2,9 @@
 ASGI config for dicision_tracker project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests for the notification stream are served by a lightweight SSE app;
+everything else goes to Django. Under WSGI the stream URL does not exist
+and the browser falls back to polling ``core:notification_count``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +16,12 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dicision_tracker.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from core.streams import NOTIFICATION_STREAM_PATH, notification_stream  # noqa: E402  (needs apps loaded)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == NOTIFICATION_STREAM_PATH:
+        return await notification_stream(scope, receive, send)
+    return await django_application(scope, receive, send)
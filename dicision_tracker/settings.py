@@ -69,6 +69,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'accounts.context_processors.permissions',
             ],
         },
     },
@@ -182,6 +183,11 @@ SESSION_COOKIE_SECURE = False  # Set to True in production with HTTPS
 SESSION_COOKIE_HTTPONLY = True  # Prevent XSS attacks
 SESSION_COOKIE_SAMESITE = 'Lax'
 SESSION_SAVE_EVERY_REQUEST = True
+# Sessions are read from the cache and only written back when their data
+# changes or the sliding expiry has moved by SESSION_REFRESH_THRESHOLD seconds,
+# and are cached for at most that long
+SESSION_ENGINE = 'accounts.sessions'
+SESSION_REFRESH_THRESHOLD = 3600
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
 CSRF_COOKIE_SECURE = False  # Set to True in production with HTTPS
@@ -191,3 +197,42 @@ CSRF_COOKIE_SAMESITE = 'Lax'
 # Logout settings
 LOGOUT_REDIRECT_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
+
+# Cache
+# Shared by every web process and runworker, so cached sessions and the
+# unread counts jobs update agree across processes; in production prefer
+# Redis or Memcached. The tests swap in local memory (see TEST_RUNNER).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+# Runs the tests against a local memory cache with jobs run eagerly
+TEST_RUNNER = 'dicision_tracker.test_runner.TestRunner'
+
+# Seconds a cached unread notification count is trusted before it is recounted
+NOTIFICATION_COUNT_CACHE_TIMEOUT = 300
+# Seconds during which repeated invitation responses for the same event
+# merge into the recipient's unread notification (core.fanout)
+NOTIFICATION_COALESCE_WINDOW = 60 * 60
+# Seconds between the digests users can opt into (core.digests)
+NOTIFICATION_DIGEST_INTERVAL = 24 * 60 * 60
+
+# Background jobs (core.jobs) are run by `python manage.py runworker`, so
+# requests return without waiting for them. True runs each job in the
+# queueing process right after its request commits instead; only the test
+# runner sets it.
+JOBS_RUN_EAGERLY = False
+# Seconds before a failed job's first retry (doubling per attempt), and the
+# lease a running job holds: its worker renews it every third of that, so
+# only jobs whose worker died are requeued once it runs out
+JOBS_RETRY_DELAY = 30
+JOBS_TIMEOUT = 600
+
+# Deliverable reminders (core.reminders): assignees are notified this many
+# seconds before an open deliverable is due and again once it is overdue,
+# by a sweep the worker runs every DELIVERABLE_REMINDER_INTERVAL seconds
+DELIVERABLE_DUE_SOON = 24 * 60 * 60
+DELIVERABLE_REMINDER_INTERVAL = 15 * 60
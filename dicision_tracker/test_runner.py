@@ -0,0 +1,47 @@
+"""
+Test runner for the project.
+
+The suite runs background jobs eagerly, in the queueing process, against a
+local memory cache, so tests need no worker and never touch the cache of a
+development server. Test cases that start runworker processes set
+``shared_database = True``; the SQLite test database is then a temporary
+file those processes can open, rather than in memory.
+"""
+import os
+import tempfile
+
+from django.db import connections
+from django.test.runner import DiscoverRunner
+from django.test.utils import iter_test_cases, override_settings
+
+TEST_SETTINGS = {
+    'CACHES': {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'decision-tracker-tests',
+        }
+    },
+    'JOBS_RUN_EAGERLY': True,
+}
+
+
+class TestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.test_settings = override_settings(**TEST_SETTINGS)
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.test_settings.disable()
+        super().teardown_test_environment(**kwargs)
+
+    def get_databases(self, suite):
+        if any(getattr(test, 'shared_database', False) for test in iter_test_cases(suite)):
+            connection = connections['default']
+            if connection.vendor == 'sqlite' and not connection.settings_dict['TEST']['NAME']:
+                # Removed with the rest of the test database at teardown
+                connection.settings_dict['TEST']['NAME'] = os.path.join(
+                    tempfile.gettempdir(), f'decision_tracker_test_{os.getpid()}.sqlite3'
+                )
+        return super().get_databases(suite)